@@ -9,9 +9,10 @@ if sys.version_info < (3, 0):
     sys.exit(1)
 
 from .auth import register_, log_in, get_user_details, set_new_password, \
-    password_reset, log_out
+    password_reset, log_out, set_credentials_provider, set_headless
 
-from .compute import upload_model, update_model, delete_model, \
+from .compute import upload_model, upload_models, validate_model, optimize_model, update_model, delete_model, \
+    wait_for_model, wait_for_models, \
     get_model, get_all_models, models_statistics, \
     add_catalogue, update_catalogue, delete_catalogue, get_catalogue,\
     get_all_catalogues, config_parameters
@@ -20,5 +21,25 @@ from .device import add_device, update_device, delete_device, \
     assign_model_to_device, get_device, get_all_devices, devices_statistics,\
     add_devices_to_group, delete_device_from_group, get_groups, delete_group
 
+from .records import Model, Device, Catalogue, Group
+
+from .state import reconcile
+
+from .sync import iter_device_changes, device_changes, reset_device_snapshot
+
+from .metadata import materialise, query, materialised_at
+
+from .export import export_devices, export_models
+
+from ._log import configure_logging
+
+from ._deadline import CancellationToken
+
+from ._limiter import concurrency_stats
+
+from ._hedge import hedging_stats
+
+from ._outbox import drain_outbox, outbox_stats
+
 from .version import __version__
 
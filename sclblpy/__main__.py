@@ -1,6 +1,8 @@
 # Executed when running
 # > python sclblpy
 # from terminal.
+import sys
+from sclblpy.cli import main
+
 if __name__ == '__main__':
-    print("The sclblpy package currently does not have any command line options.")
-    print("Please import the package into your python project and work from there.")
+    sys.exit(main())
@@ -0,0 +1,72 @@
+# File contains the (private) JSON codec used for all request and response bodies.
+# The fastest installed library is used: orjson, msgspec, ujson, or the standard library json module.
+import json
+from sclblpy._globals import JSON_CODEC
+
+
+def _stdlib():
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    return 'json', lambda obj: encoder.encode(obj).encode('utf-8'), json.loads
+
+
+def _orjson():
+    import orjson
+    return 'orjson', orjson.dumps, orjson.loads
+
+
+def _msgspec():
+    import msgspec
+    encoder, decoder = msgspec.json.Encoder(), msgspec.json.Decoder()
+    return 'msgspec', encoder.encode, decoder.decode
+
+
+def _ujson():
+    import ujson
+    return 'ujson', lambda obj: ujson.dumps(obj, ensure_ascii=False).encode('utf-8'), ujson.loads
+
+
+_CODECS = {'orjson': _orjson, 'msgspec': _msgspec, 'ujson': _ujson, 'json': _stdlib}
+
+
+def _select(preferred: str = None):
+    """Return (name, dumps, loads) of the preferred codec, or of the first one installed."""
+    for name in ([preferred] if preferred else []) + list(_CODECS):
+        try:
+            return _CODECS[name]()
+        except (ImportError, KeyError):
+            continue
+
+
+NAME, _dumps, _loads = _select(JSON_CODEC)
+
+
+def dumps(obj) -> bytes:
+    """Encode obj as (UTF-8) JSON bytes."""
+    return _dumps(obj)
+
+
+def loads(data):
+    """Decode JSON directly from bytes (or str), without an intermediate str copy where the codec allows.
+        Raises:
+            ValueError if data is not valid JSON.
+    """
+    try:
+        return _loads(data)
+    except ValueError:
+        raise
+    except Exception as e:  # e.g. msgspec.DecodeError
+        raise ValueError(str(e)) from e
+
+
+def use(name: str) -> str:
+    """Select the JSON codec by name ('orjson', 'msgspec', 'ujson' or 'json').
+        Returns:
+            The name of the codec in use (the first installed one if name is not installed).
+    """
+    global NAME, _dumps, _loads
+    NAME, _dumps, _loads = _select(name)
+    return NAME
+
+
+if __name__ == '__main__':
+    print("No command line options available for _codec.py.")
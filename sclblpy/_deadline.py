@@ -0,0 +1,215 @@
+# File contains the per-call deadlines, cancellation and priority of API calls.
+# Every public function accepts deadline= (seconds), cancel= (a CancellationToken) and priority= (a lane of the
+# request scheduler, see _limiter). They are kept in a context variable for the duration of the call, so the HTTP
+# transport, token refresh and waits inside the call honour them.
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from sclblpy.errors import DeadlineExceeded, Cancelled
+
+# (absolute time.monotonic() deadline or None, tuple of cancellation tokens, priority lane or None)
+_scope = contextvars.ContextVar("sclblpy_scope", default=(None, (), None))
+
+
+class CancellationToken:
+    """Cancels the API calls it is passed to (as cancel=...), from any thread.
+    Calls that are waiting return early, calls waiting for a response give up on it, and no new requests are
+    sent once cancelled.
+    """
+
+    __slots__ = ('_event', 'reason', '_callbacks', '_lock')
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.reason = None
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def cancel(self, reason: str = None):
+        """Cancel all calls using this token."""
+        self.reason = reason
+        with self._lock:
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def on_cancel(self, callback):
+        """Call callback() once the token is cancelled (right away if it already is).
+            Returns:
+                A function removing the callback again.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return functools.partial(self._remove, callback)
+        callback()
+        return lambda: None
+
+    def _remove(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until cancelled or timeout seconds passed; returns True if cancelled."""
+        return self._event.wait(timeout)
+
+
+def bounded(fn=None, priority: str = None):
+    """Decorator adding the deadline, cancel and priority keyword arguments to a public function.
+    Nested calls keep the earliest deadline and all cancellation tokens of the enclosing calls, and the
+    priority of the outermost call that sets one. Use @bounded(priority='bulk') to give a function a
+    default priority of its own.
+    """
+
+    if fn is None:
+        return functools.partial(bounded, priority=priority)
+    default = priority
+
+    if inspect.isgeneratorfunction(fn):
+        @functools.wraps(fn)
+        def generator(*args, deadline: float = None, cancel: CancellationToken = None, priority: str = None,
+                      **kwargs):
+            scope = _narrow(deadline, cancel, priority or default)
+            items = fn(*args, **kwargs)
+            while True:
+                # Only apply the scope while the generator runs, not while the caller holds it.
+                token = _scope.set(scope)
+                try:
+                    item = next(items)
+                except StopIteration:
+                    return
+                finally:
+                    _scope.reset(token)
+                yield item
+        return _documented(generator, fn)
+
+    @functools.wraps(fn)
+    def call(*args, deadline: float = None, cancel: CancellationToken = None, priority: str = None, **kwargs):
+        if deadline is None and cancel is None and priority is None and default is None:
+            return fn(*args, **kwargs)
+        token = _scope.set(_narrow(deadline, cancel, priority or default))
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _scope.reset(token)
+    return _documented(call, fn)
+
+
+def _documented(wrapper, fn):
+    """Show the deadline, cancel and priority arguments in the signature of the wrapper (e.g. in help())."""
+    signature = inspect.signature(fn)
+    wrapper.__signature__ = signature.replace(parameters=list(signature.parameters.values()) + [
+        inspect.Parameter('deadline', inspect.Parameter.KEYWORD_ONLY, default=None, annotation=float),
+        inspect.Parameter('cancel', inspect.Parameter.KEYWORD_ONLY, default=None, annotation=CancellationToken),
+        inspect.Parameter('priority', inspect.Parameter.KEYWORD_ONLY, default=None, annotation=str)])
+    return wrapper
+
+
+def _narrow(deadline: float, cancel: CancellationToken, priority: str) -> tuple:
+    """The scope of a call: the current scope limited by its own deadline and token."""
+    at, tokens, lane = _scope.get()
+    if deadline is not None:
+        at = min(at, time.monotonic() + deadline) if at is not None else time.monotonic() + deadline
+    if cancel is not None:
+        tokens = tokens + (cancel,)
+    return at, tokens, lane or priority
+
+
+def bind(fn):
+    """Bind fn to the current scope, for running it on another thread (e.g. in a ThreadPoolExecutor)."""
+    scope = _scope.get()
+
+    def run(*args, **kwargs):
+        token = _scope.set(scope)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _scope.reset(token)
+    return run
+
+
+def cancelled() -> bool:
+    """True if the current call was cancelled."""
+    return any(t.cancelled for t in _scope.get()[1])
+
+
+def on_cancel(callback):
+    """Call callback() once any cancellation token of the current call is cancelled.
+        Returns:
+            A function removing the callback from all tokens; None if the call cannot be cancelled.
+    """
+
+    tokens = _scope.get()[1]
+    if not tokens:
+        return None
+    removers = [t.on_cancel(callback) for t in tokens]
+
+    def remove():
+        for remover in removers:
+            remover()
+    return remove
+
+
+def priority() -> str:
+    """The priority lane of the current call; None if not set."""
+    return _scope.get()[2]
+
+
+def remaining() -> float:
+    """Seconds left until the deadline of the current call; None without a deadline.
+        Raises:
+            Cancelled if the call was cancelled, DeadlineExceeded if the deadline passed.
+    """
+
+    at, tokens, _ = _scope.get()
+    for t in tokens:
+        if t.cancelled:
+            raise Cancelled("The call was cancelled" + (": " + t.reason if t.reason else "."))
+    if at is None:
+        return None
+    left = at - time.monotonic()
+    if left <= 0:
+        raise DeadlineExceeded("The deadline of the call passed.")
+    return left
+
+
+def timeout(connect: float, read: float) -> tuple:
+    """The (connect, read) timeouts of a request, limited by the remaining time of the call."""
+    left = remaining()
+    if left is None:
+        return connect, read
+    return min(connect, left), min(read, left)
+
+
+def sleep(seconds: float) -> bool:
+    """Sleep at most seconds, the remaining time of the call, or until it is cancelled.
+        Returns:
+            True if the full time was slept, False if the call was cancelled or its deadline passed.
+    """
+
+    at, tokens, _ = _scope.get()
+    end = time.monotonic() + seconds
+    if at is not None and at < end:
+        end = at
+    while True:
+        if cancelled():
+            return False
+        left = end - time.monotonic()
+        if left <= 0:
+            return at is None or time.monotonic() < at
+        if tokens:
+            tokens[0].wait(min(left, 0.1) if len(tokens) > 1 else left)
+        else:
+            time.sleep(left)
+
+
+if __name__ == '__main__':
+    print("No command line options available for _deadline.py.")
@@ -0,0 +1,202 @@
+# File contains the (private) delta encoding of model updates (update_model(..., delta=True)).
+# A model is cut into chunks aligned to its tensors: the data of every large tensor is a segment of its own, as is
+# every stretch of bytes between them (graph structure, small tensors, ...), and each segment is split into blocks of
+# at most BLOCK_SIZE counted from its start. A tensor whose data did not change therefore gives the same chunks
+# wherever it moved in the file, e.g. when a doc string, the producer or another tensor changed in length. The
+# fingerprint of the last uploaded version of each model (the length and SHA-256 digest of every chunk) is kept in the
+# local cache. An update sends only the chunks of the new file that are not found, at any position, in the previous
+# version, together with the byte ranges of the previous version to copy. Files that are not onnx protobufs are cut
+# into fixed-size blocks. Servers that do not support patching receive a full upload instead; their delta route is
+# probed once per process, before any delta is sent.
+import os
+import sqlite3
+from array import array
+from sclblpy._globals import CACHE_DB
+from sclblpy import _hash, _onnx
+from sclblpy._log import get_logger
+
+logger = get_logger('delta')
+
+BLOCK_SIZE: int = 1024 ** 2
+
+# Tensors with less data than this do not start a segment of their own.
+MIN_TENSOR_SIZE: int = 64 * 1024
+
+# Above this fraction of changed bytes a full upload is sent instead of a delta.
+MAX_DELTA_RATIO: float = 0.5
+
+# Services (API base URLs) without patching support: later updates are sent to them in full.
+unsupported: set = set()
+
+# Services whose delta route was probed (OPTIONS) before the first delta was sent to them.
+probed: set = set()
+
+
+def chunks(path: str) -> list:
+    """The (offset, length) chunks of a file, aligned to the data of its tensors (see above)."""
+    size = os.path.getsize(path)
+    try:
+        tensors = _onnx.tensor_spans(path, MIN_TENSOR_SIZE)
+    except (ValueError, OSError):
+        tensors = []
+    segments, pos = [], 0
+    for start, end in tensors:
+        if start < pos:  # overlapping ranges cannot occur in a valid file
+            continue
+        segments += [(pos, start), (start, end)]
+        pos = end
+    segments.append((pos, size))
+    return [(offset, min(BLOCK_SIZE, end - offset)) for start, end in segments
+            for offset in range(start, end, BLOCK_SIZE)]
+
+
+def fingerprint(path: str, digests: list = None, spans: list = None) -> dict:
+    """The fingerprint of a file: its 'size', the 'lengths' and SHA-256 'digests' of its chunks (hashed in parallel
+    unless given, see _hash) and their Merkle 'root'.
+        Args:
+            path: The file.
+            digests: The digests of spans, if already computed.
+            spans: The chunks of the file (see chunks); computed when omitted.
+    """
+
+    if spans is None:
+        spans = chunks(path)
+    if digests is None:
+        digests = _hash.digests(path, spans)
+    return {'size': os.path.getsize(path), 'lengths': [length for _, length in spans], 'digests': digests,
+            'root': _hash.root(digests)}
+
+
+def _connect() -> sqlite3.Connection:
+    """Open the local cache database and make sure the fingerprint table exists."""
+    os.makedirs(os.path.dirname(CACHE_DB), exist_ok=True)
+    db = sqlite3.connect(CACHE_DB)
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS model_chunks (
+            uuid TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            root TEXT NOT NULL,
+            lengths BLOB NOT NULL,
+            digests BLOB NOT NULL
+        )
+    """)
+    return db
+
+
+def load(uuid: str) -> dict:
+    """The fingerprint of the last version of a model uploaded from this machine; None if unknown."""
+    try:
+        db = _connect()
+        try:
+            row = db.execute("SELECT size, root, lengths, digests FROM model_chunks WHERE uuid = ?",
+                             (uuid,)).fetchone()
+        finally:
+            db.close()
+    except sqlite3.Error as e:
+        logger.warning("WARNING: Unable to read the model fingerprint from the cache: %s", e, extra={'uuid': uuid})
+        return None
+    if row is None:
+        return None
+    size, root, lengths, digests = row
+    return {'size': size, 'root': root, 'lengths': array('Q', lengths).tolist(),
+            'digests': [digests[i:i + 32] for i in range(0, len(digests), 32)]}
+
+
+def save(uuid: str, fp: dict):
+    """Remember the fingerprint of the version of a model just uploaded."""
+    try:
+        db = _connect()
+        try:
+            with db:
+                db.execute("INSERT OR REPLACE INTO model_chunks VALUES (?, ?, ?, ?, ?)",
+                           (uuid, fp['size'], fp['root'], array('Q', fp['lengths']).tobytes(),
+                            b"".join(fp['digests'])))
+        finally:
+            db.close()
+    except sqlite3.Error as e:
+        logger.warning("WARNING: Unable to store the model fingerprint in the cache: %s", e, extra={'uuid': uuid})
+
+
+def forget(uuid: str):
+    """Drop the fingerprint of a model, e.g. when the version just uploaded could not be fingerprinted."""
+    try:
+        db = _connect()
+        try:
+            with db:
+                db.execute("DELETE FROM model_chunks WHERE uuid = ?", (uuid,))
+        finally:
+            db.close()
+    except sqlite3.Error as e:
+        logger.warning("WARNING: Unable to remove the model fingerprint from the cache: %s", e, extra={'uuid': uuid})
+
+
+def _offsets(fp: dict):
+    """The (offset, length, digest) of the chunks of a fingerprint."""
+    offset = 0
+    for length, digest in zip(fp['lengths'], fp['digests']):
+        yield offset, length, digest
+        offset += length
+
+
+def diff(base: dict, target: dict) -> list:
+    """The operations rebuilding target from base, chunk by chunk.
+        Returns:
+            List of ['copy', offset in base, length] and ['data', offset in target, length]; adjacent ranges are
+            merged into one operation. The data ranges are sent in order, the copied ranges are read from base.
+    """
+
+    index = {}
+    for offset, length, digest in _offsets(base):
+        index.setdefault((digest, length), offset)
+    ops = []
+    for offset, length, digest in _offsets(target):
+        source = index.get((digest, length))
+        op, start = ('data', offset) if source is None else ('copy', source)
+        last = ops[-1] if ops else None
+        if last is not None and last[0] == op and last[1] + last[2] == start:
+            last[2] += length
+        else:
+            ops.append([op, start, length])
+    return ops
+
+
+def changed_bytes(ops: list) -> int:
+    """Number of bytes of target sent with the delta."""
+    return sum(length for op, _, length in ops if op == 'data')
+
+
+class BlockReader:
+    """File-like reader over the data ranges of a delta, read from the target file in order."""
+
+    def __init__(self, path: str, ops: list):
+        self._file = open(path, 'rb')
+        self._ranges = [(offset, length) for op, offset, length in ops if op == 'data']
+        self._length = sum(length for _, length in self._ranges)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self._length
+        out = b""
+        while self._ranges and len(out) < size:
+            offset, length = self._ranges[0]
+            self._file.seek(offset)
+            data = self._file.read(min(length, size - len(out)))
+            if not data:
+                self._ranges.pop(0)
+                continue
+            out += data
+            if len(data) < length:
+                self._ranges[0] = (offset + len(data), length - len(data))
+            else:
+                self._ranges.pop(0)
+        return out
+
+    def close(self):
+        self._file.close()
+
+
+if __name__ == '__main__':
+    print("No command line options available for _delta.py.")
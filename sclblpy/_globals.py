@@ -10,9 +10,33 @@ DEVICE_API_URL = "https://api.sclbl.net/dev"
 SILENT: bool = False  # Boolean indicating whether user feedback should be suppressed.
 DEBUG: bool = False  # Boolean indicating whether using the package in debug mode; if so, it will raise exceptions.
 
+# authentication:
+# Boolean indicating whether to never prompt for credentials (e.g. in containerised workers); defaults to the
+# SCLBL_HEADLESS environment variable and is changed at runtime with set_headless.
+HEADLESS: bool = os.environ.get('SCLBL_HEADLESS', "").lower() in ("1", "true", "yes")
+
+# JSON codec for request and response bodies: None selects the fastest installed one (orjson, msgspec, ujson, json).
+JSON_CODEC: str = None
+
+# connections:
+POOL_SIZE: int = 32  # Maximum number of pooled keep-alive connections per server.
+CONNECT_TIMEOUT: float = 10  # Seconds to wait for a connection (further limited by the deadline of a call).
+READ_TIMEOUT: float = 300  # Seconds to wait for the server to send data (further limited by the deadline of a call).
+COALESCE_GETS: bool = True  # Boolean indicating whether identical concurrent GET requests share one network call.
+HTTP2: bool = False  # Boolean indicating whether to multiplex requests over HTTP/2 (requires httpx[http2]).
+ADAPTIVE_CONCURRENCY: bool = False  # Boolean indicating whether to adapt the concurrency per service (AIMD), not POOL_SIZE.
+HEDGE_GETS: bool = False  # Boolean indicating whether to resend GET requests slower than the p95 latency.
+HEDGE_BUDGET: float = 0.05  # Maximum fraction of extra GET requests sent as hedges.
+PRIORITY_WEIGHTS: dict = {'interactive': 16, 'default': 4, 'bulk': 1}  # Shares of the priority lanes.
+
+# offline:
+OUTBOX: bool = False  # Boolean indicating whether mutations are queued and replayed while the API is unreachable.
+
 # Storage locations:
 dirs = AppDirs("sclblpy", "sclbl")
 USER_CREDENTIALS: str = dirs.user_config_dir + "/.creds.json"  # Location of json file to store user credentials
+CACHE_DB: str = dirs.user_cache_dir + "/cache.sqlite"  # Location of the local SQLite cache (snapshots, metadata)
+OUTBOX_FILE: str = dirs.user_data_dir + "/outbox.jsonl"  # Location of the journal of queued mutations (OUTBOX)
 
 package_dir = os.path.dirname(os.path.abspath(__file__))
 JWT_JSON_FILE = os.path.join(package_dir, "glob.json")
@@ -0,0 +1,120 @@
+# File contains the (private) optional HTTP/2 transport, used when HTTP2 is set in _globals and httpx (with h2) is
+# installed. Concurrent requests to api.sclbl.net are multiplexed as streams over a single connection, and repeated
+# headers (such as Authorization) are compressed with HPACK.
+import threading
+import requests as req
+from sclblpy._globals import POOL_SIZE
+
+_client = None
+_lock = threading.Lock()
+
+
+def available() -> bool:
+    """True if httpx and h2 are installed."""
+    try:
+        import httpx  # noqa: F401 (optional dependency)
+        import h2  # noqa: F401 (optional dependency)
+    except ImportError:
+        return False
+    return True
+
+
+def client():
+    """Return the shared HTTP/2 client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                import httpx
+                limits = httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE)
+                _client = httpx.Client(http2=True, limits=limits)
+    return _client
+
+
+class Response:
+    """Presents an httpx response with the parts of the requests.Response interface used by the package."""
+
+    def __init__(self, resp):
+        self._resp = resp
+        self.status_code = resp.status_code
+        self.headers = resp.headers
+        self.url = str(resp.url)
+        self.http_version = resp.http_version
+
+    @property
+    def content(self) -> bytes:
+        return self._resp.read()
+
+    @property
+    def text(self) -> str:
+        self._resp.read()
+        return self._resp.text
+
+    def json(self):
+        self._resp.read()
+        return self._resp.json()
+
+    def iter_content(self, chunk_size: int = 1):
+        import httpx
+        try:
+            yield from self._resp.iter_bytes(chunk_size)
+        except httpx.HTTPError as e:
+            raise _translate(e) from e
+
+    def raise_for_status(self):
+        if 400 <= self.status_code < 600:
+            raise req.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+    def close(self):
+        self._resp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def request(method: str, url: str, headers: dict = None, data=None, files=None, params=None, timeout=None,
+            stream: bool = False) -> Response:
+    """Send a request over the shared HTTP/2 client; arguments as for requests.
+        Raises:
+            requests exceptions (Timeout, ConnectionError, RequestException) for transport errors.
+    """
+
+    import httpx
+    headers = dict(headers or {})
+    content = form = None
+    if isinstance(data, dict):
+        form = data
+    elif data is not None:
+        content = data
+        if hasattr(data, '__len__') and not isinstance(data, (bytes, bytearray, str)):
+            # A file-like body of known size: send it with a Content-Length instead of chunked.
+            headers.setdefault('Content-Length', str(len(data)))
+    if isinstance(timeout, tuple):
+        timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+    try:
+        request_ = client().build_request(method, url, headers=headers, content=content, data=form, files=files,
+                                          params=params, timeout=timeout)
+        resp = client().send(request_, stream=True)
+        if not stream:
+            resp.read()
+            resp.close()
+    except httpx.HTTPError as e:
+        raise _translate(e) from e
+    return Response(resp)
+
+
+def _translate(e) -> req.exceptions.RequestException:
+    """Map an httpx error onto the requests exception the callers handle."""
+    import httpx
+    if isinstance(e, httpx.TimeoutException):
+        return req.exceptions.Timeout(str(e))
+    if isinstance(e, httpx.TransportError):
+        return req.exceptions.ConnectionError(str(e))
+    return req.exceptions.RequestException(str(e))
+
+
+if __name__ == '__main__':
+    print("No command line options available for _h2.py.")
@@ -0,0 +1,102 @@
+# File contains the (private) hashing of model files: a tree hash over fixed-size chunks (chunked SHA-256 Merkle).
+# The file is memory-mapped and its chunks are hashed by a thread pool (hashlib releases the GIL), so a multi-GB
+# model is hashed at the speed of all cores instead of one. The same pool hashes the (tensor-aligned) chunks of the
+# fingerprints of delta uploads. Hashing can run in the background, overlapping with an upload of the same file.
+import hashlib
+import mmap
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from sclblpy import _deadline
+
+CHUNK_SIZE: int = 1024 ** 2
+
+# Number of chunks hashed per task.
+CHUNKS_PER_TASK: int = 16
+
+_pool = None
+_lock = threading.Lock()
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="sclblpy-hash")
+    return _pool
+
+
+def _digests(view: memoryview, spans: list) -> list:
+    _deadline.remaining()
+    return [hashlib.sha256(view[offset:offset + length]).digest() for offset, length in spans]
+
+
+def digests(path: str, spans: list) -> list:
+    """The SHA-256 digests of the given (offset, length) spans of a file, hashed in parallel.
+        Raises:
+            Cancelled or DeadlineExceeded if the call was cancelled or its deadline passed while hashing.
+    """
+
+    if not spans:
+        return []
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        view = memoryview(buf)
+        try:
+            futures = [_executor().submit(_deadline.bind(_digests), view, spans[i:i + CHUNKS_PER_TASK])
+                       for i in range(0, len(spans), CHUNKS_PER_TASK)]
+            try:
+                return [digest for future in futures for digest in future.result()]
+            finally:
+                for future in futures:
+                    future.cancel()
+                for future in futures:
+                    if not future.cancelled():
+                        future.exception()  # wait until no task reads the map any more
+        finally:
+            view.release()
+
+
+def leaves(path: str, chunk_size: int = CHUNK_SIZE) -> list:
+    """The SHA-256 digests of the fixed-size chunks of a file, hashed in parallel (see digests)."""
+    size = os.path.getsize(path)
+    return digests(path, [(offset, min(chunk_size, size - offset)) for offset in range(0, size, chunk_size)])
+
+
+def root(digests: list) -> str:
+    """The Merkle root of a list of chunk digests (hex); nodes are SHA-256(0x01 | left | right)."""
+    level = list(digests) or [hashlib.sha256(b"").digest()]
+    while len(level) > 1:
+        level = [hashlib.sha256(b"\x01" + level[i] + level[i + 1]).digest() if i + 1 < len(level) else level[i]
+                 for i in range(0, len(level), 2)]
+    return level[0].hex()
+
+
+def tree_hash(path: str, chunk_size: int = CHUNK_SIZE) -> str:
+    """The tree hash of a file: the Merkle root of the SHA-256 digests of its chunks."""
+    return root(leaves(path, chunk_size))
+
+
+def background(path: str, spans: list) -> Future:
+    """Start hashing spans of a file in the background (e.g. while it is being uploaded).
+        Returns:
+            A future of the digests (see digests).
+    """
+
+    future = Future()
+    run = _deadline.bind(digests)
+
+    def work():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(run(path, spans))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=work, name="sclblpy-hash-background", daemon=True).start()
+    return future
+
+
+if __name__ == '__main__':
+    print("No command line options available for _hash.py.")
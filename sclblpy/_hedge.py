@@ -0,0 +1,145 @@
+# File contains the (private) hedging of GET requests, used when HEDGE_GETS is set in _globals.
+# A GET that has not been answered within the 95th percentile latency of its endpoint is sent a second time; the
+# first successful (status < 500) response is used and the other one is discarded when it arrives. The delay counts
+# from the moment the request is sent, not from when it was queued for a thread. Hedges are limited to HEDGE_BUDGET
+# (a fraction) of all hedgeable requests, so hedging never adds more load than that.
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, TimeoutError, wait
+from sclblpy._globals import HEDGE_BUDGET, POOL_SIZE
+from sclblpy import _deadline
+from sclblpy._log import get_logger
+
+logger = get_logger('hedge')
+
+# Path segments that identify a resource (UUIDs, numbers).
+_ID = re.compile(r"(?<=/)[0-9a-fA-F-]{8,}|(?<=/)[0-9]+(?=/|$)")
+
+# Number of latencies needed before an endpoint is hedged, and kept per endpoint.
+MIN_SAMPLES: int = 20
+MAX_SAMPLES: int = 200
+
+_latencies = {}
+_counts = {'requests': 0, 'hedged': 0, 'hedge_wins': 0}
+_lock = threading.Lock()
+_pool = None
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="sclblpy-hedge")
+    return _pool
+
+
+def route(url: str) -> str:
+    """The endpoint of a URL with the resource IDs left out, e.g. https://api.sclbl.net/dev/device/*."""
+    return _ID.sub("*", url.split('?', 1)[0])
+
+
+def percentile(endpoint: str, q: float = 0.95) -> float:
+    """The q-th percentile latency (seconds) of an endpoint; None until MIN_SAMPLES are observed."""
+    with _lock:
+        samples = sorted(_latencies.get(endpoint, ()))
+    if len(samples) < MIN_SAMPLES:
+        return None
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def _timed(send, endpoint: str, url: str, kwargs: dict, started: threading.Event = None):
+    if started is not None:
+        started.set()
+    start = time.monotonic()
+    resp = send("GET", url, kwargs)
+    if resp.status_code < 500:
+        with _lock:
+            _latencies.setdefault(endpoint, deque(maxlen=MAX_SAMPLES)).append(time.monotonic() - start)
+    return resp
+
+
+def _spend() -> bool:
+    """Take a hedge from the budget, if any is left."""
+    with _lock:
+        if _counts['hedged'] + 1 > HEDGE_BUDGET * _counts['requests']:
+            return False
+        _counts['hedged'] += 1
+        return True
+
+
+def _discard(future):
+    """Close the response of the request that lost the race, returning its connection to the pool."""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def request(send, url: str, kwargs: dict):
+    """Send a GET with send(method, url, kwargs), hedging it when it is slower than usual.
+        Returns:
+            The first response with a status below 500; a 5xx response (or the exception) only if both
+            requests failed.
+    """
+
+    endpoint = route(url)
+    delay = percentile(endpoint)
+    with _lock:
+        _counts['requests'] += 1
+    if delay is None:
+        return _timed(send, endpoint, url, kwargs)
+
+    started = threading.Event()
+    first = _executor().submit(_deadline.bind(_timed), send, endpoint, url, dict(kwargs), started)
+    first.add_done_callback(lambda _: started.set())  # also if it fails before it is sent
+    started.wait()  # the request may wait for a thread of the pool: only time on the wire counts
+    try:
+        return first.result(timeout=delay)
+    except TimeoutError:
+        pass
+    if not _spend():
+        return first.result()
+
+    logger.debug("GET %s slower than %.3fs: hedging", endpoint, delay, extra={'endpoint': endpoint})
+    second = _executor().submit(_deadline.bind(_timed), send, endpoint, url, dict(kwargs))
+    pending = {first, second}
+    error = failed = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        winner = next((future for future in (first, second) if future in done and future.exception() is None
+                       and future.result().status_code < 500), None)
+        if winner is not None:
+            for loser in (pending | done) - {winner}:
+                loser.add_done_callback(_discard)
+            if failed is not None:
+                failed.close()
+            if winner is second:
+                with _lock:
+                    _counts['hedge_wins'] += 1
+            return winner.result()
+        # A failed request (5xx or exception) only counts if its twin fails as well.
+        for future in done:
+            if future.exception() is not None:
+                error = error or future.exception()
+            elif failed is None:
+                failed = future.result()
+            else:
+                future.result().close()
+    if failed is not None:
+        return failed
+    raise error
+
+
+def hedging_stats() -> dict:
+    """Return the counters of request hedging (see HEDGE_GETS).
+        Returns:
+            Dictionary with the number of hedgeable 'requests', the number 'hedged' (sent a second time),
+            and 'hedge_wins' (the second request answered first).
+    """
+    with _lock:
+        return dict(_counts)
+
+
+if __name__ == '__main__':
+    print("No command line options available for _hedge.py.")
@@ -0,0 +1,292 @@
+# File contains the (private) shared HTTP transport: one connection pool used by all API calls.
+import codecs
+import json
+import socket
+import threading
+import time
+import requests as req
+from requests.adapters import HTTPAdapter
+from sclblpy._globals import POOL_SIZE, CONNECT_TIMEOUT, READ_TIMEOUT, COALESCE_GETS, HTTP2, ADAPTIVE_CONCURRENCY, \
+    HEDGE_GETS
+from sclblpy import _codec, _deadline, _h2, _limiter, _hedge
+from urllib.parse import urlsplit
+from sclblpy.errors import Cancelled, DeadlineExceeded
+from sclblpy._log import get_logger
+
+logger = get_logger('http')
+
+_session = None
+_transport = None
+_accept_encoding = None
+_lock = threading.Lock()
+
+# GET requests in flight, by (url, params, authorization); identical concurrent GETs wait for the first one.
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+class _Call:
+    """A GET request in flight, shared by all callers asking for the same resource."""
+    __slots__ = ('done', 'response', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+
+def session() -> req.Session:
+    """Return the shared requests session, creating it on first use.
+    Connections to the Scailable servers are kept alive and reused across calls and threads.
+    """
+
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                s = req.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+                s.mount("https://", adapter)
+                s.mount("http://", adapter)
+                _session = s
+    return _session
+
+
+def transport() -> str:
+    """Return 'http2' if requests are sent over HTTP/2 (HTTP2 set and httpx installed), 'http1' otherwise."""
+    global _transport
+    if _transport is None:
+        _transport = 'http2' if HTTP2 and _h2.available() else 'http1'
+        if HTTP2 and _transport == 'http1':
+            logger.warning("WARNING: httpx[http2] is not installed; using HTTP/1.1.")
+    return _transport
+
+
+def request(method: str, url: str, **kwargs) -> req.models.Response:
+    """Send a request over the shared session.
+    A json body is encoded with the package's JSON codec (see _codec). Every request is logged at DEBUG
+    level with the method, endpoint, status and duration as structured fields.
+    Unless given, the connect and read timeouts are CONNECT_TIMEOUT and READ_TIMEOUT, limited by the
+    deadline of the current call; no request is sent once the call was cancelled.
+    Identical concurrent GET requests (same URL, parameters and Authorization header, not streamed) are
+    coalesced into one network call whose response is shared by all callers (unless COALESCE_GETS is False).
+    If HTTP2 is set and httpx is installed, requests are multiplexed over HTTP/2 (see _h2); the response then
+    offers the same interface as a requests response.
+    If HEDGE_GETS is set, a GET that is slower than usual is sent a second time (see _hedge).
+    Concurrent requests to each service are capped by an adaptive limit (a fixed POOL_SIZE if
+    ADAPTIVE_CONCURRENCY is False); callers beyond the limit wait for a free slot, scheduled by the
+    priority lane of their call (see _limiter).
+        Args:
+            method: HTTP method (GET, POST, PATCH, DELETE).
+            url: The URL of the request.
+            kwargs: Passed on to requests (headers, json, data, files, ...).
+        Returns:
+            The response.
+        Raises:
+            Cancelled or DeadlineExceeded (both RequestExceptions) if the call was cancelled or its deadline passed.
+    """
+
+    if method == "GET" and not kwargs.get('stream'):
+        if COALESCE_GETS:
+            return _coalesced(url, kwargs)
+        if HEDGE_GETS:
+            return _hedge.request(_send, url, kwargs)
+    return _send(method, url, kwargs)
+
+
+def _coalesced(url: str, kwargs: dict) -> req.models.Response:
+    """Send a GET request, or wait for the identical one already in flight and share its response."""
+
+    params = kwargs.get('params')
+    key = (url, repr(sorted(params.items()) if isinstance(params, dict) else params),
+           (kwargs.get('headers') or {}).get('Authorization'))
+    while True:
+        with _inflight_lock:
+            call = _inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _inflight[key] = _Call()
+        if leader:
+            try:
+                call.response = _hedge.request(_send, url, kwargs) if HEDGE_GETS else _send("GET", url, kwargs)
+                return call.response
+            except Exception as e:
+                call.error = e
+                raise
+            finally:
+                with _inflight_lock:
+                    del _inflight[key]
+                call.done.set()
+
+        logger.debug("GET %s coalesced with a request in flight", url.split('?', 1)[0])
+        while not call.done.wait(min(0.05, _deadline.remaining() or 0.05)):
+            pass
+        if call.response is not None:
+            return call.response
+        if call.error is not None and not isinstance(call.error, (Cancelled, DeadlineExceeded)):
+            raise call.error
+        # The first caller gave up (e.g. its own deadline or cancellation): send the request ourselves.
+
+
+def accept_encoding() -> str:
+    """The Content-Encodings the transport can decode, best first: zstd and br when their decoders are installed
+    (for requests: backports.zstd before Python 3.14 and brotli or brotlicffi; for httpx: zstandard and brotli).
+    Sent as the Accept-Encoding of every request; responses are decompressed incrementally while received."""
+    global _accept_encoding
+    if _accept_encoding is None:
+        if transport() == 'http2':
+            try:
+                from httpx._decoders import SUPPORTED_DECODERS as decoders
+            except ImportError:
+                decoders = ('gzip', 'deflate')
+        else:
+            from urllib3.util.request import ACCEPT_ENCODING
+            decoders = ACCEPT_ENCODING.split(',')
+        _accept_encoding = ", ".join(e for e in ('zstd', 'br', 'gzip', 'deflate') if e in decoders)
+    return _accept_encoding
+
+
+def reachable(url: str) -> bool:
+    """True if a connection to the server of url can be opened now (bounded by CONNECT_TIMEOUT and the deadline)."""
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == 'https' else 80)
+    try:
+        left = _deadline.remaining()
+        timeout = CONNECT_TIMEOUT if left is None else min(CONNECT_TIMEOUT, left)
+        socket.create_connection((parts.hostname, port), timeout=timeout).close()
+    except (OSError, Cancelled, DeadlineExceeded):
+        return False
+    return True
+
+
+def _send(method: str, url: str, kwargs: dict) -> req.models.Response:
+    """Send a request. The request of a call that can be cancelled is sent on a worker thread, so the caller gives
+    up waiting (raising Cancelled) as soon as the call is cancelled, also while the request is in flight; the late
+    response is closed when it arrives, returning its connection to the pool."""
+
+    wake = threading.Event()
+    remove = _deadline.on_cancel(wake.set)
+    if remove is None:
+        return _transmit(method, url, kwargs)
+    outcome = {}
+    lock = threading.Lock()
+
+    def run():
+        try:
+            resp, error = _transmit(method, url, kwargs), None
+        except BaseException as e:
+            resp, error = None, e
+        with lock:
+            abandoned = 'abandoned' in outcome
+            outcome.update(resp=resp, error=error)
+        wake.set()
+        if abandoned and resp is not None:
+            resp.close()
+
+    try:
+        threading.Thread(target=_deadline.bind(run), name="sclblpy-request", daemon=True).start()
+        wake.wait()
+    finally:
+        remove()
+    with lock:
+        if 'resp' not in outcome:
+            outcome['abandoned'] = True
+    if 'abandoned' in outcome:
+        logger.debug("%s %s cancelled while in flight", method, url.split('?', 1)[0])
+        _deadline.remaining()  # raises Cancelled
+    if outcome['error'] is not None:
+        raise outcome['error']
+    return outcome['resp']
+
+
+def _transmit(method: str, url: str, kwargs: dict) -> req.models.Response:
+    kwargs['headers'] = dict(kwargs.get('headers') or {})
+    kwargs['headers'].setdefault('Accept-Encoding', accept_encoding())
+    if kwargs.get('json') is not None:
+        kwargs['data'] = _codec.dumps(kwargs.pop('json'))
+        kwargs['headers']['Content-Type'] = 'application/json'
+    endpoint = url.split('?', 1)[0]
+    parts = urlsplit(endpoint)
+    limiter = _limiter.limiter(f"{parts.scheme}://{parts.netloc}/{parts.path.lstrip('/').split('/', 1)[0]}",
+                               POOL_SIZE, ADAPTIVE_CONCURRENCY)
+    limiter.acquire(_deadline.priority())
+    # Only compare latencies of requests without (large) bodies, per endpoint with the resource IDs left out.
+    comparable = kwargs.get('files') is None and isinstance(kwargs.get('data'), (bytes, type(None)))
+    route = method + " " + _hedge.route(endpoint) if comparable else None
+    start = time.monotonic()
+    try:
+        kwargs['timeout'] = kwargs.get('timeout') or _deadline.timeout(CONNECT_TIMEOUT, READ_TIMEOUT)
+        if transport() == 'http2':
+            resp = _h2.request(method, url, **kwargs)
+        else:
+            resp = session().request(method, url, **kwargs)
+    except req.exceptions.RequestException as e:
+        duration = time.monotonic() - start
+        # A call cancelled or out of time locally is no sign of congestion (nor of a fast service).
+        limiter.release(None if isinstance(e, (Cancelled, DeadlineExceeded)) else duration)
+        logger.debug("%s %s failed: %s", method, endpoint, e,
+                     extra={'method': method, 'endpoint': endpoint, 'status': None, 'duration': duration})
+        raise
+    except BaseException:
+        limiter.release()
+        raise
+    duration = time.monotonic() - start
+    limiter.release(duration, resp.status_code, route)
+    logger.debug("%s %s %s (%.3fs)", method, endpoint, resp.status_code, duration,
+                 extra={'method': method, 'endpoint': endpoint, 'status': resp.status_code, 'duration': duration})
+    return resp
+
+
+def iter_json_list(resp: req.models.Response, chunk_size: int = 64 * 1024):
+    """Incrementally decode a (streamed) response containing a JSON list.
+    Only the current chunk and the record being decoded are held in memory.
+        Args:
+            resp: A response requested with stream=True.
+            chunk_size: Number of bytes read from the socket at a time.
+        Yields:
+            The items of the list.
+        Raises:
+            ValueError if the response is not a JSON list; Cancelled or DeadlineExceeded if the call was
+            cancelled or its deadline passed while receiving.
+    """
+
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8')()
+    buffer, pos, started, done = "", 0, False, False
+    chunks = resp.iter_content(chunk_size=chunk_size)
+    while not done:
+        _deadline.remaining()
+        chunk = next(chunks, None)
+        final = chunk is None
+        buffer = buffer[pos:] + text.decode(chunk or b"", final=final)
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if not started:
+                if buffer[pos] != '[':
+                    raise ValueError("The response is not a JSON list.")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == ']':
+                done = True
+                break
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                if final:
+                    raise
+                break  # incomplete item: read more
+            if end >= len(buffer) and not final:
+                break  # the item may continue in the next chunk (e.g. a number)
+            pos = end
+            yield item
+        if final and not done:
+            raise ValueError("The JSON list is incomplete.")
+
+
+if __name__ == '__main__':
+    print("No command line options available for _http.py.")
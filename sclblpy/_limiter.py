@@ -0,0 +1,168 @@
+# File contains the (private) adaptive concurrency limiter shared by all requests to a Scailable service.
+# The limit is fixed at POOL_SIZE unless ADAPTIVE_CONCURRENCY is set; then it follows AIMD: it grows while requests
+# succeed quickly (doubling per round trip until the first sign of congestion, then by one per round trip) and is
+# halved on throttling (429), server errors (5xx), timeouts and connection failures, or when the recent latency of an
+# endpoint rises well above its median over a longer window.
+# Requests waiting for a slot are scheduled by priority lane ('interactive', 'default', 'bulk'), with weighted fair
+# sharing between the lanes (PRIORITY_WEIGHTS): latency-sensitive calls overtake bulk traffic without starving it.
+import threading
+import time
+from collections import deque
+from sclblpy._globals import PRIORITY_WEIGHTS
+from sclblpy import _deadline
+from sclblpy._log import get_logger
+
+logger = get_logger('limiter')
+
+_limiters = {}
+_lock = threading.Lock()
+
+
+class AdaptiveLimiter:
+    """Caps the number of concurrent requests to one service at an adaptive (or, if not adaptive, fixed) limit."""
+
+    def __init__(self, name: str, initial: int = 4, minimum: int = 1, maximum: int = 32,
+                 latency_tolerance: float = 2.0, adaptive: bool = True):
+        self.name = name
+        self.adaptive = adaptive
+        self.limit = float(initial if adaptive else maximum)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_tolerance = latency_tolerance
+        self.inflight = 0
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+        self.latency_ratio = 1.0  # recent / longer-term median latency of the last endpoint requested
+        self._latency = {}  # endpoint: recent latencies
+        self._slow_start = True
+        self._decreased = 0.0
+        self._cond = threading.Condition()
+        self._lanes = {lane: deque() for lane in PRIORITY_WEIGHTS}  # waiting tickets per lane
+        self._vtime = {lane: 0.0 for lane in PRIORITY_WEIGHTS}  # virtual time per lane (weighted fair sharing)
+        self._clock = 0.0
+
+    def acquire(self, lane: str = None):
+        """Wait for a free slot in the given priority lane (bounded by the deadline of the current call)."""
+        lane = lane if lane in self._lanes else 'default'
+        ticket = [False]
+        with self._cond:
+            if not self._lanes[lane]:
+                # A lane that was idle gets no credit for the time it did not use.
+                self._vtime[lane] = max(self._vtime[lane], self._clock)
+            if not any(self._lanes.values()) and self.inflight < int(self.limit):
+                self._grant(lane)
+                return
+            self._lanes[lane].append(ticket)
+            try:
+                while not ticket[0]:
+                    _deadline.remaining()
+                    self._cond.wait(0.05)
+            except BaseException:
+                if ticket[0]:
+                    self.inflight -= 1
+                else:
+                    self._lanes[lane].remove(ticket)
+                self._dispatch()
+                raise
+
+    def _grant(self, lane: str):
+        """Give a slot to a request of lane, advancing the virtual time of the lane by 1 / its weight."""
+        self._clock = self._vtime[lane]
+        self._vtime[lane] += 1.0 / PRIORITY_WEIGHTS[lane]
+        self.inflight += 1
+
+    def _dispatch(self):
+        """Hand free slots to the waiting requests, the lane with the lowest virtual time first."""
+        granted = False
+        while self.inflight < int(self.limit):
+            waiting = [lane for lane, tickets in self._lanes.items() if tickets]
+            if not waiting:
+                break
+            lane = min(waiting, key=lambda name: self._vtime[name])
+            ticket = self._lanes[lane].popleft()
+            self._grant(lane)
+            ticket[0] = granted = True
+        if granted:
+            self._cond.notify_all()
+
+    def release(self, latency: float = None, status: int = None, endpoint: str = None):
+        """Free the slot of a finished request and adapt the limit.
+            Args:
+                latency: Seconds the request took; None if the request did not complete for a local reason
+                    (cancelled, deadline passed, error in the client), which says nothing about the service.
+                status: HTTP status of the response; None if the request failed (timeout, connection error).
+                endpoint: The endpoint requested, if its latency is comparable between requests (not for uploads).
+        """
+
+        with self._cond:
+            self.inflight -= 1
+            if latency is None:
+                self._dispatch()
+                return
+            self.requests += 1
+            congested = status is None or status == 429 or status >= 500
+            if status == 429:
+                self.throttled += 1
+            elif congested:
+                self.errors += 1
+            elif endpoint is not None:
+                # Median latency of the last requests to the endpoint relative to the median over a longer
+                # window: robust to outliers and to a latency distribution with several modes.
+                samples = self._latency.setdefault(endpoint, deque(maxlen=100))
+                samples.append(latency)
+                if len(samples) >= 20:
+                    recent = sorted(list(samples)[-10:])[5]
+                    baseline = sorted(samples)[len(samples) // 2]
+                    self.latency_ratio = recent / max(baseline, 1e-6)
+                    congested = self.latency_ratio > self.latency_tolerance
+            previous = self.limit
+            now = time.monotonic()
+            if congested:
+                # Decrease at most once per round trip, so one burst of failures does not collapse the limit.
+                if now - self._decreased > latency:
+                    self.limit = max(self.minimum, self.limit / 2)
+                    self._decreased = now
+                    self._slow_start = False
+            elif self._slow_start:
+                self.limit = min(self.maximum, self.limit + 1)
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            if not self.adaptive:
+                self.limit = previous
+            if int(previous) != int(self.limit):
+                logger.debug("Concurrency limit of %s: %d", self.name, int(self.limit),
+                             extra={'endpoint': self.name, 'limit': int(self.limit)})
+            self._dispatch()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {'limit': int(self.limit), 'inflight': self.inflight,
+                    'waiting': {lane: len(tickets) for lane, tickets in self._lanes.items()}, 'requests': self.requests,
+                    'throttled': self.throttled, 'errors': self.errors,
+                    'latency_ratio': self.latency_ratio}
+
+
+def limiter(name: str, maximum: int, adaptive: bool = True) -> AdaptiveLimiter:
+    """Return the shared limiter of a service (e.g. 'https://api.sclbl.net/dev'), creating it on first use."""
+    with _lock:
+        if name not in _limiters:
+            _limiters[name] = AdaptiveLimiter(name, maximum=maximum, adaptive=adaptive)
+        return _limiters[name]
+
+
+def concurrency_stats() -> dict:
+    """Return the state of the concurrency limiters (and request schedulers), one per Scailable service.
+        Returns:
+            Dictionary mapping each service URL to its current 'limit', the number of requests 'inflight' and
+            'waiting' (per priority lane), the number of 'requests' finished, 'throttled' (429) and 'errors' (5xx,
+            timeouts, connection errors), and the 'latency_ratio' (recent median latency relative to the
+            longer-term median of the endpoint).
+    """
+    with _lock:
+        limiters = list(_limiters.values())
+    return {lim.name: lim.stats() for lim in limiters}
+
+
+if __name__ == '__main__':
+    print("No command line options available for _limiter.py.")
@@ -0,0 +1,89 @@
+# File contains the logging setup of the sclblpy package.
+# All user feedback is emitted through the 'sclblpy' logger hierarchy (sclblpy.auth, sclblpy.compute, ...).
+# Records carry structured fields where available: endpoint, method, status, duration and uuid.
+import logging
+import logging.handlers
+import queue
+import sys
+from sclblpy._globals import SILENT
+
+root = logging.getLogger("sclblpy")
+_listener = None
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Writes to the current sys.stdout (so redirections of stdout are honoured)."""
+
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+    def emit(self, record):
+        self.stream = sys.stdout
+        super().emit(record)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Return the logger of a sclblpy module, e.g. get_logger('compute') for sclblpy.compute."""
+    return logging.getLogger("sclblpy." + name)
+
+
+def configure_logging(handler: logging.Handler = None, level: int = logging.INFO,
+                      non_blocking: bool = False) -> logging.Logger:
+    """Configure where the feedback of the sclblpy package goes.
+    By default feedback is printed to stdout (unless SILENT is set in _globals).
+        Args:
+            handler: Handler receiving the log records. None to propagate them to the
+                application's (root) logging configuration instead.
+            level: Minimum level of the records emitted.
+            non_blocking: If True, records are put on a queue and handled by a background thread,
+                so API calls never block on logging I/O.
+        Returns:
+            The 'sclblpy' logger.
+    """
+
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    for old in list(root.handlers):
+        root.removeHandler(old)
+    root.setLevel(level)
+    root.propagate = handler is None
+    if handler is None:
+        if not non_blocking:
+            return root
+        # Hand records to the handlers of the root logger from a background thread.
+        handler = _RootForwarder()
+    if non_blocking:
+        records = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+        _listener.start()
+        root.addHandler(logging.handlers.QueueHandler(records))
+        root.propagate = False
+    else:
+        root.addHandler(handler)
+    return root
+
+
+class _RootForwarder(logging.Handler):
+    """Passes records on to the handlers of the root logger."""
+
+    def emit(self, record):
+        logging.getLogger().handle(record)
+
+
+def _configure_default():
+    """Print feedback to stdout as plain messages, as the package always did, unless SILENT."""
+    if SILENT:
+        configure_logging(logging.NullHandler())
+    else:
+        handler = _StdoutHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        configure_logging(handler)
+
+
+_configure_default()
+
+
+if __name__ == '__main__':
+    print("No command line options available for _log.py.")
@@ -0,0 +1,199 @@
+# File contains a (private) lightweight reader for the metadata of .onnx files.
+# The file is memory-mapped and the protobuf is parsed lazily: tensor data is skipped, never copied.
+import mmap
+import os
+
+# Protobuf wire types
+_VARINT, _FIXED64, _LENGTH, _FIXED32 = 0, 1, 2, 5
+
+
+def _varint(buf, pos: int):
+    """Decode a varint at pos; returns (value, new position)."""
+    result = shift = 0
+    while True:
+        if pos >= len(buf):
+            raise ValueError("Truncated varint.")
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+        if shift > 63:
+            raise ValueError("Varint too long.")
+
+
+def fields(buf, start: int = 0, end: int = None):
+    """Iterate over the fields of a protobuf message in buf[start:end].
+    Yields (field number, wire type, value); for length-delimited fields the value is the
+    (start, end) range of the payload, so large payloads are skipped without copying.
+    """
+
+    pos = start
+    end = len(buf) if end is None else end
+    while pos < end:
+        key, pos = _varint(buf, pos)
+        number, wire = key >> 3, key & 7
+        if number == 0:
+            raise ValueError("Invalid field number 0.")
+        if wire == _VARINT:
+            value, pos = _varint(buf, pos)
+        elif wire == _LENGTH:
+            length, pos = _varint(buf, pos)
+            value = (pos, pos + length)
+            pos += length
+        elif wire == _FIXED64:
+            value, pos = buf[pos:pos + 8], pos + 8
+        elif wire == _FIXED32:
+            value, pos = buf[pos:pos + 4], pos + 4
+        else:
+            raise ValueError("Unsupported wire type " + str(wire) + ".")
+        if pos > end:
+            raise ValueError("Truncated message.")
+        yield number, wire, value
+
+
+def _string(buf, span) -> str:
+    return bytes(buf[span[0]:span[1]]).decode('utf-8', errors='replace')
+
+
+def _value_info(buf, span) -> dict:
+    """Parse a ValueInfoProto into its name, element type and shape."""
+    info = {'name': "", 'elem_type': None, 'shape': None}
+    for number, wire, value in fields(buf, *span):
+        if number == 1 and wire == _LENGTH:
+            info['name'] = _string(buf, value)
+        elif number == 2 and wire == _LENGTH:  # TypeProto
+            for t_number, t_wire, t_value in fields(buf, *value):
+                if t_number != 1 or t_wire != _LENGTH:  # tensor_type only
+                    continue
+                for n, w, v in fields(buf, *t_value):
+                    if n == 1 and w == _VARINT:
+                        info['elem_type'] = v
+                    elif n == 2 and w == _LENGTH:  # TensorShapeProto
+                        info['shape'] = []
+                        for _, d_wire, d_value in fields(buf, *v):
+                            dim = None
+                            for dn, dw, dv in fields(buf, *d_value):
+                                if dn == 1 and dw == _VARINT:
+                                    dim = dv
+                                elif dn == 2 and dw == _LENGTH:
+                                    dim = _string(buf, dv)
+                            info['shape'].append(dim)
+    return info
+
+
+def _initializer(buf, span) -> dict:
+    """Parse the name and external-data references of a TensorProto, skipping its data."""
+    tensor = {'name': "", 'external': None}
+    external, is_external = {}, False
+    for number, wire, value in fields(buf, *span):
+        if number == 8 and wire == _LENGTH:
+            tensor['name'] = _string(buf, value)
+        elif number == 13 and wire == _LENGTH:  # StringStringEntryProto
+            entry = {n: _string(buf, v) for n, w, v in fields(buf, *value) if w == _LENGTH}
+            external[entry.get(1, "")] = entry.get(2, "")
+        elif number == 14 and wire == _VARINT:  # data_location, 1 is EXTERNAL
+            is_external = value == 1
+    if is_external:
+        tensor['external'] = external
+    return tensor
+
+
+# Fields of a TensorProto holding its data (float, int32, int64, raw, double and uint64 data).
+_TENSOR_DATA = (4, 5, 7, 9, 10, 11)
+
+
+def _tensor_data(buf, span, spans: list):
+    for number, wire, value in fields(buf, *span):
+        if number in _TENSOR_DATA and wire == _LENGTH:
+            spans.append(value)
+
+
+def tensor_spans(path: str, min_size: int = 0) -> list:
+    """The byte ranges of the tensor data in an .onnx file (the initializers and the constants of the main graph).
+        Args:
+            path: The path of the .onnx file.
+            min_size: Ranges shorter than this are left out.
+        Returns:
+            Sorted list of (start, end) offsets in the file.
+        Raises:
+            ValueError if the file is not a valid onnx protobuf.
+    """
+
+    spans = []
+    if os.path.getsize(path) == 0:
+        return spans
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        for number, wire, value in fields(buf):
+            if number != 7 or wire != _LENGTH:  # GraphProto
+                continue
+            for g_number, g_wire, g_value in fields(buf, *value):
+                if g_number == 5 and g_wire == _LENGTH:  # initializer
+                    _tensor_data(buf, g_value, spans)
+                elif g_number == 1 and g_wire == _LENGTH:  # NodeProto: tensor attributes (e.g. of Constant)
+                    for n_number, n_wire, n_value in fields(buf, *g_value):
+                        if n_number != 5 or n_wire != _LENGTH:
+                            continue
+                        for a_number, a_wire, a_value in fields(buf, *n_value):
+                            if a_number == 5 and a_wire == _LENGTH:
+                                _tensor_data(buf, a_value, spans)
+    return sorted(span for span in spans if span[1] - span[0] >= min_size)
+
+
+def read_info(path: str) -> dict:
+    """Read the metadata of an .onnx file without loading it in memory.
+        Args:
+            path: The path of the .onnx file.
+        Returns:
+            Dictionary with 'size', 'ir_version', 'producer', 'opsets' (domain -> version), 'nodes',
+            'inputs', 'outputs' (lists of value infos) and 'external_data' (list of referenced files
+            with the required 'size').
+        Raises:
+            ValueError if the file is not a valid onnx protobuf.
+    """
+
+    size = os.path.getsize(path)
+    if size == 0:
+        raise ValueError("The file is empty.")
+    info = {'size': size, 'ir_version': None, 'producer': "", 'opsets': {}, 'nodes': 0,
+            'inputs': [], 'outputs': [], 'external_data': [], 'graph': False}
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        for number, wire, value in fields(buf):
+            if number == 1 and wire == _VARINT:
+                info['ir_version'] = value
+            elif number == 2 and wire == _LENGTH:
+                info['producer'] = _string(buf, value)
+            elif number == 8 and wire == _LENGTH:  # OperatorSetIdProto
+                opset = {n: v for n, w, v in fields(buf, *value)}
+                domain = _string(buf, opset[1]) if 1 in opset else ""
+                info['opsets'][domain] = opset.get(2)
+            elif number == 7 and wire == _LENGTH:  # GraphProto
+                info['graph'] = True
+                initializers = set()
+                external = {}
+                for g_number, g_wire, g_value in fields(buf, *value):
+                    if g_wire != _LENGTH:
+                        continue
+                    if g_number == 1:
+                        info['nodes'] += 1
+                    elif g_number == 5:
+                        tensor = _initializer(buf, g_value)
+                        initializers.add(tensor['name'])
+                        if tensor['external'] is not None:
+                            location = tensor['external'].get('location', "")
+                            needed = int(tensor['external'].get('offset') or 0) + \
+                                int(tensor['external'].get('length') or 0)
+                            external[location] = max(external.get(location, 0), needed)
+                    elif g_number == 11:
+                        info['inputs'].append(_value_info(buf, g_value))
+                    elif g_number == 12:
+                        info['outputs'].append(_value_info(buf, g_value))
+                # Older models also list their initializers as graph inputs.
+                info['inputs'] = [i for i in info['inputs'] if i['name'] not in initializers]
+                info['external_data'] = [{'location': k, 'size': v} for k, v in external.items()]
+    return info
+
+
+if __name__ == '__main__':
+    print("No command line options available for _onnx.py.")
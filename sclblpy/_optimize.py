@@ -0,0 +1,134 @@
+# File contains the (private) size optimiser of .onnx files, run before an upload (upload_model(..., optimize=...)).
+# Requires the onnx package. The model is loaded once (external data stays on disk) and rewritten in place:
+# doc strings are stripped, initializers no node uses are removed, identical initializers are merged, and with
+# 'fp16' large float32 weights are stored as float16 and cast back to float32 when the model runs.
+import hashlib
+
+# Float32 initializers with fewer elements are not converted to float16 (a Cast node would outweigh the savings).
+FP16_MIN_ELEMENTS: int = 1024
+
+# Largest finite float16 value; weights beyond it are kept as float32.
+_FP16_MAX = 65504.0
+
+
+def _graphs(graph):
+    """The graph and all its subgraphs (the bodies of If, Loop, Scan, ...)."""
+    yield graph
+    for node in graph.node:
+        for attr in node.attribute:
+            if attr.HasField('g'):
+                yield from _graphs(attr.g)
+            for sub in attr.graphs:
+                yield from _graphs(sub)
+
+
+def _external(tensor) -> bool:
+    return tensor.data_location == 1  # EXTERNAL
+
+
+def _strip_doc_strings(model) -> int:
+    count = 0
+    for message in [model] + [graph for graph in _graphs(model.graph)]:
+        count += bool(message.doc_string)
+        message.ClearField('doc_string')
+    for graph in _graphs(model.graph):
+        for message in list(graph.node) + list(graph.initializer) + list(graph.input) + list(graph.output) + \
+                list(graph.value_info):
+            count += bool(message.doc_string)
+            message.ClearField('doc_string')
+    return count
+
+
+def _remove_unused(model) -> int:
+    """Remove the initializers of the main graph that no node (of any subgraph) or graph output uses."""
+    graph = model.graph
+    used = set()
+    for g in _graphs(graph):
+        used.update(name for node in g.node for name in node.input)
+        used.update(output.name for output in g.output)
+    unused = [tensor for tensor in graph.initializer if tensor.name not in used]
+    names = {tensor.name for tensor in unused}
+    for tensor in unused:
+        graph.initializer.remove(tensor)
+    # Older models also list their initializers as graph inputs.
+    for value in [value for value in graph.input if value.name in names]:
+        graph.input.remove(value)
+    return len(unused)
+
+
+def _merge_duplicates(model) -> int:
+    """Replace initializers identical to an earlier one (type, shape and data) by references to it."""
+    graph = model.graph
+    fixed = {value.name for value in graph.input} | {value.name for value in graph.output}
+    kept, renamed, duplicates = {}, {}, []
+    for tensor in graph.initializer:
+        if _external(tensor) or tensor.name in fixed:
+            continue
+        name = tensor.name
+        tensor.name = ""
+        key = hashlib.sha256(tensor.SerializeToString()).digest()
+        tensor.name = name
+        if key in kept:
+            renamed[name] = kept[key]
+            duplicates.append(tensor)
+        else:
+            kept[key] = name
+    for tensor in duplicates:
+        graph.initializer.remove(tensor)
+    for g in _graphs(graph):
+        for node in g.node:
+            for i, name in enumerate(node.input):
+                if name in renamed:
+                    node.input[i] = renamed[name]
+    return len(duplicates)
+
+
+def _to_fp16(model) -> int:
+    """Store large float32 initializers as float16, each followed by a Cast back to float32."""
+    import numpy as np
+    from onnx import TensorProto, helper, numpy_helper
+    graph = model.graph
+    fixed = {value.name for value in graph.input} | {value.name for value in graph.output}
+    casts, count = [], 0
+    for tensor in graph.initializer:
+        if tensor.data_type != TensorProto.FLOAT or _external(tensor) or tensor.name in fixed:
+            continue
+        array = numpy_helper.to_array(tensor)
+        if array.size < FP16_MIN_ELEMENTS or not np.all(np.abs(array) <= _FP16_MAX):
+            continue
+        name = tensor.name
+        tensor.CopyFrom(numpy_helper.from_array(array.astype(np.float16), name + "_fp16"))
+        casts.append(helper.make_node('Cast', [tensor.name], [name], to=TensorProto.FLOAT, name=name + "_cast"))
+        count += 1
+    # The casts go first, so the nodes stay in topological order.
+    nodes = casts + list(graph.node)
+    graph.ClearField('node')
+    graph.node.extend(nodes)
+    return count
+
+
+def optimize(path: str, output: str, fp16: bool = False) -> dict:
+    """Write a smaller version of an .onnx file to output.
+        Args:
+            path: The .onnx file.
+            output: The file to write (in the directory of path, so references to external data still resolve).
+            fp16: Whether to also store large float32 weights as float16.
+        Returns:
+            Dictionary with the number of 'doc_strings' stripped, 'unused_initializers' removed,
+            'duplicate_initializers' merged and 'fp16_initializers' converted.
+        Raises:
+            ImportError if onnx is not installed.
+    """
+
+    import onnx  # optional dependency
+    model = onnx.load(path, load_external_data=False)
+    report = {'doc_strings': _strip_doc_strings(model), 'unused_initializers': _remove_unused(model),
+              'duplicate_initializers': _merge_duplicates(model), 'fp16_initializers': 0}
+    if fp16:
+        report['fp16_initializers'] = _to_fp16(model)
+    onnx.save(model, output)
+    return report
+
+
+if __name__ == '__main__':
+    print("No command line options available for _optimize.py.")
@@ -0,0 +1,344 @@
+# File contains the (private) offline outbox for mutating calls, used when OUTBOX is set in _globals.
+# A mutation (e.g. update_device) that cannot reach the API is appended to a journal in the user data directory
+# (OUTBOX_FILE, one JSON entry per line, flushed to disk before the call returns) instead of being lost. A
+# background thread replays the journal in order once the API is reachable again: repeated updates of the same
+# resource are deduplicated (the last one wins) and consecutive additions to the same resource are sent as one
+# request. Replayed entries are acknowledged in the journal, which is truncated once it is empty. Entries left by a
+# previous process are replayed from the moment the package is imported.
+# Several processes may share the journal: it is only read and written while holding a lock on OUTBOX_FILE.lock,
+# and only the process holding OUTBOX_FILE.drain.lock replays it; the others leave their entries to that one.
+import contextlib
+import json
+import os
+import threading
+import time
+import requests as req
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+from sclblpy._globals import OUTBOX, OUTBOX_FILE, JWT_JSON_FILE
+from sclblpy import _http, _deadline
+from sclblpy._log import get_logger
+
+logger = get_logger('outbox')
+
+# Responses rejecting a mutation for good: the entry is dropped. Other responses of 400 and above (the API or the
+# gateway in front of it is unreachable or overloaded, the token expired or was revoked, ...) keep it for a later drain.
+_REJECTED = (400, 404, 405, 409, 410, 413, 415, 422)
+# Responses after which the tokens are renewed before the entry is retried.
+_UNAUTHORIZED = (401, 403)
+
+# Seconds between replay attempts while the API is unreachable (doubling from the first to the last).
+MIN_RETRY_DELAY: float = 1
+MAX_RETRY_DELAY: float = 60
+
+_counts = {'queued': 0, 'sent': 0, 'dropped': 0, 'merged': 0}
+_rate = 0.0  # entries per second replayed by the last drain
+_lock = threading.RLock()
+_drain_lock = threading.Lock()
+_worker = None
+
+
+@contextlib.contextmanager
+def _locked(path: str, blocking: bool = True):
+    """Hold an exclusive lock on path, shared by all processes. Yields False if blocking is False and another
+    process holds the lock."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a+') as f:
+        f.seek(0)
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            else:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+        except OSError:
+            if blocking:
+                raise
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextlib.contextmanager
+def _journal():
+    """Hold the journal, for this thread and process only."""
+    with _lock, _locked(OUTBOX_FILE + ".lock"):
+        yield
+
+
+def _load() -> tuple:
+    """The pending entries of the journal, in order, and the number of acknowledgements in it (since it was last
+    compacted). Called while holding the journal."""
+    entries, acked = {}, set()
+    try:
+        with open(OUTBOX_FILE) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by a crash while it was being written
+                if 'ack' in record:
+                    acked.add(record['ack'])
+                else:
+                    entries[record['seq']] = record
+    except FileNotFoundError:
+        pass
+    return [entry for seq, entry in sorted(entries.items()) if seq not in acked], len(acked)
+
+
+def _append(records: list):
+    """Append records to the journal and flush them to disk."""
+    with open(OUTBOX_FILE, 'a') as f:
+        f.write("".join(json.dumps(record) + "\n" for record in records))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _compact(pending: list):
+    """Rewrite the journal with only the pending entries (atomically, as the JWT file)."""
+    tmp = OUTBOX_FILE + "." + str(os.getpid()) + ".tmp"
+    with open(tmp, 'w') as f:
+        f.write("".join(json.dumps(entry) + "\n" for entry in pending))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, OUTBOX_FILE)
+
+
+def offline(url: str) -> bool:
+    """True if mutations are to be queued: OUTBOX is set and the service at url cannot be reached now."""
+    return OUTBOX and not _http.reachable(url)
+
+
+def depth() -> int:
+    """Number of mutations waiting in the outbox."""
+    if not OUTBOX:
+        return 0
+    with _journal():
+        return len(_load()[0])
+
+
+def enqueue(method: str, url: str, json_: object = None, batch: str = None):
+    """Journal a mutation to be replayed later.
+        Args:
+            method: The HTTP method ('POST', 'PATCH', 'DELETE').
+            url: The URL of the request.
+            json_: The JSON body of the request.
+            batch: How consecutive entries for the same URL are merged: 'list' concatenates list bodies, any
+                other value names the list field of the body to concatenate. None if they cannot be merged.
+    """
+
+    with _journal():
+        pending = _load()[0]
+        seq = max(pending[-1]['seq'] + 1 if pending else 0, int(time.time() * 1000))
+        entry = {'seq': seq, 'time': time.time(), 'method': method, 'url': url, 'json': json_, 'batch': batch}
+        _append([entry])
+        _counts['queued'] += 1
+    _start()
+
+
+def request(method: str, url: str, headers: dict = None, json: object = None, batch: str = None):
+    """Send a mutating request, or queue it in the outbox if OUTBOX is set and the API is unreachable.
+    While mutations are queued, new ones are queued behind them, so they reach the API in order.
+        Returns:
+            The response; None if the request was queued.
+        Raises:
+            requests exceptions, as _http.request, if OUTBOX is not set.
+    """
+
+    if OUTBOX and depth():
+        enqueue(method, url, json, batch)
+        return None
+    try:
+        resp = _http.request(method, url, headers=headers, json=json)
+    except req.exceptions.ConnectionError:
+        if not OUTBOX:
+            raise
+        enqueue(method, url, json, batch)
+        return None
+    if OUTBOX and resp.status_code in (502, 503, 504):
+        enqueue(method, url, json, batch)
+        return None
+    return resp
+
+
+def _plan(pending: list) -> list:
+    """Group the pending entries into requests, in order.
+    A PATCH of a resource replaced by a later PATCH of it is skipped, and consecutive batchable entries for
+    the same URL are merged into one request.
+        Returns:
+            List of (entry to send, seqs acknowledged by sending it).
+    """
+
+    last_patch = {}
+    for entry in pending:
+        if entry['method'] == 'PATCH':
+            last_patch[entry['url']] = entry['seq']
+    plan = []
+    for entry in pending:
+        if entry['method'] == 'PATCH' and last_patch[entry['url']] != entry['seq']:
+            plan.append((None, [entry['seq']]))  # superseded: only acknowledged
+            continue
+        if plan and plan[-1][0] is not None and _mergeable(plan[-1][0], entry):
+            merged, seqs = plan[-1]
+            plan[-1] = (_merge(merged, entry), seqs + [entry['seq']])
+            continue
+        if plan and plan[-1][0] is not None and _same(plan[-1][0], entry):
+            plan[-1][1].append(entry['seq'])  # an exact repetition of the previous request
+            continue
+        plan.append((entry, [entry['seq']]))
+    return plan
+
+
+def _same(a: dict, b: dict) -> bool:
+    return (a['method'], a['url'], a['json']) == (b['method'], b['url'], b['json'])
+
+
+def _mergeable(a: dict, b: dict) -> bool:
+    return a['batch'] is not None and (a['method'], a['url'], a['batch']) == (b['method'], b['url'], b['batch'])
+
+
+def _merge(a: dict, b: dict) -> dict:
+    """One entry with the items of both; items already present are not repeated."""
+    if a['batch'] == 'list':
+        items = a['json'] + [item for item in b['json'] if item not in a['json']]
+        return dict(a, json=items)
+    field = a['batch']
+    items = a['json'][field] + [item for item in b['json'][field] if item not in a['json'][field]]
+    return dict(a, json=dict(a['json'], **{field: items}))
+
+
+def _acknowledge(seqs: list):
+    with _journal():
+        _append([{'ack': seq} for seq in seqs])
+        # Read again: other processes may have appended entries since the plan was made.
+        pending, acks = _load()
+        if not pending or acks > 1000:
+            _compact(pending)
+
+
+@_deadline.bounded(priority='bulk')
+def drain_outbox() -> int:
+    """Replay the mutations queued in the outbox, in order (see OUTBOX in _globals).
+    Replay stops at the first mutation the API cannot take yet (unreachable, overloaded, or not authorised until
+    the tokens are renewed); it is retried on the next drain. Mutations the API rejects for good (400, 404, 409,
+    422, ...) are dropped and logged. While another process replays the journal, nothing is sent.
+        Returns:
+            The number of queued mutations that remain.
+    """
+
+    from sclblpy.auth import _check_jwt  # imported here: auth depends on the transport this module wraps
+    with _drain_lock, _locked(OUTBOX_FILE + ".drain.lock", blocking=False) as owner:
+        if not owner:
+            logger.debug("The outbox is replayed by another process.")
+            return depth()
+        with _journal():
+            plan = _plan(_load()[0])
+        if not plan:
+            return 0
+        start, done = time.monotonic(), 0
+        for entry, seqs in plan:
+            if entry is not None:
+                if not _check_jwt():
+                    break
+                with open(JWT_JSON_FILE) as f:
+                    jwt_ = json.load(f)
+                headers = {'Authorization': f"Bearer {jwt_['JWT_ACCESS_TOKEN']}"}
+                try:
+                    resp = _http.request(entry['method'], entry['url'], headers=headers, json=entry['json'])
+                except req.exceptions.RequestException as e:
+                    logger.debug("Outbox replay of %s %s failed: %s", entry['method'], entry['url'], e)
+                    break
+                if resp.status_code in _UNAUTHORIZED:
+                    # The token was revoked or expired early: renew it (the entry is sent on the next drain).
+                    logger.warning("Queued %s %s was not authorised (%s); renewing the tokens.", entry['method'],
+                                   entry['url'], resp.status_code)
+                    _check_jwt(time_refresh=float('inf'))
+                    break
+                if resp.status_code >= 400 and resp.status_code not in _REJECTED:
+                    logger.debug("Outbox replay of %s %s: %s", entry['method'], entry['url'], resp.status_code)
+                    break
+                if resp.status_code >= 400:
+                    logger.error("Queued %s %s was rejected (%s) and is dropped: %s", entry['method'], entry['url'],
+                                 resp.status_code, resp.text)
+                    _counts['dropped'] += len(seqs)
+                else:
+                    _counts['sent'] += len(seqs)
+                    _counts['merged'] += len(seqs) - 1
+            else:
+                _counts['merged'] += 1
+            _acknowledge(seqs)
+            done += len(seqs)
+        global _rate
+        if done:
+            _rate = done / max(time.monotonic() - start, 1e-6)
+            logger.info("Replayed %d queued mutation(s) from the outbox.", done)
+        return depth()
+
+
+def _drain_forever():
+    """Drain the outbox in the background, backing off while the API is unreachable."""
+    global _worker
+    from sclblpy import auth
+    auth._background.active = True  # nobody is there to answer a credentials prompt
+    delay, before = MIN_RETRY_DELAY, depth()
+    while True:
+        try:
+            left = drain_outbox()
+        except Exception as e:  # keep the worker alive; the entries stay journaled
+            logger.error("Outbox replay failed: %s", e)
+            left = depth()
+        with _lock:
+            if not left and not depth():
+                _worker = None
+                return
+        # Back off while no progress is made.
+        delay = MIN_RETRY_DELAY if left < before else min(MAX_RETRY_DELAY, delay * 2)
+        before = left
+        time.sleep(delay)
+
+
+def _start():
+    """Start the background replay of the outbox, unless it is running."""
+    global _worker
+    with _lock:
+        if _worker is None:
+            _worker = threading.Thread(target=_drain_forever, name="sclblpy-outbox", daemon=True)
+            _worker.start()
+
+
+def _resume():
+    """Replay the mutations a previous process left in the journal, in the background."""
+    left = depth()
+    if left:
+        logger.info("%d queued mutation(s) found in the outbox.", left)
+        _start()
+
+
+def outbox_stats() -> dict:
+    """Return the state of the offline outbox (see OUTBOX).
+        Returns:
+            Dictionary with the 'depth' (mutations waiting), the age in seconds of the 'oldest' one, the number of
+            mutations 'queued', 'sent', 'merged' (deduplicated or batched into another request) and 'dropped'
+            (rejected by the API) by this process, and the 'drain_rate' (mutations per second) of the last replay.
+    """
+
+    with _journal():
+        pending = _load()[0] if OUTBOX else []
+        oldest = time.time() - pending[0]['time'] if pending else 0.0
+        return dict(_counts, depth=len(pending), oldest=oldest, drain_rate=_rate)
+
+
+if OUTBOX:
+    _resume()
+
+if __name__ == '__main__':
+    print("No command line options available for _outbox.py.")
@@ -0,0 +1,267 @@
+# File contains the (private) helpers for streaming model uploads.
+import gzip
+import hashlib
+import os
+import threading
+import time
+import uuid as uuid_
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from sclblpy._globals import POOL_SIZE
+from sclblpy import _deadline
+from sclblpy._log import get_logger
+
+logger = get_logger('upload')
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Content-Encodings the server answered with 415 Unsupported Media Type; uploads fall back to raw bytes.
+rejected_encodings: set = set()
+
+# Services (API base URLs) without the external-data routes, and those whose routes were probed (OPTIONS): models
+# are uploaded to the former as a single onnx file, without their external-data files.
+no_external_data: set = set()
+probed_external_data: set = set()
+
+# Files larger than this are compressed by several threads.
+PARALLEL_COMPRESSION_SIZE: int = 64 * 1024 ** 2
+
+
+def executor() -> ThreadPoolExecutor:
+    """The thread pool shared by all parallel file uploads of the process (at most POOL_SIZE threads, as many as
+    there are pooled connections)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="sclblpy-upload")
+    return _pool
+
+
+class MultipartReader:
+    """File-like multipart/form-data body with a single file part.
+    The file is streamed from disk while the request is sent, so memory use does not grow with
+    the size of the model. Every chunk read is reported to the progress callback. Reading stops the
+    upload (raising Cancelled or DeadlineExceeded) once the call is cancelled or its deadline passed.
+    """
+
+    def __init__(self, fields: dict, name: str, path: str, progress=None, chunk_size: int = 1024 ** 2,
+                 file=None, filename: str = None):
+        boundary = uuid_.uuid4().hex
+        self.content_type = "multipart/form-data; boundary=" + boundary
+        head = b""
+        for key, value in fields.items():
+            head += (f'--{boundary}\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n'
+                     f'{value}\r\n').encode()
+        head += (f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; '
+                 f'filename="{filename or os.path.basename(path)}"\r\n'
+                 f'Content-Type: application/octet-stream\r\n\r\n').encode()
+        tail = f"\r\n--{boundary}--\r\n".encode()
+        # The part is read from path, or from file (a file-like object with a length) if given; it is named
+        # filename, or after path.
+        self._file = open(path, 'rb') if file is None else file
+        self._segments = [head, self._file, tail]
+        self._length = len(head) + (os.path.getsize(path) if file is None else len(file)) + len(tail)
+        self._progress = progress
+        self._chunk_size = chunk_size
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(self._chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def read(self, size: int = -1) -> bytes:
+        _deadline.remaining()
+        if size is None or size < 0:
+            size = self._length
+        out = b""
+        while self._segments and len(out) < size:
+            segment = self._segments[0]
+            if isinstance(segment, bytes):
+                taken = size - len(out)
+                out += segment[:taken]
+                if segment[taken:]:
+                    self._segments[0] = segment[taken:]
+                else:
+                    self._segments.pop(0)
+            else:
+                data = segment.read(size - len(out))
+                if not data:
+                    self._segments.pop(0)
+                    continue
+                if self._progress is not None:
+                    self._progress(len(data))
+                out += data
+        return out
+
+    def close(self):
+        self._file.close()
+
+
+class FileReader:
+    """File-like body streaming a file from disk; reports progress and computes the SHA-256 of what was read.
+    Reading stops the upload (raising Cancelled or DeadlineExceeded) once the call is cancelled or its
+    deadline passed.
+    """
+
+    def __init__(self, path: str, progress=None, chunk_size: int = 1024 ** 2):
+        self._file = open(path, 'rb')
+        self._length = os.path.getsize(path)
+        self._progress = progress
+        self._chunk_size = chunk_size
+        self._sha256 = hashlib.sha256()
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(self._chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def read(self, size: int = -1) -> bytes:
+        _deadline.remaining()
+        data = self._file.read(size)
+        self._sha256.update(data)
+        if data and self._progress is not None:
+            self._progress(len(data))
+        return data
+
+    def hexdigest(self) -> str:
+        return self._sha256.hexdigest()
+
+    def close(self):
+        self._file.close()
+
+
+class ByteBudget:
+    """Caps the number of bytes in flight over concurrent uploads.
+    A single upload larger than the budget takes the whole budget, so it never blocks forever.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._used = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, size: int) -> int:
+        size = min(size, self.limit)
+        with self._cond:
+            while self._used + size > self.limit:
+                _deadline.remaining()
+                self._cond.wait(0.5)
+            self._used += size
+        return size
+
+    def release(self, size: int):
+        with self._cond:
+            self._used -= size
+            self._cond.notify_all()
+
+
+class Progress:
+    """Thread-safe aggregate of the bytes sent by concurrent uploads."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.sent = 0
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def add(self, size: int):
+        with self._lock:
+            self.sent += size
+
+    def report(self) -> str:
+        elapsed = max(time.time() - self.started, 1e-9)
+        percent = 100.0 * self.sent / self.total if self.total else 100.0
+        return f"Uploaded {self.sent / 1024 ** 2:.1f} of {self.total / 1024 ** 2:.1f} MB " \
+               f"({percent:.0f}%, {self.sent / 1024 ** 2 / elapsed:.1f} MB/s)"
+
+    def start_reporting(self, interval: float) -> threading.Event:
+        """Print the aggregate progress every interval seconds until the returned event is set."""
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval):
+                logger.info(self.report())
+
+        threading.Thread(target=run, daemon=True).start()
+        return stop
+
+
+def compressed(chunks, encoding: str, level: int = 6, threads: int = 1, chunk_size: int = 4 * 1024 ** 2):
+    """Compress a stream of byte chunks on the fly.
+    With a single thread the stream is compressed incrementally. With several threads, gzip compresses
+    fixed-size blocks concurrently into independent gzip members (a concatenation of gzip members is
+    a valid gzip stream) and zstd uses its own worker threads. At most 2 * threads blocks are buffered.
+        Args:
+            chunks: Iterable of bytes.
+            encoding: 'gzip' or 'zstd'.
+            level: Compression level.
+            threads: Number of compression threads.
+            chunk_size: Size of the blocks compressed in parallel.
+        Yields:
+            Compressed bytes.
+    """
+
+    if encoding == 'zstd':
+        import zstandard  # optional dependency
+        compressor = zstandard.ZstdCompressor(level=min(level, 19), threads=threads if threads > 1 else 0)
+        stream = compressor.compressobj()
+        for chunk in chunks:
+            out = stream.compress(chunk)
+            if out:
+                yield out
+        yield stream.flush()
+        return
+
+    if threads <= 1:
+        stream = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+        for chunk in chunks:
+            out = stream.compress(chunk)
+            if out:
+                yield out
+        yield stream.flush()
+        return
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        pending = deque()
+        for block in _blocks(chunks, chunk_size):
+            pending.append(pool.submit(gzip.compress, block, level))
+            if len(pending) >= 2 * threads:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def compression_threads(size: int) -> int:
+    """Number of compression threads for a file of the given size."""
+    if size < PARALLEL_COMPRESSION_SIZE:
+        return 1
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+def _blocks(chunks, size: int):
+    """Regroup a stream of byte chunks into blocks of (at least) size bytes."""
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        if len(buffer) >= size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+if __name__ == '__main__':
+    print("No command line options available for _upload.py.")
@@ -4,8 +4,20 @@ import time
 import json
 import jwt
 import os
-from sclblpy._globals import DEBUG, SILENT, AUTH_MANAGER_URL, USER_CREDENTIALS, JWT_JSON_FILE
-from sclblpy.errors import LoginError, JWTError, RegisterError, UserDetailsError, PwdError
+import sys
+import threading
+from sclblpy._globals import DEBUG, HEADLESS, AUTH_MANAGER_URL, USER_CREDENTIALS, JWT_JSON_FILE
+from sclblpy import _http, _codec, _deadline
+from sclblpy.errors import LoginError, JWTError, RegisterError, UserDetailsError, PwdError, \
+    Cancelled, DeadlineExceeded
+from sclblpy._log import get_logger
+
+logger = get_logger('auth')
+
+_lock = threading.Lock()
+_background = threading.local()  # background threads (e.g. the outbox replay) set .active: they never prompt
+_provider = None  # credentials provider registered with set_credentials_provider
+_headless = HEADLESS  # changed with set_headless
 
 
 def _check_jwt(time_refresh=120, time_renew=3600) -> bool:
@@ -16,7 +28,10 @@ def _check_jwt(time_refresh=120, time_renew=3600) -> bool:
     Returns
         True when a valid and fresh AccessToken string is located.
     Note, if no RefreshToken string is present, or the RefreshToken string has expired,
-    the function tries to prompt user for email and password and subsequently sign in.
+    the function signs in again with the credentials of the first credential provider that has
+    them (see _credentials), and only prompts the user for email and password when none has them
+    and the prompt can be answered (see _interactive). Renewals are serialised: concurrent callers wait
+    for the thread that renews the tokens and then reuse its result.
         Args:
             time_refresh: int, seconds before an AccessToken is requested.
             time_renew: int, seconds before a RefreshToken is requested.
@@ -24,52 +39,191 @@ def _check_jwt(time_refresh=120, time_renew=3600) -> bool:
             True if an AccessToken string is present and valid. False otherwise.
     """
 
-    now: float = time.time()
-    with open(JWT_JSON_FILE) as f:
-        jwt_ = json.load(f)
+    jwt_ = _read_jwt()
+    if _fresh(jwt_, time.time(), time_refresh, time_renew):
+        return True
 
-    # if the RefreshToken doesn't exist or expired
-    if not jwt_['JWT_REFRESH_TOKEN'] or jwt_['JWT_REFRESH_EXP'] < now:
-        print("Session expired")
-        email: str = input("Please provide your email: ")
-        password: str = input("Please provide your password: ")
-        try:
-            return log_in(email, password)
-        except LoginError as e:
-            if not SILENT:
-                print("JWT error: sign in failed:" + str(e))
-            if DEBUG:
-                raise JWTError("Sign in failed. " + str(e))
-            return False
+    try:
+        left = _deadline.remaining()
+    except (Cancelled, DeadlineExceeded) as e:
+        logger.error("JWT error: " + str(e))
+        return False
+    if not _lock.acquire(timeout=-1 if left is None else left):
+        logger.error("JWT error: the deadline of the call passed while waiting for the token renewal.")
+        return False
+    try:
+        # Another thread may have renewed the tokens while we were waiting for the lock.
+        now: float = time.time()
+        jwt_ = _read_jwt()
+        if _fresh(jwt_, now, time_refresh, time_renew):
+            return True
 
-    # if the RefreshToken exist and needs a refresh
-    if jwt_['JWT_REFRESH_TOKEN'] and jwt_['JWT_REFRESH_EXP'] - now < time_renew:
-        try:
-            return _refresh_jwt(jwt_['JWT_REFRESH_TOKEN'], True)
-        except JWTError as e:
-            if not SILENT:
-                print("JWT error: refresh failed:" + str(e))
-            if DEBUG:
-                raise JWTError("Unable to refresh JWT TOKEN. " + str(e))
-            return False
+        # if the RefreshToken doesn't exist or expired
+        if not jwt_.get('JWT_REFRESH_TOKEN') or (jwt_.get('JWT_REFRESH_EXP') or 0) < now:
+            try:
+                return _sign_in()
+            except LoginError as e:
+                logger.error("JWT error: sign in failed:" + str(e))
+                if DEBUG:
+                    raise JWTError("Sign in failed. " + str(e))
+                return False
+
+        # if the RefreshToken exist and needs a refresh
+        if jwt_['JWT_REFRESH_EXP'] - now < time_renew:
+            try:
+                return _refresh_jwt(jwt_['JWT_REFRESH_TOKEN'], True)
+            except JWTError as e:
+                logger.error("JWT error: refresh failed:" + str(e))
+                if DEBUG:
+                    raise JWTError("Unable to refresh JWT TOKEN. " + str(e))
+                return False
 
-    # if the Accesstoken doesn't exist or needs a refresh
-    if not jwt_['JWT_ACCESS_TOKEN'] or jwt_['JWT_EXP'] - now < time_refresh:
+        # the AccessToken doesn't exist or needs a refresh
         try:
             if _refresh_jwt(jwt_['JWT_REFRESH_TOKEN']):
                 return True
             else:
                 return False
         except JWTError as e:
-            if not SILENT:
-                print("JWT error: refresh failed:" + str(e))
+            logger.error("JWT error: refresh failed:" + str(e))
             if DEBUG:
                 raise JWTError("Unable to refresh JWT TOKEN. " + str(e))
             return False
+    finally:
+        _lock.release()
 
-    # JWT token is present and no need to refresh yet:
-    if jwt_['JWT_ACCESS_TOKEN']:
-        return True
+
+def _fresh(jwt_: dict, now: float, time_refresh: int, time_renew: int) -> bool:
+    """True if neither the RefreshToken nor the AccessToken needs renewing."""
+    return bool(jwt_.get('JWT_REFRESH_TOKEN') and (jwt_.get('JWT_REFRESH_EXP') or 0) - now >= time_renew and
+                jwt_.get('JWT_ACCESS_TOKEN') and (jwt_.get('JWT_EXP') or 0) - now >= time_refresh)
+
+
+def _read_jwt() -> dict:
+    """Read the stored tokens; missing or unreadable storage counts as signed out."""
+    try:
+        with open(JWT_JSON_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'JWT_REFRESH_TOKEN': None, 'JWT_REFRESH_EXP': 0, 'JWT_EXP': 0, 'JWT_USER_ID': None,
+                'JWT_ACCESS_TOKEN': None}
+
+
+def _write_jwt(jwt_: dict):
+    """Store the tokens atomically, so that other threads and processes never read a partial file."""
+    tmp = JWT_JSON_FILE + "." + str(os.getpid()) + "." + str(threading.get_ident()) + ".tmp"
+    with open(tmp, 'w') as f:
+        json.dump(jwt_, f)
+    os.replace(tmp, JWT_JSON_FILE)
+
+
+def set_credentials_provider(provider) -> None:
+    """Register a callback that supplies credentials to sign in again when the session has expired,
+    e.g. by reading them from a secrets manager. The callback is called without arguments (only when a
+    new sign in is needed) and returns a dictionary with 'Email' and 'Password', a dictionary with a
+    service 'Token', or None if it has no credentials.
+        Args:
+            provider: The callback, or None to remove it.
+    """
+    global _provider
+    _provider = provider
+
+
+def set_headless(headless: bool = True) -> None:
+    """Never prompt for credentials (or prompt again) when the session has expired and no credential provider
+    has credentials, e.g. in a containerised worker whose stdin is open but never answered. The SCLBL_HEADLESS
+    environment variable ('1', 'true' or 'yes') also disables the prompt.
+        Args:
+            headless: True to never prompt, False to prompt again.
+    """
+    global _headless
+    _headless = headless
+
+
+def _interactive() -> bool:
+    """Whether a prompt can be answered: not headless, not in a background thread, and stdin is a terminal or
+    the process is a notebook kernel (whose stdin is not a tty, but forwards input() to the notebook)."""
+    if _headless or os.environ.get('SCLBL_HEADLESS', "").lower() in ("1", "true", "yes"):
+        return False
+    if getattr(_background, 'active', False) or sys.stdin is None:
+        return False
+    try:
+        if sys.stdin.isatty():
+            return True
+    except (AttributeError, ValueError):  # replaced or closed stdin
+        return False
+    return 'ipykernel' in sys.modules
+
+
+def _credentials() -> dict:
+    """Return the credentials of the first credential provider that has them, in order:
+    the SCLBL_SERVICE_TOKEN environment variable, the SCLBL_EMAIL and SCLBL_PASSWORD environment
+    variables, the registered credentials provider, and the USER_CREDENTIALS file.
+        Returns:
+            A dictionary with either 'Token', or 'Email' and 'Password'. None if no provider has credentials.
+    """
+
+    if os.environ.get('SCLBL_SERVICE_TOKEN'):
+        return {'Token': os.environ['SCLBL_SERVICE_TOKEN']}
+    if os.environ.get('SCLBL_EMAIL') and os.environ.get('SCLBL_PASSWORD'):
+        return {'Email': os.environ['SCLBL_EMAIL'], 'Password': os.environ['SCLBL_PASSWORD'], 'Remember': False}
+    if _provider is not None:
+        try:
+            credentials = _provider()
+        except Exception as e:
+            logger.error("Credentials provider failed: " + str(e))
+            credentials = None
+        if credentials and (credentials.get('Token') or (credentials.get('Email') and credentials.get('Password'))):
+            return dict(credentials, Remember=False)
+    try:
+        with open(USER_CREDENTIALS) as f:
+            credentials = json.load(f)
+        if credentials.get('Email') and credentials.get('Password'):
+            return credentials
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _sign_in() -> bool:
+    """Sign in again without user interaction if a credential provider has credentials;
+    otherwise prompt for them in a terminal or notebook (see _interactive)."""
+
+    credentials = _credentials()
+    if credentials is None:
+        if _interactive():
+            logger.info("Session expired")
+            try:
+                email: str = input("Please provide your email: ")
+                password: str = input("Please provide your password: ")
+                return log_in(email, password)
+            except EOFError:  # stdin is closed or empty: nobody to answer the prompt
+                pass
+        logger.error("JWT error: the session expired and no credentials are available. Set SCLBL_SERVICE_TOKEN, "
+                     "or SCLBL_EMAIL and SCLBL_PASSWORD, or register a credentials provider.")
+        if DEBUG:
+            raise JWTError("Session expired and no credentials are available.")
+        return False
+    if credentials.get('Token'):
+        return _use_service_token(credentials['Token'])
+    logger.info("Session expired; signing in again.")
+    return log_in(credentials['Email'], credentials['Password'], remember=credentials.get('Remember', True))
+
+
+def _use_service_token(token: str) -> bool:
+    """Use a (long-lived) service token as RefreshToken and obtain an AccessToken with it."""
+    try:
+        decode = jwt.decode(token, options={"verify_signature": False})
+    except jwt.exceptions.PyJWTError as e:
+        logger.error("JWT error: the service token is not a valid JWT: " + str(e))
+        if DEBUG:
+            raise JWTError("Invalid service token: " + str(e))
+        return False
+    jwt_ = _read_jwt()
+    jwt_['JWT_REFRESH_TOKEN'] = token
+    jwt_['JWT_REFRESH_EXP'] = decode.get("exp") or time.time() + 365 * 24 * 3600
+    _write_jwt(jwt_)
+    return _refresh_jwt(token)
 
 
 def _refresh_jwt(refresh_token: str, grant_type=False) -> bool:
@@ -95,25 +249,22 @@ def _refresh_jwt(refresh_token: str, grant_type=False) -> bool:
             'Authorization': f"Bearer {refresh_token}"
         }
         # Send API request
-        resp: req.models.Response = req.post(url=url, headers=headers, json=data)
+        resp: req.models.Response = _http.request("POST", url, headers=headers, json=data)
         if 'json' in resp.headers.get('Content-Type') and 10 < len(resp.content) < 400:
             try:
-                result: dict = resp.json()
+                result: dict = _codec.loads(resp.content)
             except ValueError:
-                if not SILENT:
-                    print("Unable to decode JSON error.")
+                logger.error("Unable to decode JSON error.")
                 if DEBUG:
                     raise JWTError(result.get("Unable to decode JSON error."))
                 return False
         else:
-            if not SILENT:
-                print("Server at", AUTH_MANAGER_URL, "did not return a valid JSON document.")
+            logger.error("Server at %s did not return a valid JSON document.", AUTH_MANAGER_URL)
             if DEBUG:
                 raise JWTError("Server at", AUTH_MANAGER_URL, "did not return a valid JSON document.")
             return False
         if result.get("error") is not None:
-            if not SILENT:
-                print("JWT authentication error: The server generated an error: " + result.get("error"))
+            logger.error("JWT authentication error: The server generated an error: " + result.get("error"))
             if DEBUG:
                 raise JWTError("JWT server error: " + result.get("error"))
             return False
@@ -123,30 +274,27 @@ def _refresh_jwt(refresh_token: str, grant_type=False) -> bool:
             else:
                 return False
         if result.get('AccessToken') is not None:
-            with open(JWT_JSON_FILE) as f:
-                jwt_ = json.load(f)
+            jwt_ = _read_jwt()
             decode = jwt.decode(result.get('AccessToken'), options={"verify_signature": False})
             jwt_['JWT_ACCESS_TOKEN'] = result.get("AccessToken")
             jwt_['JWT_USER_ID'] = decode.get("sub")
             jwt_['JWT_EXP'] = decode.get("exp")
-            with open(JWT_JSON_FILE, 'w') as f:
-                json.dump(jwt_, f)
+            _write_jwt(jwt_)
             return True
         else:
-            if not SILENT:
-                print("Missing key in server JWT response.")
+            logger.error("Missing key in server JWT response.")
             if DEBUG:
                 raise JWTError("Missing key in server response, server at:", AUTH_MANAGER_URL)
             return False
     except req.exceptions.RequestException as e:
-        if not SILENT:
-            print(f"JWT error: Unable to connect to Scailable servers. {e}")
+        logger.error(f"JWT error: Unable to connect to Scailable servers. {e}")
         if DEBUG:
             raise JWTError("Unable to connect to Scailable servers.")
         return False
 
 
-def log_in(email: str, password: str) -> bool:
+@_deadline.bounded
+def log_in(email: str, password: str, remember: bool = True) -> bool:
     """Performs the sign in of a user.
         The function _log_in performs a log in of a user based
         on the email (str) and password (str). It returns
@@ -154,13 +302,13 @@ def log_in(email: str, password: str) -> bool:
         Args:
             email: A string (email) to log in the user
             password: A string (password) for login
+            remember: Whether to store the credentials in the USER_CREDENTIALS file
         Returns:
             True if sign in is successful.
     """
 
     if len(email) < 1 or len(password) < 1:
-        if not SILENT:
-            print("JWT error: no email and password provided.")
+        logger.error("JWT error: no email and password provided.")
         if DEBUG:
             raise LoginError("No email or password provided.")
         return False
@@ -177,28 +325,25 @@ def log_in(email: str, password: str) -> bool:
             'Content-Type': 'application/json'
         }
         # Send API request
-        resp: req.models.Response = req.post(url=url, headers=headers, json=data)
+        resp: req.models.Response = _http.request("POST", url, headers=headers, json=data)
         # Check if content type is JSON and at least 10 bytes long
         if 'json' in resp.headers.get('Content-Type') and 10 < len(resp.content) < 400:
             try:
                 # See if able to decode the JSON
-                result: dict = resp.json()
+                result: dict = _codec.loads(resp.content)
             except ValueError:
-                if not SILENT:
-                    print("Unable to decode JSON error.")
+                logger.error("Unable to decode JSON error.")
                 if DEBUG:
                     raise LoginError(result.get("Unable to decode JSON error."))
                 return False
         else:
-            if not SILENT:
-                print("Server at", AUTH_MANAGER_URL, "did not return a valid JSON document.")
+            logger.error("Server at %s did not return a valid JSON document.", AUTH_MANAGER_URL)
             if DEBUG:
                 raise LoginError("Server at", AUTH_MANAGER_URL, "did not return a valid JSON document.")
             return False
 
         if result.get("error") is not None:
-            if not SILENT:
-                print("JWT authentication error: The server generated an error: " + result.get("error"))
+            logger.error("JWT authentication error: The server generated an error: " + result.get("error"))
             if DEBUG:
                 raise LoginError(result.get("JWT server error: " + result.get("error")))
             return False
@@ -206,34 +351,32 @@ def log_in(email: str, password: str) -> bool:
         # If the JSON contains a RefreshToken, then ask for an AccessToken:
         if result.get('RefreshToken') is not None:
             decode = jwt.decode(result.get('RefreshToken'), options={"verify_signature": False})
-            with open(JWT_JSON_FILE) as f:
-                jwt_ = json.load(f)
+            jwt_ = _read_jwt()
             jwt_['JWT_REFRESH_TOKEN'] = result.get('RefreshToken')
             jwt_['JWT_REFRESH_EXP'] = decode.get("exp")
-            with open(JWT_JSON_FILE, 'w') as f:
-                json.dump(jwt_, f)
-            os.makedirs(os.path.dirname(USER_CREDENTIALS), exist_ok=True)
-            with open(USER_CREDENTIALS, "w+") as f:
-                creds = {'Email': email, 'Password': password}
-                json.dump(creds, f)
+            _write_jwt(jwt_)
+            if remember:
+                os.makedirs(os.path.dirname(USER_CREDENTIALS), exist_ok=True)
+                with open(USER_CREDENTIALS, "w+") as f:
+                    creds = {'Email': email, 'Password': password}
+                    json.dump(creds, f)
             return _refresh_jwt(result.get('RefreshToken'))
         else:
             # Token missing
-            print(result.get('Message'))
-            if not SILENT:
-                print("Missing key in server JWT response.")
+            logger.info(result.get('Message'))
+            logger.error("Missing key in server JWT response.")
             if DEBUG:
                 raise LoginError("Missing key in server response, server at:", AUTH_MANAGER_URL)
             return False
 
     except req.exceptions.RequestException as e:
-        if not SILENT:
-            print(f"JWT error: Unable to connect to Scailable servers. {e}")
+        logger.error(f"JWT error: Unable to connect to Scailable servers. {e}")
         if DEBUG:
             raise LoginError("Unable to connect to Scailable servers.")
         return False
 
 
+@_deadline.bounded
 def get_user_details() -> dict:
     """get the user information
         Returns:
@@ -254,21 +397,21 @@ def get_user_details() -> dict:
                 'Authorization': f"Bearer {jwt_['JWT_ACCESS_TOKEN']}"
             }
             # Send API request
-            resp = req.get(url=url, headers=headers)
+            resp = _http.request("GET", url, headers=headers)
             if 'json' in resp.headers.get('Content-Type'):
                 try:
                     # See if able to decode the JSON
-                    details = resp.json()
+                    details = _codec.loads(resp.content)
                 except ValueError:  # simplejson.decoder.JSONDecodeError
-                    if not SILENT:
-                        print("Unable to decode JSON error.")
+                    logger.error("Unable to decode JSON error.")
                     if DEBUG:
                         raise UserDetailsError(details.get("Unable to decode JSON error."))
         except req.exceptions.RequestException as e:
-            print(f"Error occurred while fetching user details: {e}")
+            logger.error(f"Error occurred while fetching user details: {e}")
         return details
 
 
+@_deadline.bounded
 def log_out() -> bool:
     """Log the user out .
         Returns:
@@ -287,13 +430,14 @@ def log_out() -> bool:
             'Authorization': f"Bearer {jwt_['JWT_ACCESS_TOKEN']}"
         }
         # Send API request
-        resp: req.models.Response = req.post(url=url, headers=headers)
+        resp: req.models.Response = _http.request("POST", url, headers=headers)
         if resp.status_code == 200:
             return True
         else:
             return False
 
 
+@_deadline.bounded
 def register_(name: str, company: str, email: str, password: str, job_title: str = None,
               phone_number: str = None, newsletter_opt_in: bool = True, accept_eula: bool = True) -> bool:
     """Performs the sign-up of a user.
@@ -331,28 +475,25 @@ def register_(name: str, company: str, email: str, password: str, job_title: str
     # Try connecting to server:
     try:
         # Send API request
-        resp: req.models.Response = req.post(url=url, headers=headers, json=data)
+        resp: req.models.Response = _http.request("POST", url, headers=headers, json=data)
         # Check if content type is JSON
         if 'json' in resp.headers.get('Content-Type'):
             try:
                 # See if able to decode the JSON
-                result: dict = resp.json()
+                result: dict = _codec.loads(resp.content)
             except ValueError:
-                if not SILENT:
-                    print("Unable to decode JSON error.")
+                logger.error("Unable to decode JSON error.")
                 if DEBUG:
                     raise RegisterError(result.get("Unable to decode JSON error."))
                 return False
         else:
-            if not SILENT:
-                print("Server at", AUTH_MANAGER_URL, "did not return a valid JSON document.")
+            logger.error("Server at %s did not return a valid JSON document.", AUTH_MANAGER_URL)
             if DEBUG:
                 raise RegisterError("Server at", AUTH_MANAGER_URL, "did not return a valid JSON document.")
             return False
 
         if result.get("error") is not None:
-            if not SILENT:
-                print("JWT authentication error: The server generated an error: " + result.get("error"))
+            logger.error("JWT authentication error: The server generated an error: " + result.get("error"))
             if DEBUG:
                 raise RegisterError(result.get("JWT server error: " + result.get("error")))
             return False
@@ -367,21 +508,20 @@ def register_(name: str, company: str, email: str, password: str, job_title: str
             return True
         else:
             # Token missing
-            print(result.get('Message'))
-            if not SILENT:
-                print("Missing key in server JWT response.")
+            logger.info(result.get('Message'))
+            logger.error("Missing key in server JWT response.")
             if DEBUG:
                 raise RegisterError("Missing key in server response, server at:", AUTH_MANAGER_URL)
             return False
 
     except req.exceptions.RequestException as e:
-        if not SILENT:
-            print(f"JWT error: Unable to connect to Scailable servers. {e}")
+        logger.error(f"JWT error: Unable to connect to Scailable servers. {e}")
         if DEBUG:
             raise RegisterError("Unable to connect to Scailable servers.")
         return False
 
 
+@_deadline.bounded
 def set_new_password(current_password: str, new_password: str) -> bool:
     """Set a new password for user account
     Args:
@@ -413,22 +553,20 @@ def set_new_password(current_password: str, new_password: str) -> bool:
                 'NewPassword': new_password
             }
             try:
-                resp: req.models.Response = req.post(url=url, headers=headers, json=data)
+                resp: req.models.Response = _http.request("POST", url, headers=headers, json=data)
 
                 # Check if content type is JSON
                 if 'json' in resp.headers.get('Content-Type'):
                     try:
                         # See if able to decode the JSON
-                        result: dict = resp.json()
+                        result: dict = _codec.loads(resp.content)
                     except ValueError:
-                        if not SILENT:
-                            print("Unable to decode JSON error.")
+                        logger.error("Unable to decode JSON error.")
                         if DEBUG:
                             raise PwdError(result.get("Unable to decode JSON error."))
                         return False
                 else:
-                    if not SILENT:
-                        print("Server at", AUTH_MANAGER_URL, "did not return a valid JSON document.")
+                    logger.error("Server at %s did not return a valid JSON document.", AUTH_MANAGER_URL)
                     if DEBUG:
                         raise PwdError("Server at", AUTH_MANAGER_URL, "did not return a valid JSON document.")
                     return False
@@ -439,19 +577,18 @@ def set_new_password(current_password: str, new_password: str) -> bool:
                         json.dump(creds, f)
                     return True
             except req.exceptions.RequestException as e:
-                if not SILENT:
-                    print(f"JWT error: Unable to connect to Scailable servers. {e}")
+                logger.error(f"JWT error: Unable to connect to Scailable servers. {e}")
                 if DEBUG:
                     raise PwdError("Unable to connect to Scailable servers.")
                 return False
         else:
-            if not SILENT:
-                print("Incorrect password.")
-                return False
+            logger.error("Incorrect password.")
+            return False
     else:
         return False
 
 
+@_deadline.bounded
 def password_reset(email: str) -> bool:
     """Send a password-reset email.
     Args:
@@ -471,21 +608,19 @@ def password_reset(email: str) -> bool:
             'Email': email,
         }
         # Send API request
-        resp: req.models.Response = req.post(url=url, headers=headers, json=data)
+        resp: req.models.Response = _http.request("POST", url, headers=headers, json=data)
         # Check if content type is JSON
         if 'json' in resp.headers.get('Content-Type'):
             try:
                 # See if able to decode the JSON
-                result: dict = resp.json()
+                result: dict = _codec.loads(resp.content)
             except ValueError:  # simplejson.decoder.JSONDecodeError
-                if not SILENT:
-                    print("Unable to decode JSON error.")
+                logger.error("Unable to decode JSON error.")
                 if DEBUG:
                     raise PwdError(result.get("Unable to decode JSON error."))
                 return False
         else:
-            if not SILENT:
-                print("Server at", AUTH_MANAGER_URL, "did not return a valid JSON document.")
+            logger.error("Server at %s did not return a valid JSON document.", AUTH_MANAGER_URL)
             if DEBUG:
                 raise PwdError("Server at", AUTH_MANAGER_URL, "did not return a valid JSON document.")
             return False
@@ -493,8 +628,7 @@ def password_reset(email: str) -> bool:
         if result.get('Message') == 'Password sent if user exists.':
             return True
     except req.exceptions.RequestException as e:
-        if not SILENT:
-            print(f"JWT error: Unable to connect to Scailable servers. {e}")
+        logger.error(f"JWT error: Unable to connect to Scailable servers. {e}")
         if DEBUG:
             raise PwdError("Unable to connect to Scailable servers.")
         return False
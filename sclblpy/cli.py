@@ -0,0 +1,207 @@
+# File contains the sclblpy command line interface.
+# Results are written to stdout as NDJSON (one JSON document per line); user feedback goes to stderr.
+import argparse
+import contextlib
+import json
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from sclblpy.compute import get_all_models, upload_models, delete_model, get_all_catalogues
+from sclblpy.device import get_all_devices, assign_model_to_device
+from sclblpy.state import reconcile
+from sclblpy._log import configure_logging
+
+
+class _UsageError(Exception):
+    """An input of a command is malformed (exit code 2)."""
+    pass
+
+
+class _Failed(Exception):
+    """A command could not be carried out at all, e.g. a listing could not be fetched (exit code 1)."""
+    pass
+
+
+def _items(args) -> list:
+    """Read the bulk inputs of a command: the lines of the --file ('-' for stdin), or else the positional
+    arguments, taken literally. Lines containing a JSON list or object are decoded; other lines are split on
+    whitespace. Positional arguments form a single item, or one item each for commands taking a list of UUIDs.
+        Raises:
+            ValueError if no inputs are given or an input is not a list or an object.
+    """
+
+    if args.file is None:
+        if args.items == ['-']:
+            args.file = '-'
+        elif not args.items:
+            raise ValueError("no inputs given: pass them as arguments or with -f/--file ('-' for stdin)")
+        elif args.each:
+            return [[value] for value in args.items]
+        else:
+            return [list(args.items)]
+    elif args.items:
+        raise ValueError("inputs are given both as arguments and with -f/--file")
+    if args.file == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        try:
+            with open(args.file) as f:
+                lines = f.read().splitlines()
+        except (OSError, UnicodeDecodeError) as e:
+            raise ValueError("unable to read " + args.file + ": " + str(e))
+    items = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line[0] in '[{':
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                raise ValueError("line " + str(number) + " is not valid JSON: " + str(e))
+        else:
+            item = line.split()
+        if not isinstance(item, (list, dict)) or not item:
+            raise ValueError("line " + str(number) + " is not a list of values or a JSON object: " + line)
+        items.append(item)
+    return items
+
+
+def _run(function, items: list, workers: int):
+    """Apply function to all items concurrently; yields the results in order."""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(function, items)
+
+
+def _listing(result, what: str) -> list:
+    """The records of a listing; the get_all functions return something else than a list if it failed."""
+    if not isinstance(result, list):
+        raise _Failed("unable to list the " + what)
+    return result
+
+
+def _models_ls(args):
+    yield from _listing(get_all_models(), "models")
+
+
+def _models_upload(args):
+    specs = []
+    for item in args.items:
+        if isinstance(item, dict):
+            specs.append(item)
+        else:
+            specs.append({'path': item[0], 'name': item[1] if len(item) > 1 else ""})
+    yield from upload_models(specs, max_workers=args.workers)
+
+
+def _models_rm(args):
+    uuids = [item.get('UUID') if isinstance(item, dict) else item[0] for item in args.items]
+    for uuid, ok in zip(uuids, _run(delete_model, uuids, args.workers)):
+        yield {'uuid': uuid, 'ok': bool(ok)}
+
+
+def _devices_ls(args):
+    yield from _listing(get_all_devices(), "devices")
+
+
+def _devices_assign(args):
+    pairs = []
+    for item in args.items:
+        pair = (item.get('device'), item.get('model')) if isinstance(item, dict) else tuple(item)
+        if len(pair) != 2 or not all(pair):
+            raise _UsageError("expected a device and a model, got: " + json.dumps(item))
+        pairs.append(pair)
+    for (device, model), ok in zip(pairs, _run(lambda p: assign_model_to_device(*p), pairs, args.workers)):
+        yield {'device': device, 'model': model, 'ok': bool(ok)}
+
+
+def _groups_sync(args):
+    groups = [item if isinstance(item, dict) else {'name': item[0], 'devices': item[1:]} for item in args.items]
+    for step in reconcile({'groups': groups}, dry_run=args.dry_run, max_workers=args.workers):
+        yield step
+
+
+def _catalogues_ls(args):
+    yield from _listing(get_all_catalogues(), "catalogues")
+
+
+def _inputs(parser: argparse.ArgumentParser, handler, each: bool = False):
+    """Add the bulk inputs (positional arguments or --file) to the parser of a command."""
+    parser.add_argument('items', nargs='*')
+    parser.add_argument('-f', '--file', help="read the inputs from a file, one per line ('-' for stdin)")
+    parser.set_defaults(handler=handler, each=each)
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="sclblpy", description="Manage Scailable models, devices, groups and "
+                                                                 "catalogues. Output is NDJSON.")
+    parser.add_argument('-w', '--workers', type=int, default=8, help="number of concurrent requests (default 8)")
+    parser.add_argument('-v', '--verbose', action='store_true', help="log every request to stderr")
+    resources = parser.add_subparsers(dest='resource', required=True)
+
+    models = resources.add_parser('models').add_subparsers(dest='command', required=True)
+    models.add_parser('ls', help="list all models").set_defaults(handler=_models_ls)
+    upload = models.add_parser('upload', help="upload a model ('<path> [name]'); with --file, '<path> [name]' "
+                                              "lines or JSON specs with the arguments of upload_model")
+    _inputs(upload, _models_upload)
+    rm = models.add_parser('rm', help="delete models by UUID")
+    _inputs(rm, _models_rm, each=True)
+
+    devices = resources.add_parser('devices').add_subparsers(dest='command', required=True)
+    devices.add_parser('ls', help="list all devices").set_defaults(handler=_devices_ls)
+    assign = devices.add_parser('assign', help="assign a model to a device ('<device> <model>'); with --file, "
+                                               "'<device> <model>' lines or JSON objects with 'device' and "
+                                               "'model'")
+    _inputs(assign, _devices_assign)
+
+    groups = resources.add_parser('groups').add_subparsers(dest='command', required=True)
+    sync = groups.add_parser('sync', help="add devices to a group ('<group> <device> ...'); with --file, "
+                                          "such lines or JSON objects with a group 'name' or 'uuid' and a list "
+                                          "of 'devices'")
+    _inputs(sync, _groups_sync)
+    sync.add_argument('--dry-run', action='store_true', help="only print the plan")
+
+    catalogues = resources.add_parser('catalogues').add_subparsers(dest='command', required=True)
+    catalogues.add_parser('ls', help="list all catalogues").set_defaults(handler=_catalogues_ls)
+    return parser
+
+
+def main(argv: list = None) -> int:
+    """Run the command line interface.
+        Args:
+            argv: The command line arguments (defaults to sys.argv[1:]).
+        Returns:
+            The exit code: 0 if all operations succeeded, 1 otherwise (2 for malformed inputs).
+    """
+
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if hasattr(args, 'items'):
+        try:
+            args.items = _items(args)
+        except ValueError as e:
+            parser.error(str(e))
+    out = sys.stdout
+    failed = False
+    if args.verbose:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        configure_logging(handler, logging.DEBUG)
+    # The package prints its user feedback; keep stdout for the NDJSON results.
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            for result in args.handler(args):
+                if isinstance(result, dict) and result.get('ok') is False:
+                    failed = True
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+        except _UsageError as e:
+            parser.error(str(e))
+        except _Failed as e:
+            print("sclblpy: error: " + str(e), file=sys.stderr)
+            return 1
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
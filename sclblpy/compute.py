@@ -1,19 +1,41 @@
 import json
+import logging
+import random
+import tempfile
+import threading
+import time
 import requests as req
-from sclblpy._globals import COMPUTE_API_URL, SILENT, DEBUG, JWT_JSON_FILE
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+from sclblpy._globals import COMPUTE_API_URL, DEBUG, JWT_JSON_FILE
+from sclblpy import _http, _upload, _onnx, _codec, _deadline, _delta, _hash, _optimize
 from sclblpy.errors import ModelError, CatalogueError, ConfigError
+from sclblpy.records import wrap, project, fields_param, Model, Catalogue
 import os
 from sclblpy.auth import _check_jwt
+from sclblpy._log import get_logger
 
+logger = get_logger('compute')
 
-def get_all_models() -> list:
+# Model statuses (lowercase) after transpiling.
+_READY_STATUSES = ('ready', 'done', 'deployable', 'available', 'success', 'transpiled')
+_FAILED_STATUSES = ('failed', 'error', 'transpile_failed')
+# Fields of a model record read when waiting for models.
+_STATUS_FIELDS = ['UUID', 'Status', 'TranspileStatus', 'State']
+
+
+@_deadline.bounded
+def get_all_models(typed: bool = False, fields: list = None) -> list:
     """
     Returns all models accessible to the users' organisation.
+    Args:
+        typed: If True, return a list of Model records instead of a list of dicts.
+        fields: Optional list of the fields to return per model (e.g. ['UUID', 'Name']); all when omitted.
     """
 
     # Check if user is authenticated
     auth = _check_jwt()
-    models = []
+    models = {}
     if auth:
         try:
             # Load JWT from file
@@ -24,34 +46,35 @@ def get_all_models() -> list:
             headers = {
                 'Authorization': f"Bearer {jwt_['JWT_ACCESS_TOKEN']}"
             }
-            # Send API request
-            resp = req.get(url=url, headers=headers)
+            # Send API request (for the requested fields only)
+            resp = _http.request("GET", url, headers=headers, params=fields_param(fields))
             # Raise an exception if request was unsuccessful
             resp.raise_for_status()
             # Check if response is in JSON format
             if 'json' in resp.headers.get('Content-Type'):
                 try:
                     # See if able to decode the JSON
-                    models = resp.json()
+                    models = project(_codec.loads(resp.content), fields)
                 except ValueError:  # simplejson.decoder.JSONDecodeError
-                    if not SILENT:
-                        print("Unable to decode JSON error.")
+                    logger.error("Unable to decode JSON error.")
                     if DEBUG:
                         raise ModelError(models.get("Unable to decode JSON error."))
             else:
-                if not SILENT:
-                    print("Server at", COMPUTE_API_URL, "did not return a valid JSON document.")
+                logger.error("Server at %s did not return a valid JSON document.", COMPUTE_API_URL)
                 if DEBUG:
                     raise ModelError("Server at", COMPUTE_API_URL, "did not return a valid JSON document.")
         except req.exceptions.RequestException as e:
             # Handle exceptions that may occur during API request
-            print(f"Error occurred while fetching organisation functions: {e}")
-        return models
+            logger.error(f"Error occurred while fetching organisation functions: {e}")
+        return wrap(models, Model, many=True) if typed else models
 
 
-def get_model(uuid: str) -> dict:
+@_deadline.bounded
+def get_model(uuid: str, typed: bool = False) -> dict:
     """
     Returns: get model's details by uuid
+    Args:
+        typed: If True, return a Model record instead of a dict.
     """
 
     # Check if user is authenticated
@@ -68,37 +91,40 @@ def get_model(uuid: str) -> dict:
                 'Authorization': f"Bearer {jwt_['JWT_ACCESS_TOKEN']}"
             }
             # Send API request
-            resp = req.get(url=url, headers=headers)
+            resp = _http.request("GET", url, headers=headers)
             # Raise an exception if request was unsuccessful
             resp.raise_for_status()
             # Check if response is in JSON format
             if 'json' in resp.headers.get('Content-Type'):
                 try:
                     # See if able to decode the JSON
-                    details = resp.json()
+                    details = _codec.loads(resp.content)
                 except ValueError:  # simplejson.decoder.JSONDecodeError
-                    if not SILENT:
-                        print("Unable to decode JSON error.")
+                    logger.error("Unable to decode JSON error.", extra={'uuid': uuid})
                     if DEBUG:
                         raise ModelError(details.get("Unable to decode JSON error."))
             else:
-                if not SILENT:
-                    print("Server at", COMPUTE_API_URL, "did not return a valid JSON document.")
+                logger.error("Server at %s did not return a valid JSON document.", COMPUTE_API_URL, extra={'uuid': uuid})
                 if DEBUG:
                     raise ModelError("Server at", COMPUTE_API_URL, "did not return a valid JSON document.")
         except req.exceptions.RequestException as e:
             # Handle exceptions that may occur during API request
-            print(f"Error occurred while fetching model's details: {e}")
-        return details
+            logger.error(f"Error occurred while fetching model's details: {e}", extra={'uuid': uuid})
+        return wrap(details, Model) if typed else details
 
 
+@_deadline.bounded
 def upload_model(name: str, documentation: str, input_driver: str, output_driver: str = "",
                  input_driver_details: dict = {}, output_driver_details: dict = {},
-                 alias: str = "", path: str = "", source_name=None, source_url=None) -> bool:
+                 alias: str = "", path: str = "", source_name=None, source_url=None,
+                 compress: str = None, validate: bool = True, max_workers: int = 4, optimize: str = None) -> bool:
     """_upload_model uploads a fitted onnx model to Scailable.
 
         - The function first checks if the supplied path indeed references a .onnx file
+        - Next the onnx file is validated locally (see validate_model)
+        - Next the onnx file is optimised for size, if requested (see optimize_model)
         - Next the onnx file and the supporting docs are uploaded.
+        - Finally the external-data files the onnx file refers to (if any) are uploaded in parallel.
 
         Args:
             name: Name of the model to upload
@@ -111,45 +137,48 @@ def upload_model(name: str, documentation: str, input_driver: str, output_driver
             path: The path referencing the onnx model location (i.e., the .onnx file location).
             source_name:
             source_url:
+            compress: Optional Content-Encoding ('gzip' or 'zstd') to compress the upload with on the fly.
+            validate: Whether to validate the onnx file locally before uploading it.
+            max_workers: Maximum number of external-data files uploaded at the same time.
+            optimize: Optional size optimisation before the upload (requires onnx): 'strip' removes doc strings
+                and unused or duplicate initializers, 'fp16' also stores float32 weights as float16.
         Returns:
             False if upload failed, True otherwise
     """
 
     # Check if file exists:
     if not path.endswith('.onnx'):
-        if not SILENT:
-            print("FATAL: You did not specify a .onnx path. \n")
+        logger.error("FATAL: You did not specify a .onnx path. \n")
         if DEBUG:
             raise ModelError("We were unable to open the specified onnx file (no .onnx extension).")
+        return False
 
     if not documentation:
         documentation = "-- EMPTY --"
-        print(
-            "WARNING: You did not provide any documentation for your model. We will simply use " + documentation + " as its documentation")
+        logger.warning("WARNING: You did not provide any documentation for your model. We will simply use " + documentation + " as its documentation")
     if not name:
         name = os.path.splitext(os.path.basename(path))[0]
-        print("WARNING: You did not provide any name for your model. We will simply use " + name + " as its name")
+        logger.warning("WARNING: You did not provide any name for your model. We will simply use " + name + " as its name")
 
     # Check if user is authenticated
     auth = _check_jwt()
     if not auth:
-        if not SILENT:
-            print("FATAL: We were unable to obtain JWT authorization for your account. \n"
-                  "Your model has not been uploaded. \n")
+        logger.error("FATAL: We were unable to obtain JWT authorization for your account. \n"
+                     "Your model has not been uploaded. \n")
         if DEBUG:
             raise ModelError("We were unable to obtain JWT authorization.")
         return False
 
+    # Check the onnx file before sending any bytes:
+    if validate and not _check_model(path):
+        return False
+
     if auth:
+        sent = path
         try:
-            # Load JWT from file
-            with open(JWT_JSON_FILE) as f:
-                jwt_ = json.load(f)
-            # Build URL and headers for API request
+            sent = _optimized(path, optimize)
+            # Build URL and data for API request
             url = f"{COMPUTE_API_URL}/functions"
-            headers = {
-                'Authorization': f"Bearer {jwt_['JWT_ACCESS_TOKEN']}"
-            }
             data = {
                 'Name': name,
                 'Alias': alias,
@@ -161,36 +190,549 @@ def upload_model(name: str, documentation: str, input_driver: str, output_driver
                 'SourceName': source_name,
                 'SourceUrl': source_url
             }
-            files = {
-                'data': (None, json.dumps(data)),
-                'file': (os.path.basename(path), open(path, 'rb'), 'application/octet-stream')
-            }
-            # Send API request
-            resp = req.post(url=url, headers=headers, files=files)
+            # Send API request (the files are streamed from disk)
+            resp = _send_package("POST", url, data, sent, compress=compress, max_workers=max_workers,
+                                 filename=os.path.basename(path))
         except Exception as e:
             # Handle exceptions that may occur during API request
-            if not SILENT:
-                print("FATAL: Unable to carry out the upload request: \n"
-                      "Your model has not been uploaded.\n" + str(e))
+            logger.error("FATAL: Unable to carry out the upload request: \n"
+                         "Your model has not been uploaded.\n" + str(e))
             if DEBUG:
                 raise ModelError("Unable to carry out the upload request: " + str(e))
             return False
+        finally:
+            if sent != path:
+                os.remove(sent)
 
         # user feedback:
         if resp.status_code == 200:
-            if not SILENT:
-                print("Your ONNX file was successfully uploaded to Scailable!")
-                print("NOTE: After transpiling, we will send you an email and your model will be available at "
-                      "https://admin.sclbl.net.")
-                print(
-                    "Or, alternatively, you can use the '_functions_list()' function to list all your uploaded "
-                    "models. \n")
+            logger.info("Your ONNX file was successfully uploaded to Scailable!")
+            logger.info("NOTE: After transpiling, we will send you an email and your model will be available at "
+                        "https://admin.sclbl.net.")
+            logger.info("You can use the 'wait_for_model()' function to wait until your model is ready.")
+            logger.info("Or, alternatively, you can use the '_functions_list()' function to list all your uploaded "
+                        "models. \n")
             return True
 
 
+@_deadline.bounded(priority='bulk')
+def upload_models(specs: list, max_workers: int = 4, max_inflight_bytes: int = 512 * 1024 ** 2,
+                  report_interval: float = 5) -> list:
+    """Upload many onnx models concurrently over the shared connection pool.
+        Args:
+            specs: List of dicts with the arguments of upload_model (name, documentation, input_driver, path,
+                compress, validate, ...).
+            max_workers: Maximum number of concurrent uploads.
+            max_inflight_bytes: Maximum number of file bytes being uploaded at the same time.
+            report_interval: Seconds between aggregated progress reports (logged at INFO level).
+        Returns:
+            List of dicts, one per spec (in order), with 'name', 'path', 'ok', 'uuid', 'error',
+            'bytes' and 'seconds'.
+    """
+
+    results = [{'name': spec.get('name') or os.path.splitext(os.path.basename(spec.get('path', "")))[0],
+                'path': spec.get('path', ""), 'ok': False, 'uuid': None, 'error': None,
+                'bytes': 0, 'seconds': 0.0} for spec in specs]
+    for result in results:
+        if not result['path'].endswith('.onnx') or not os.path.isfile(result['path']):
+            result['error'] = "No .onnx file at " + result['path']
+        else:
+            try:
+                result['bytes'] = os.path.getsize(result['path']) + sum(s['size'] for s in _shards(result['path']))
+            except (ModelError, OSError) as e:
+                result['error'] = str(e)
+
+    # Check if user is authenticated (once, for all uploads)
+    auth = _check_jwt()
+    if not auth:
+        logger.error("FATAL: We were unable to obtain JWT authorization for your account. \n"
+                     "Your models have not been uploaded. \n")
+        if DEBUG:
+            raise ModelError("We were unable to obtain JWT authorization.")
+        for result in results:
+            result['error'] = result['error'] or "No JWT authorization."
+        return results
+
+    # Check the onnx files before sending any bytes:
+    config = None
+    for spec, result in zip(specs, results):
+        if result['error'] is None and spec.get('validate', True):
+            if config is None:
+                config = config_parameters() or {}
+            report = validate_model(result['path'], config)
+            if not report['valid']:
+                result['error'] = "Invalid onnx file: " + "; ".join(report['errors'])
+
+    budget = _upload.ByteBudget(max_inflight_bytes)
+    progress = _upload.Progress(sum(r['bytes'] for r in results if r['error'] is None))
+    stop = progress.start_reporting(report_interval) if _upload.logger.isEnabledFor(logging.INFO) else None
+
+    def upload(spec: dict, result: dict):
+        if result['error'] is not None:
+            return
+        data = {
+            'Name': result['name'],
+            'Alias': spec.get('alias', ""),
+            'Documentation': spec.get('documentation') or "-- EMPTY --",
+            'InputDriver': spec.get('input_driver', ""),
+            'InputDriverDetails': spec.get('input_driver_details', {}),
+            'OutputDriver': spec.get('output_driver', ""),
+            'OutputDriverDetails': spec.get('output_driver_details', {}),
+            'SourceName': spec.get('source_name'),
+            'SourceUrl': spec.get('source_url')
+        }
+        reserved = 0
+        started = time.time()
+        sent = result['path']
+        try:
+            reserved = budget.acquire(result['bytes'])
+            sent = _optimized(result['path'], spec.get('optimize'))
+            resp = _send_package("POST", f"{COMPUTE_API_URL}/functions", data, sent, progress.add,
+                                 spec.get('compress'), spec.get('max_workers', 4),
+                                 filename=os.path.basename(result['path']))
+            resp.raise_for_status()
+            result['ok'] = True
+            if 'json' in resp.headers.get('Content-Type', ""):
+                try:
+                    result['uuid'] = _codec.loads(resp.content).get('UUID')
+                except (ValueError, AttributeError):
+                    pass
+        except Exception as e:
+            result['error'] = str(e)
+        finally:
+            if sent != result['path']:
+                os.remove(sent)
+            budget.release(reserved)
+            result['seconds'] = time.time() - started
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            list(pool.map(_deadline.bind(upload), specs, results))
+    finally:
+        if stop is not None:
+            stop.set()
+
+    logger.info(progress.report())
+    logger.info(str(sum(r['ok'] for r in results)) + " of " + str(len(results)) + " models uploaded.")
+    for result in results:
+        if not result['ok']:
+            logger.error("FAILED: " + result['name'] + ": " + str(result['error']))
+    return results
+
+
+@_deadline.bounded
+def optimize_model(path: str, output_path: str = None, fp16: bool = False) -> dict:
+    """Write a smaller version of an onnx model (requires the onnx package).
+    Doc strings are stripped, initializers no node uses are removed and identical initializers are merged;
+    with fp16, float32 weights are stored as float16 (and cast back to float32 when the model runs). The model
+    is loaded in memory once; external-data files are left as they are.
+        Args:
+            path: The path referencing the onnx model location (i.e., the .onnx file location).
+            output_path: The file to write; <name>.optimized.onnx next to path when omitted.
+            fp16: Whether to store eligible float32 weights (large, within the float16 range) as float16.
+        Returns:
+            Dictionary with the 'path' written, its 'size_before', 'size_after' and the bytes 'saved', and the
+            number of 'doc_strings', 'unused_initializers', 'duplicate_initializers' and 'fp16_initializers'
+            changed. Empty if the model could not be optimised.
+    """
+
+    if output_path is None:
+        output_path = os.path.splitext(path)[0] + ".optimized.onnx"
+    try:
+        report = _optimize.optimize(path, output_path, fp16)
+    except ImportError:
+        logger.error("FATAL: The onnx package is required to optimise models (pip install onnx).")
+        if DEBUG:
+            raise ModelError("The onnx package is required to optimise models.")
+        return {}
+    except Exception as e:
+        logger.error("FATAL: Unable to optimise " + path + ": " + str(e))
+        if DEBUG:
+            raise ModelError("Unable to optimise " + path + ": " + str(e))
+        return {}
+    before, after = os.path.getsize(path), os.path.getsize(output_path)
+    report.update({'path': output_path, 'size_before': before, 'size_after': after, 'saved': before - after})
+    logger.info(f"Optimised {os.path.basename(path)}: {before / 1024 ** 2:.1f} MB to {after / 1024 ** 2:.1f} MB "
+                f"({report['saved'] / 1024 ** 2:.1f} MB saved).")
+    return report
+
+
+def _optimized(path: str, optimize: str) -> str:
+    """The file to upload for path: an optimised copy (removed by the caller after the upload) if optimize is
+    'strip' or 'fp16' and the copy is smaller; path otherwise."""
+    if not optimize:
+        return path
+    if optimize not in ('strip', 'fp16'):
+        logger.warning("WARNING: Unknown optimisation " + str(optimize) + "; uploading the model as it is.")
+        return path
+    try:
+        import onnx  # noqa: F401 (optional dependency)
+    except ImportError:
+        logger.warning("WARNING: onnx is not installed; uploading the model without optimising it.")
+        return path
+    # Next to the model, so that its references to external data still resolve.
+    handle, output = tempfile.mkstemp(suffix=".onnx", prefix=os.path.splitext(os.path.basename(path))[0] + ".",
+                                      dir=os.path.dirname(os.path.abspath(path)))
+    os.close(handle)
+    try:
+        report = optimize_model(path, output, fp16=optimize == 'fp16')
+    except BaseException:
+        os.remove(output)
+        raise
+    if report.get('saved', 0) > 0:
+        return output
+    os.remove(output)
+    return path
+
+
+@_deadline.bounded
+def validate_model(path: str, config: dict = None) -> dict:
+    """Validate an onnx model locally, before uploading it.
+    Only the protobuf metadata is parsed (the file is memory-mapped and tensor data is skipped), so
+    this takes milliseconds even for large models.
+        Args:
+            path: The path referencing the onnx model location (i.e., the .onnx file location).
+            config: The service configuration (see config_parameters), used for the size and opset
+                limits. Fetched when not supplied.
+        Returns:
+            Dictionary with 'valid', the list of 'errors' and the model metadata ('size', 'ir_version',
+            'opsets', 'inputs', 'outputs', 'external_data', ...).
+    """
+
+    report = {'valid': False, 'errors': []}
+    if not path.endswith('.onnx') or not os.path.isfile(path):
+        report['errors'].append("No .onnx file at " + path + ".")
+        return report
+    try:
+        report.update(_onnx.read_info(path))
+    except (ValueError, OSError) as e:
+        report['errors'].append("Not a valid onnx file: " + str(e))
+        return report
+
+    errors = report['errors']
+    if not report['graph']:
+        errors.append("The model does not contain a graph.")
+    if not report['ir_version']:
+        errors.append("The model does not specify an IR version.")
+    if '' not in report['opsets'] and 'ai.onnx' not in report['opsets']:
+        errors.append("The model does not import the default onnx opset.")
+    if report['graph'] and not report['inputs']:
+        errors.append("The model graph has no inputs.")
+    if report['graph'] and not report['outputs']:
+        errors.append("The model graph has no outputs.")
+
+    total = report['size']
+    for external in report['external_data']:
+        location = os.path.join(os.path.dirname(path), external['location'])
+        if not os.path.isfile(location):
+            errors.append("External data file " + external['location'] + " is missing.")
+        elif os.path.getsize(location) < external['size']:
+            errors.append("External data file " + external['location'] + " is truncated.")
+        else:
+            total += os.path.getsize(location)
+
+    if config is None:
+        config = config_parameters() or {}
+    max_size = _config_value(config, 'MaxFileSize', 'MaxModelSize', 'MaxUploadSize')
+    if max_size and total > max_size:
+        errors.append(f"The model is {total} bytes, the maximum is {max_size} bytes.")
+    opset = report['opsets'].get('', report['opsets'].get('ai.onnx'))
+    min_opset = _config_value(config, 'MinOpset', 'MinOpsetVersion')
+    max_opset = _config_value(config, 'MaxOpset', 'MaxOpsetVersion')
+    if opset is not None and min_opset and opset < min_opset:
+        errors.append(f"The model uses opset {opset}, the minimum is {min_opset}.")
+    if opset is not None and max_opset and opset > max_opset:
+        errors.append(f"The model uses opset {opset}, the maximum is {max_opset}.")
+
+    report['valid'] = not errors
+    return report
+
+
+def _check_model(path: str) -> bool:
+    """Validate an onnx model before uploading it and report the problems found."""
+    report = validate_model(path)
+    if not report['valid']:
+        logger.error("FATAL: The onnx file did not pass validation and has not been sent: \n" +
+                     "\n".join(report['errors']))
+        if DEBUG:
+            raise ModelError("Invalid onnx file: " + "; ".join(report['errors']))
+    return report['valid']
+
+
+def _config_value(config: dict, *keys):
+    """Return the first numeric value found in config for one of the keys (case-insensitive)."""
+    lowered = {str(k).lower(): v for k, v in (config or {}).items()}
+    for key in keys:
+        value = lowered.get(key.lower())
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return value
+    return None
+
+
+def _send_model(method: str, url: str, data: dict, path: str, progress=None,
+                compress: str = None, filename: str = None) -> req.models.Response:
+    """Send a model (meta)data and onnx file as a streamed multipart request.
+        Args:
+            method: HTTP method (POST to upload, PATCH to update).
+            url: The URL of the request.
+            data: The model metadata.
+            path: The path of the .onnx file.
+            progress: Optional callback receiving the number of file bytes sent.
+            compress: Optional Content-Encoding ('gzip' or 'zstd') to compress the request body with.
+                If the server does not accept the encoding, the model is sent uncompressed.
+            filename: The name the file is sent with; the name of path when omitted.
+        Returns:
+            The response.
+    """
+
+    # Load JWT from file
+    with open(JWT_JSON_FILE) as f:
+        jwt_ = json.load(f)
+    if compress == 'zstd':
+        try:
+            import zstandard  # noqa: F401 (optional dependency)
+        except ImportError:
+            logger.warning("WARNING: zstandard is not installed; compressing with gzip instead.")
+            compress = 'gzip'
+    if compress in _upload.rejected_encodings:
+        compress = None
+
+    body = _upload.MultipartReader({'data': _codec.dumps(data).decode('utf-8')}, 'file', path, progress,
+                                   filename=filename)
+    try:
+        headers = {
+            'Authorization': f"Bearer {jwt_['JWT_ACCESS_TOKEN']}",
+            'Content-Type': body.content_type
+        }
+        if not compress:
+            return _http.request(method, url, headers=headers, data=body)
+        headers['Content-Encoding'] = compress
+        threads = _upload.compression_threads(len(body))
+        resp = _http.request(method, url, headers=headers, data=_upload.compressed(body, compress, threads=threads))
+        if resp.status_code != 415:
+            return resp
+        # Server does not accept the encoding: remember and fall back to a raw upload.
+        _upload.rejected_encodings.add(compress)
+        logger.info("NOTE: The server does not accept " + compress + " compressed uploads; uploading uncompressed.")
+    finally:
+        body.close()
+    return _send_model(method, url, data, path, progress, filename=filename)
+
+
+def _shards(path: str) -> list:
+    """The external-data files an onnx file refers to, with their 'location' (relative to the onnx file), 'path'
+    and 'size'; empty if the model holds all its tensors.
+        Raises:
+            ModelError if a file is outside the directory of the model or missing.
+    """
+    try:
+        external = _onnx.read_info(path)['external_data']
+    except (OSError, ValueError):
+        return []
+    directory = os.path.dirname(path)
+    shards = []
+    for entry in external:
+        location = entry['location']
+        full = os.path.normpath(os.path.join(directory, location))
+        if os.path.isabs(location) or os.path.relpath(full, directory).startswith(os.pardir):
+            raise ModelError("External data file " + location + " is outside the directory of the model.")
+        try:
+            size = os.path.getsize(full)
+        except OSError as e:
+            raise ModelError("External data file " + location + " is missing: " + str(e))
+        shards.append({'location': location, 'path': full, 'size': size})
+    return shards
+
+
+def _send_package(method: str, url: str, data: dict, path: str, progress=None, compress: str = None,
+                  max_workers: int = 4, uuid: str = None, filename: str = None) -> req.models.Response:
+    """Upload (POST) or update (PATCH) an onnx file and, in parallel, the external-data files it refers to.
+    The graph is sent first (listing the external-data files in its metadata); the files are then streamed
+    concurrently on the upload pool shared by the process (see _upload.executor), their SHA-256 computed while
+    they are read, and the upload is completed by sending the checksums of all files, which the server verifies.
+    If sending the external data fails, a newly uploaded model is deleted again, so no model without its weights
+    is left behind; an updated model keeps its new graph, and must be updated again. The routes for external data
+    are probed (OPTIONS) once per service; a server without them (404, 405 or 501) receives the onnx file only, as
+    a single request, and the model is kept.
+        Args:
+            method: 'POST' to upload a new model, 'PATCH' to update the model uuid.
+            max_workers: Maximum number of external-data files sent at the same time.
+            uuid: The UUID of the model, for updates.
+            filename: The name the onnx file is sent with (see _send_model).
+        Returns:
+            The response to the upload of the graph (or the first failed request).
+        Raises:
+            ModelError if the server did not return the UUID of the model; requests exceptions.
+    """
+
+    shards = _shards(path)
+    if shards and COMPUTE_API_URL in _upload.no_external_data:
+        _without_external_data()
+        shards = []
+    if shards:
+        data = dict(data, ExternalData=[{'Location': shard['location'], 'Size': shard['size']} for shard in shards])
+    resp = _send_model(method, url, data, path, progress, compress, filename)
+    if not shards or resp.status_code != 200:
+        return resp
+    if uuid is None and 'json' in resp.headers.get('Content-Type', ""):
+        try:
+            uuid = _codec.loads(resp.content).get('UUID')
+        except (ValueError, AttributeError):
+            pass
+    if not uuid:
+        raise ModelError("The server did not return the UUID of the model; its external data was not uploaded.")
+
+    # Load JWT from file
+    with open(JWT_JSON_FILE) as f:
+        jwt_ = json.load(f)
+    headers = {
+        'Authorization': f"Bearer {jwt_['JWT_ACCESS_TOKEN']}",
+        'Content-Type': 'application/octet-stream'
+    }
+    if COMPUTE_API_URL not in _upload.probed_external_data:
+        probe = _http.request("OPTIONS", f"{COMPUTE_API_URL}/function/{uuid}/data",
+                              headers={'Authorization': headers['Authorization']})
+        _upload.probed_external_data.add(COMPUTE_API_URL)
+        allow = probe.headers.get('Allow')
+        if probe.status_code in (404, 501) or (allow is not None and 'PUT' not in allow.upper()):
+            _without_external_data()
+            return resp
+    failed = threading.Event()
+    unsupported = threading.Event()
+
+    def send(shards_: list) -> list:
+        checksums = []
+        for shard in shards_:
+            if failed.is_set():
+                break
+            body = _upload.FileReader(shard['path'], progress)
+            try:
+                shard_resp = _http.request("PUT", f"{COMPUTE_API_URL}/function/{uuid}/data/"
+                                                  f"{quote(shard['location'])}", headers=headers, data=body)
+                if shard_resp.status_code in (404, 405, 501):
+                    unsupported.set()
+                    failed.set()
+                    break
+                shard_resp.raise_for_status()
+            except BaseException:
+                failed.set()
+                raise
+            finally:
+                body.close()
+            logger.debug("Uploaded external data file %s", shard['location'], extra={'uuid': uuid})
+            checksums.append({'Location': shard['location'], 'Size': shard['size'], 'SHA256': body.hexdigest()})
+        return checksums
+
+    # At most max_workers files of this model are sent at the same time, each worker sending its share in turn.
+    workers = max(1, min(max_workers, len(shards)))
+    futures = [_upload.executor().submit(_deadline.bind(send), shards[i::workers]) for i in range(workers)]
+    try:
+        try:
+            sent = [checksum for future in futures for checksum in future.result()]
+        finally:
+            failed.set()
+            for future in futures:
+                future.exception()  # wait until no file is being sent any more
+        if unsupported.is_set():
+            _without_external_data()
+            return resp
+        by_location = {checksum['Location']: checksum for checksum in sent}
+        checksums = [by_location[shard['location']] for shard in shards]
+        done = _http.request("POST", f"{COMPUTE_API_URL}/function/{uuid}/data",
+                             headers={'Authorization': headers['Authorization']}, json={'ExternalData': checksums})
+        if done.status_code in (404, 405, 501):
+            _without_external_data()
+            return resp
+        done.raise_for_status()
+    except BaseException:
+        if method == "POST":
+            _discard(uuid, headers['Authorization'])
+        else:
+            logger.error("The graph of the model was updated, but not its external data; update the model again.",
+                         extra={'uuid': uuid})
+        raise
+    return resp
+
+
+def _without_external_data():
+    """Remember that the server has no routes for external data: models are sent to it as a single onnx file."""
+    if COMPUTE_API_URL not in _upload.no_external_data:
+        _upload.no_external_data.add(COMPUTE_API_URL)
+        logger.warning("WARNING: The server does not accept external-data files; models are uploaded as a single "
+                       "onnx file, without them.")
+
+
+def _discard(uuid: str, authorization: str):
+    """Delete a model whose upload could not be completed (best effort)."""
+    try:
+        resp = _http.request("DELETE", f"{COMPUTE_API_URL}/function/{uuid}", headers={'Authorization': authorization})
+        resp.raise_for_status()
+        logger.info("The incomplete upload of the model was deleted.", extra={'uuid': uuid})
+    except Exception as e:
+        logger.warning("WARNING: Unable to delete the incomplete upload of the model: " + str(e), extra={'uuid': uuid})
+
+
+def _send_delta(url: str, data: dict, path: str, base: dict, target: dict) -> req.models.Response:
+    """Send the blocks of a model that changed since base (see _delta).
+        Returns:
+            The response; None if a full upload is needed (no base, too many changes, or the server does
+            not support patching or holds another base version).
+    """
+
+    if COMPUTE_API_URL in _delta.unsupported or base is None:
+        return None
+    ops = _delta.diff(base, target)
+    changed = _delta.changed_bytes(ops)
+    if changed > _delta.MAX_DELTA_RATIO * target['size']:
+        logger.info(f"{changed / 1024 ** 2:.1f} of {target['size'] / 1024 ** 2:.1f} MB changed; uploading the "
+                    f"full model.")
+        return None
+
+    # Load JWT from file
+    with open(JWT_JSON_FILE) as f:
+        jwt_ = json.load(f)
+    if COMPUTE_API_URL not in _delta.probed:
+        # Ask for the delta route once, so a server without it costs no delta body before the full upload.
+        probe = _http.request("OPTIONS", url + "/delta",
+                              headers={'Authorization': f"Bearer {jwt_['JWT_ACCESS_TOKEN']}"})
+        _delta.probed.add(COMPUTE_API_URL)
+        allow = probe.headers.get('Allow')
+        if probe.status_code in (404, 501) or (allow is not None and 'POST' not in allow.upper()):
+            _unsupported_delta()
+            return None
+    logger.info(f"Sending {changed / 1024 ** 2:.1f} of {target['size'] / 1024 ** 2:.1f} MB (changed chunks only).")
+    manifest = {'base': base['root'], 'target': target['root'], 'size': target['size'], 'ops': ops}
+    body = _upload.MultipartReader({'data': _codec.dumps(data).decode('utf-8'),
+                                    'delta': _codec.dumps(manifest).decode('utf-8')},
+                                   'blocks', path, file=_delta.BlockReader(path, ops))
+    try:
+        headers = {
+            'Authorization': f"Bearer {jwt_['JWT_ACCESS_TOKEN']}",
+            'Content-Type': body.content_type
+        }
+        resp = _http.request("POST", url + "/delta", headers=headers, data=body)
+    finally:
+        body.close()
+    if resp.status_code in (404, 405, 415, 501):
+        _unsupported_delta()
+        return None
+    if resp.status_code in (409, 412):
+        logger.info("NOTE: The server holds another version of the model than the last one uploaded from this "
+                    "machine; uploading the full model.")
+        return None
+    return resp
+
+
+def _unsupported_delta():
+    """Remember that the server has no (usable) delta route: later updates are sent to it in full."""
+    _delta.unsupported.add(COMPUTE_API_URL)
+    logger.info("NOTE: The server does not accept model deltas; uploading the full model.")
+
+
+@_deadline.bounded
 def update_model(uuid: str, name: str, documentation: str, input_driver: str, output_driver: str,
                  input_driver_details: dict = {}, output_driver_details: dict = {},
-                 alias: str = "", path: str = "", source_name=None, source_url=None) -> bool:
+                 alias: str = "", path: str = "", source_name=None, source_url=None, delta: bool = False) -> bool:
     """Update a single model.
         Args:
             name:
@@ -203,44 +745,39 @@ def update_model(uuid: str, name: str, documentation: str, input_driver: str, ou
             path:
             source_name:
             source_url:
+            delta: Whether to send only the chunks that changed since the last version uploaded from this
+                machine. A full upload is sent if the server does not support patching or the base is unknown.
 
         Returns:
             True if model updated, False otherwise
     """
 
     if not path.endswith('.onnx'):
-        if not SILENT:
-            print("FATAL: You did not specify a .onnx path. \n")
+        logger.error("FATAL: You did not specify a .onnx path. \n", extra={'uuid': uuid})
         if DEBUG:
             raise ModelError("We were unable to open the specified onnx file (no .onnx extension).")
+        return False
 
     if not documentation:
         doc = "-- EMPTY --"
-        print("WARNING: You did not provide any documentation. We will simply use " + doc + " as its documentation")
+        logger.warning("WARNING: You did not provide any documentation. We will simply use " + doc + " as its documentation", extra={'uuid': uuid})
     if not name:
         name = os.path.splitext(os.path.basename(path))[0]
-        print("WARNING: You did not provide any name. We will simply use " + name + " as its name")
+        logger.warning("WARNING: You did not provide any name. We will simply use " + name + " as its name", extra={'uuid': uuid})
 
     # Check if user is authenticated
     auth = _check_jwt()
     if not auth:
-        if not SILENT:
-            print("FATAL: We were unable to obtain JWT authorization for your account. \n"
-                  "Your model has not been updated. \n")
+        logger.error("FATAL: We were unable to obtain JWT authorization for your account. \n"
+                     "Your model has not been updated. \n", extra={'uuid': uuid})
         if DEBUG:
             raise ModelError("We were unable to obtain JWT authorization.")
         return False
 
     if auth:
         try:
-            # Load JWT from file
-            with open(JWT_JSON_FILE) as f:
-                jwt_ = json.load(f)
-            # Build URL and headers for API request
+            # Build URL and data for API request
             url = f"{COMPUTE_API_URL}/function/{uuid}"
-            headers = {
-                'Authorization': f"Bearer {jwt_['JWT_ACCESS_TOKEN']}"
-            }
             data = {
                 'Name': name,
                 'Alias': alias,
@@ -252,29 +789,122 @@ def update_model(uuid: str, name: str, documentation: str, input_driver: str, ou
                 'SourceName': source_name,
                 'SourceUrl': source_url
             }
-            files = {
-                'data': (None, json.dumps(data)),
-                'file': (os.path.basename(path), open(path, 'rb'), 'application/octet-stream')
-            }
-            # Send API request
-            resp = req.patch(url=url, headers=headers, files=files)
+            target = resp = hashing = None
+            if delta and _shards(path):
+                # The weights are in external-data files, which are sent in full: no delta for the graph alone.
+                logger.info("NOTE: The model stores its weights in external-data files; uploading it in full.",
+                            extra={'uuid': uuid})
+                delta = False
+            if delta:
+                base = _delta.load(uuid)
+                spans = _delta.chunks(path)
+                if base is not None and COMPUTE_API_URL not in _delta.unsupported:
+                    target = _delta.fingerprint(path, spans=spans)
+                    resp = _send_delta(url, data, path, base, target)
+                if target is None:
+                    # Nothing to diff against: fingerprint the model while it is uploaded, for the next delta.
+                    hashing = _hash.background(path, spans)
+            if resp is None:
+                # Send API request (the files are streamed from disk)
+                resp = _send_package("PATCH", url, data, path, uuid=uuid)
             resp.raise_for_status()
         except Exception as e:
             # Handle exceptions that may occur during API request
-            if not SILENT:
-                print("FATAL: Unable to carry out the request: " + str(e) +
-                      "\n Your model has not been updated.\n")
+            logger.error("FATAL: Unable to carry out the request: " + str(e) +
+                         "\n Your model has not been updated.\n", extra={'uuid': uuid})
             if DEBUG:
                 raise ModelError("Unable to carry out the request: " + str(e))
             return False
 
+        if delta:
+            # The model was updated: a fingerprint that cannot be computed only costs the next delta.
+            try:
+                _delta.save(uuid, target or _delta.fingerprint(path, hashing.result(), spans))
+            except Exception as e:
+                logger.warning("WARNING: Unable to fingerprint the model; the next update is sent in full: " + str(e),
+                               extra={'uuid': uuid})
+                _delta.forget(uuid)
+
         # user feedback:
         if resp.status_code == 200:
-            if not SILENT:
-                print("Your model was successfully updated")
+            logger.info("Your model was successfully updated", extra={'uuid': uuid})
             return True
 
 
+@_deadline.bounded
+def wait_for_model(uuid: str, timeout: float = 900) -> bool:
+    """Wait until an uploaded model has been transpiled and can be deployed.
+        Args:
+            uuid: UUID of the model.
+            timeout: Maximum number of seconds to wait.
+        Returns:
+            True if the model is ready, False if transpiling failed or the timeout expired.
+    """
+    return wait_for_models([uuid], timeout).get(uuid) == 'ready'
+
+
+@_deadline.bounded(priority='bulk')
+def wait_for_models(uuids: list, timeout: float = 900, initial_delay: float = 2, max_delay: float = 30) -> dict:
+    """Wait until uploaded models have been transpiled.
+    All pending models are checked in a single pass (one listing request when several models are
+    pending). The delay between passes starts at initial_delay and grows (with jitter) up to
+    max_delay while nothing changes; it is reset whenever a model finishes.
+        Args:
+            uuids: UUIDs of the models.
+            timeout: Maximum number of seconds to wait.
+            initial_delay: Seconds before the second check.
+            max_delay: Maximum number of seconds between checks.
+        Returns:
+            Dictionary mapping each UUID to 'ready', 'failed', 'timeout' (also when the deadline of the
+            call passed) or 'cancelled'.
+    """
+
+    deadline = time.time() + timeout
+    pending = list(dict.fromkeys(uuids))
+    results = {}
+    delay = initial_delay
+    while True:
+        if len(pending) == 1:
+            model = get_model(pending[0]) or {}
+            models = {pending[0]: model}
+        else:
+            models = {m.get('UUID'): m for m in get_all_models(fields=_STATUS_FIELDS) or [] if isinstance(m, dict)}
+        finished = False
+        for uuid in list(pending):
+            status = _model_status(models.get(uuid))
+            if status is not None:
+                results[uuid] = status
+                pending.remove(uuid)
+                finished = True
+                logger.info("Model " + uuid + " is " + status + ".", extra={'uuid': uuid})
+        if not pending:
+            return results
+        remaining = deadline - time.time()
+        if finished:
+            delay = initial_delay
+        if remaining <= 0 or not _deadline.sleep(min(delay * random.uniform(0.8, 1.2), remaining)):
+            status = 'cancelled' if _deadline.cancelled() else 'timeout'
+            results.update({uuid: status for uuid in pending})
+            logger.error(("Cancelled" if status == 'cancelled' else "Timed out") + " waiting for " +
+                         str(len(pending)) + " model(s).")
+            return results
+        delay = min(delay * 1.5, max_delay)
+
+
+def _model_status(model) -> str:
+    """Map the transpile status of a model record to 'ready', 'failed' or None (still pending)."""
+    if not isinstance(model, dict):
+        return None
+    for key in ('Status', 'TranspileStatus', 'State'):
+        status = str(model.get(key, "")).lower()
+        if status in _READY_STATUSES:
+            return 'ready'
+        if status in _FAILED_STATUSES:
+            return 'failed'
+    return None
+
+
+@_deadline.bounded
 def delete_model(uuid: str) -> bool:
     """Delete a model.
         Args:
@@ -296,21 +926,19 @@ def delete_model(uuid: str) -> bool:
                 'Authorization': f"Bearer {jwt_['JWT_ACCESS_TOKEN']}"
             }
             # Send API request
-            resp = req.delete(url=url, headers=headers)
+            resp = _http.request("DELETE", url, headers=headers)
             resp.raise_for_status()
             if 'json' in resp.headers.get('Content-Type'):
                 try:
                     # See if able to decode the JSON
-                    result: dict = resp.json()
+                    result: dict = _codec.loads(resp.content)
                 except ValueError:  # simplejson.decoder.JSONDecodeError
-                    if not SILENT:
-                        print("Unable to decode JSON error.")
+                    logger.error("Unable to decode JSON error.", extra={'uuid': uuid})
                     if DEBUG:
                         raise ModelError(result.get("Unable to decode JSON error."))
                     return False
             else:
-                if not SILENT:
-                    print("Server at", COMPUTE_API_URL, "did not return a valid JSON document.")
+                logger.error("Server at %s did not return a valid JSON document.", COMPUTE_API_URL, extra={'uuid': uuid})
                 if DEBUG:
                     raise ModelError("Server at", COMPUTE_API_URL, "did not return a valid JSON document.")
                 return False
@@ -318,10 +946,11 @@ def delete_model(uuid: str) -> bool:
                 return True
         except req.exceptions.RequestException as e:
             # Handle exceptions that may occur during API request
-            print(f"Error occurred while deleting model: {e}")
+            logger.error(f"Error occurred while deleting model: {e}", extra={'uuid': uuid})
         return False
 
 
+@_deadline.bounded
 def add_catalogue(name: str) -> bool:
     """Add catalogue to user's organisation.
         Args:
@@ -346,23 +975,22 @@ def add_catalogue(name: str) -> bool:
                 'Name': name,
             }
             # Send API request
-            resp = req.post(url=url, headers=headers, json=data)
+            resp = _http.request("POST", url, headers=headers, json=data)
         except Exception as e:
             # Handle exceptions that may occur during API request
-            if not SILENT:
-                print("FATAL: Unable to carry out the request: \n"
-                      "Your catalogue has not been added.\n")
+            logger.error("FATAL: Unable to carry out the request: \n"
+                         "Your catalogue has not been added.\n")
             if DEBUG:
                 raise CatalogueError("Unable to carry out the request: " + str(e))
             return False
         # user feedback:
         if resp.status_code == 200:
-            if not SILENT:
-                print("Your catalogue was successfully added to Scailable!")
-                print("You can use the '_get_all_catalogues' function to list all your catalogues. \n")
+            logger.info("Your catalogue was successfully added to Scailable!")
+            logger.info("You can use the '_get_all_catalogues' function to list all your catalogues. \n")
             return True
 
 
+@_deadline.bounded
 def update_catalogue(uuid: str, name: str) -> bool:
     """Update a model catalogue.
         Args:
@@ -388,22 +1016,21 @@ def update_catalogue(uuid: str, name: str) -> bool:
                 'Name': name,
             }
             # Send API request
-            resp = req.patch(url=url, headers=headers, json=data)
+            resp = _http.request("PATCH", url, headers=headers, json=data)
         except Exception as e:
             # Handle exceptions that may occur during API request
-            if not SILENT:
-                print("FATAL: Unable to carry out the request: " + str(e) +
-                      "\n Your catalogue has not been updated.\n")
+            logger.error("FATAL: Unable to carry out the request: " + str(e) +
+                         "\n Your catalogue has not been updated.\n", extra={'uuid': uuid})
             if DEBUG:
                 raise CatalogueError("Unable to carry out the request: " + str(e))
             return False
         # user feedback:
         if resp.status_code == 200:
-            if not SILENT:
-                print("Your catalogue was successfully updated to Scailable!")
+            logger.info("Your catalogue was successfully updated to Scailable!", extra={'uuid': uuid})
             return True
 
 
+@_deadline.bounded
 def delete_catalogue(uuid: str) -> bool:
     """Delete a catalogue.
         Args:
@@ -425,37 +1052,37 @@ def delete_catalogue(uuid: str) -> bool:
                 'Authorization': f"Bearer {jwt_['JWT_ACCESS_TOKEN']}"
             }
             # Send API request
-            resp = req.delete(url=url, headers=headers)
+            resp = _http.request("DELETE", url, headers=headers)
             resp.raise_for_status()
             if 'json' in resp.headers.get('Content-Type'):
                 try:
                     # See if able to decode the JSON
-                    result: dict = resp.json()
+                    result: dict = _codec.loads(resp.content)
                 except ValueError:  # simplejson.decoder.JSONDecodeError
-                    if not SILENT:
-                        print("Unable to decode JSON error.")
+                    logger.error("Unable to decode JSON error.", extra={'uuid': uuid})
                     if DEBUG:
                         raise ModelError(result.get("Unable to decode JSON error."))
                     return False
             else:
-                if not SILENT:
-                    print("Server at", COMPUTE_API_URL, "did not return a valid JSON document.")
+                logger.error("Server at %s did not return a valid JSON document.", COMPUTE_API_URL, extra={'uuid': uuid})
                 if DEBUG:
                     raise ModelError("Server at", COMPUTE_API_URL, "did not return a valid JSON document.")
                 return False
             if result.get("Message") == "Done":
-                print("Your catalogue was successfully deleted")
+                logger.info("Your catalogue was successfully deleted", extra={'uuid': uuid})
                 return True
         except req.exceptions.RequestException as e:
             # Handle exceptions that may occur during API request
-            print(f"Error occurred while deleting model: {e}")
+            logger.error(f"Error occurred while deleting model: {e}", extra={'uuid': uuid})
         return False
 
 
-def get_catalogue(uuid: str) -> dict:
+@_deadline.bounded
+def get_catalogue(uuid: str, typed: bool = False) -> dict:
     """Get catalogue's information
     Args:
         uuid: A string (the id of the catalogue)
+        typed: If True, return a Catalogue record instead of a dict.
     Returns:
         Dictionary contains the catalogue's information
     """
@@ -474,32 +1101,34 @@ def get_catalogue(uuid: str) -> dict:
                 'Authorization': f"Bearer {jwt_['JWT_ACCESS_TOKEN']}"
             }
             # Send API request
-            resp = req.get(url=url, headers=headers)
+            resp = _http.request("GET", url, headers=headers)
             # Raise an exception if request was unsuccessful
             resp.raise_for_status()
             # Check if response is in JSON format and extract catalogue data
             if 'json' in resp.headers.get('Content-Type'):
                 try:
                     # See if able to decode the JSON
-                    catalogue = resp.json()
+                    catalogue = _codec.loads(resp.content)
                 except ValueError:  # simplejson.decoder.JSONDecodeError
-                    if not SILENT:
-                        print("Unable to decode JSON error.")
+                    logger.error("Unable to decode JSON error.", extra={'uuid': uuid})
                     if DEBUG:
                         raise CatalogueError(catalogue.get("Unable to decode JSON error."))
             else:
-                if not SILENT:
-                    print("Server at", COMPUTE_API_URL, "did not return a valid JSON document.")
+                logger.error("Server at %s did not return a valid JSON document.", COMPUTE_API_URL, extra={'uuid': uuid})
                 if DEBUG:
                     raise CatalogueError("Server at", COMPUTE_API_URL, "did not return a valid JSON document.")
         except req.exceptions.RequestException as e:
             # Handle exceptions that may occur during API request
-            print(f"Error occurred while fetching user catalogue: {e}")
-        return catalogue
+            logger.error(f"Error occurred while fetching user catalogue: {e}", extra={'uuid': uuid})
+        return wrap(catalogue, Catalogue) if typed else catalogue
 
 
-def get_all_catalogues() -> dict:
+@_deadline.bounded
+def get_all_catalogues(typed: bool = False, fields: list = None) -> dict:
     """Get all catalogues accessible for the users' organisation.
+    Args:
+        typed: If True, return a list of Catalogue records instead of a list of dicts.
+        fields: Optional list of the fields to return per catalogue; all when omitted.
     Returns:
         Dictionary contains all catalogues
     """
@@ -517,31 +1146,30 @@ def get_all_catalogues() -> dict:
             headers = {
                 'Authorization': f"Bearer {jwt_['JWT_ACCESS_TOKEN']}"
             }
-            # Send API request
-            resp = req.get(url=url, headers=headers)
+            # Send API request (for the requested fields only)
+            resp = _http.request("GET", url, headers=headers, params=fields_param(fields))
             # Raise an exception if request was unsuccessful
             resp.raise_for_status()
             # Check if response is in JSON format and extract catalogue data
             if 'json' in resp.headers.get('Content-Type'):
                 try:
                     # See if able to decode the JSON
-                    catalogues = resp.json()
+                    catalogues = project(_codec.loads(resp.content), fields)
                 except ValueError:  # simplejson.decoder.JSONDecodeError
-                    if not SILENT:
-                        print("Unable to decode JSON error.")
+                    logger.error("Unable to decode JSON error.")
                     if DEBUG:
                         raise CatalogueError(catalogues.get("Unable to decode JSON error."))
             else:
-                if not SILENT:
-                    print("Server at", COMPUTE_API_URL, "did not return a valid JSON document.")
+                logger.error("Server at %s did not return a valid JSON document.", COMPUTE_API_URL)
                 if DEBUG:
                     raise CatalogueError("Server at", COMPUTE_API_URL, "did not return a valid JSON document.")
         except req.exceptions.RequestException as e:
             # Handle exceptions that may occur during API request
-            print(f"Error occurred while fetching user catalogue: {e}")
-        return catalogues
+            logger.error(f"Error occurred while fetching user catalogue: {e}")
+        return wrap(catalogues, Catalogue, many=True) if typed else catalogues
 
 
+@_deadline.bounded
 def models_statistics() -> dict:
     """Returns a dict with models statistics
         """
@@ -559,23 +1187,23 @@ def models_statistics() -> dict:
                 'Authorization': f"Bearer {jwt_['JWT_ACCESS_TOKEN']}"
             }
             # Send API request
-            resp = req.get(url=url, headers=headers)
+            resp = _http.request("GET", url, headers=headers)
             resp.raise_for_status()
             if 'json' in resp.headers.get('Content-Type'):
                 try:
                     # See if able to decode the JSON
-                    statistics: dict = resp.json()
+                    statistics: dict = _codec.loads(resp.content)
                 except ValueError:  # simplejson.decoder.JSONDecodeError
-                    if not SILENT:
-                        print("Unable to decode JSON error.")
+                    logger.error("Unable to decode JSON error.")
                     if DEBUG:
                         raise ModelError(statistics.get("Unable to decode JSON error."))
         except req.exceptions.RequestException as e:
             # Handle exceptions that may occur during API request
-            print(f"Error occurred while fetching organisation models statistics: {e}")
+            logger.error(f"Error occurred while fetching organisation models statistics: {e}")
         return statistics
 
 
+@_deadline.bounded
 def config_parameters() -> dict:
     """
     Return: configured parameters for service.
@@ -595,25 +1223,23 @@ def config_parameters() -> dict:
                 'Authorization': f"Bearer {jwt_['JWT_ACCESS_TOKEN']}"
             }
             # Send API request
-            resp = req.get(url=url, headers=headers)
+            resp = _http.request("GET", url, headers=headers)
             # Raise an exception if request was unsuccessful
             resp.raise_for_status()
             # Check if response is in JSON format and extract config parameters
             if 'json' in resp.headers.get('Content-Type'):
                 try:
                     # See if able to decode the JSON
-                    config = resp.json()
+                    config = _codec.loads(resp.content)
                 except ValueError:  # simplejson.decoder.JSONDecodeError
-                    if not SILENT:
-                        print("Unable to decode JSON error.")
+                    logger.error("Unable to decode JSON error.")
                     if DEBUG:
                         raise ConfigError(config.get("Unable to decode JSON error."))
             else:
-                if not SILENT:
-                    print("Server at", COMPUTE_API_URL, "did not return a valid JSON document.")
+                logger.error("Server at %s did not return a valid JSON document.", COMPUTE_API_URL)
                 if DEBUG:
                     raise ConfigError("Server at", COMPUTE_API_URL, "did not return a valid JSON document.")
         except req.exceptions.RequestException as e:
             # Handle exceptions that may occur during API request
-            print(f"Error occurred while getting configured parameters for service {e}")
+            logger.error(f"Error occurred while getting configured parameters for service {e}")
         return config
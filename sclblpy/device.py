@@ -1,12 +1,20 @@
 import json
 import requests as req
-from sclblpy._globals import DEVICE_API_URL, SILENT, DEBUG, JWT_JSON_FILE
+from sclblpy._globals import DEVICE_API_URL, DEBUG, JWT_JSON_FILE
+from sclblpy import _http, _codec, _deadline, _outbox
 from sclblpy.errors import DeviceError, GroupError
+from sclblpy.records import wrap, project, fields_param, Device, Group
 from sclblpy.auth import _check_jwt
+from sclblpy._log import get_logger
 
+logger = get_logger('device')
 
-def get_device(uuid: str) -> dict:
+
+@_deadline.bounded
+def get_device(uuid: str, typed: bool = False) -> dict:
     """Get a single device by uuid.
+        Args:
+            typed: If True, return a Device record instead of a dict.
         Returns:
             Dictionary contains the device info
         """
@@ -25,31 +33,33 @@ def get_device(uuid: str) -> dict:
                 'Authorization': f"Bearer {jwt_['JWT_ACCESS_TOKEN']}"
             }
             # Send API request
-            resp = req.get(url=url, headers=headers)
+            resp = _http.request("GET", url, headers=headers)
             # Raise an exception if request was unsuccessful
             resp.raise_for_status()
             if 'json' in resp.headers.get('Content-Type'):
                 try:
                     # See if able to decode the JSON
-                    device = resp.json()
+                    device = _codec.loads(resp.content)
                 except ValueError:  # simplejson.decoder.JSONDecodeError
-                    if not SILENT:
-                        print("Unable to decode JSON error.")
+                    logger.error("Unable to decode JSON error.", extra={'uuid': uuid})
                     if DEBUG:
                         raise DeviceError(device.get("Unable to decode JSON error."))
             else:
-                if not SILENT:
-                    print("Server at", DEVICE_API_URL, "did not return a valid JSON document.")
+                logger.error("Server at %s did not return a valid JSON document.", DEVICE_API_URL, extra={'uuid': uuid})
                 if DEBUG:
                     raise DeviceError("Server at", DEVICE_API_URL, "did not return a valid JSON document.")
         except req.exceptions.RequestException as e:
             # Handle exceptions that may occur during API request
-            print(f"Error occurred while fetching device: {e}")
-        return device
+            logger.error(f"Error occurred while fetching device: {e}", extra={'uuid': uuid})
+        return wrap(device, Device) if typed else device
 
 
-def get_all_devices() -> dict:
+@_deadline.bounded
+def get_all_devices(typed: bool = False, fields: list = None) -> dict:
     """Get all device accessible for the users' organisation.
+        Args:
+            typed: If True, return a list of Device records instead of a list of dicts.
+            fields: Optional list of the fields to return per device (e.g. ['UUID', 'Name']); all when omitted.
         Returns:
             Dictionary contains all devices
         """
@@ -67,30 +77,29 @@ def get_all_devices() -> dict:
             headers = {
                 'Authorization': f"Bearer {jwt_['JWT_ACCESS_TOKEN']}"
             }
-            # Send API request
-            resp = req.get(url=url, headers=headers)
+            # Send API request (for the requested fields only)
+            resp = _http.request("GET", url, headers=headers, params=fields_param(fields))
             # Raise an exception if request was unsuccessful
             resp.raise_for_status()
             if 'json' in resp.headers.get('Content-Type'):
                 try:
                     # See if able to decode the JSON
-                    devices = resp.json()
+                    devices = project(_codec.loads(resp.content), fields)
                 except ValueError:  # simplejson.decoder.JSONDecodeError
-                    if not SILENT:
-                        print("Unable to decode JSON error.")
+                    logger.error("Unable to decode JSON error.")
                     if DEBUG:
                         raise DeviceError(devices.get("Unable to decode JSON error."))
             else:
-                if not SILENT:
-                    print("Server at", DEVICE_API_URL, "did not return a valid JSON document.")
+                logger.error("Server at %s did not return a valid JSON document.", DEVICE_API_URL)
                 if DEBUG:
                     raise DeviceError("Server at", DEVICE_API_URL, "did not return a valid JSON document.")
         except req.exceptions.RequestException as e:
             # Handle exceptions that may occur during API request
-            print(f"Error occurred while fetching organisation devices: {e}")
-        return devices
+            logger.error(f"Error occurred while fetching organisation devices: {e}")
+        return wrap(devices, Device, many=True) if typed else devices
 
 
+@_deadline.bounded
 def add_device(name: str, registration_token: str = None, runtime: str = None, serial: str = None, type: str = None) -> bool:
     """Add device to user's organisation.
         Args:
@@ -123,25 +132,24 @@ def add_device(name: str, registration_token: str = None, runtime: str = None, s
                 'Type': type
             }
             # Send API request
-            resp = req.post(url=url, headers=headers, json=data)
-            print(resp.json())
+            resp = _http.request("POST", url, headers=headers, json=data)
+            logger.debug("Add device response: %s", resp.text)
             resp.raise_for_status()
         except Exception as e:
             # Handle exceptions that may occur during API request
-            if not SILENT:
-                print("FATAL: Unable to carry out the request: \n" + str(e)+
-                      "\nYour device has not been added.\n")
+            logger.error("FATAL: Unable to carry out the request: \n" + str(e)+
+                         "\nYour device has not been added.\n")
             if DEBUG:
                 raise DeviceError("Unable to carry out the request: " + str(e))
             return False
         # user feedback:
         if resp.status_code == 200:
-            if not SILENT:
-                print("Your device was successfully added to Scailable!")
-                print("You can use the '_all_devices()' function to list all your devices. \n")
+            logger.info("Your device was successfully added to Scailable!")
+            logger.info("You can use the '_all_devices()' function to list all your devices. \n")
             return True
 
 
+@_deadline.bounded
 def update_device(uuid: str, name: str, runtime: str = "", serial: str = "", type: str = "") -> bool:
     """Update a single device.
         Args:
@@ -154,12 +162,11 @@ def update_device(uuid: str, name: str, runtime: str = "", serial: str = "", typ
             True if device updated, False otherwise
     """
 
-    # Check if user is authenticated
-    auth = _check_jwt()
+    # Check if user is authenticated (while the API is unreachable, the mutation is queued in the outbox)
+    auth = _check_jwt() or _outbox.offline(DEVICE_API_URL)
     if not auth:
-        if not SILENT:
-            print("FATAL: We were unable to obtain JWT authorization for your account. \n"
-                  "Your device has not been updated. \n")
+        logger.error("FATAL: We were unable to obtain JWT authorization for your account. \n"
+                     "Your device has not been updated. \n", extra={'uuid': uuid})
         if DEBUG:
             raise DeviceError("We were unable to obtain JWT authorization.")
         return False
@@ -181,23 +188,25 @@ def update_device(uuid: str, name: str, runtime: str = "", serial: str = "", typ
                 'Type': type
             }
             # Send API request
-            resp = req.patch(url=url, headers=headers, json=data)
+            resp = _outbox.request("PATCH", url, headers=headers, json=data)
+            if resp is None:
+                logger.info("The API is unreachable: your device update is queued in the outbox.", extra={'uuid': uuid})
+                return True
         except Exception as e:
             # Handle exceptions that may occur during API request
-            if not SILENT:
-                print("FATAL: Unable to carry out the request: \n"
-                      "Your device has not been updated.\n")
+            logger.error("FATAL: Unable to carry out the request: \n"
+                         "Your device has not been updated.\n", extra={'uuid': uuid})
             if DEBUG:
                 raise DeviceError("Unable to carry out the request: " + str(e))
             return False
 
         # user feedback:
         if resp.status_code == 200:
-            if not SILENT:
-                print("Your device was successfully updated")
+            logger.info("Your device was successfully updated", extra={'uuid': uuid})
             return True
 
 
+@_deadline.bounded
 def assign_model_to_device(uuid: str, function_uuid: str) -> bool:
     """Assign a model to a device.
             Args:
@@ -207,12 +216,11 @@ def assign_model_to_device(uuid: str, function_uuid: str) -> bool:
                 True if model assigned, False otherwise
         """
 
-    # Check if user is authenticated
-    auth = _check_jwt()
+    # Check if user is authenticated (while the API is unreachable, the mutation is queued in the outbox)
+    auth = _check_jwt() or _outbox.offline(DEVICE_API_URL)
     if not auth:
-        if not SILENT:
-            print("FATAL: We were unable to obtain JWT authorization for your account. \n"
-                  "Your model has not been assigned. \n")
+        logger.error("FATAL: We were unable to obtain JWT authorization for your account. \n"
+                     "Your model has not been assigned. \n", extra={'uuid': uuid})
         if DEBUG:
             raise DeviceError("We were unable to obtain JWT authorization.")
         return False
@@ -230,23 +238,26 @@ def assign_model_to_device(uuid: str, function_uuid: str) -> bool:
             data = [{'FunctionUUID': function_uuid}]
 
             # Send API request
-            resp = req.post(url=url, headers=headers, json=data)
+            resp = _outbox.request("POST", url, headers=headers, json=data, batch='list')
+            if resp is None:
+                logger.info("The API is unreachable: the assignment of your model is queued in the outbox.",
+                            extra={'uuid': uuid})
+                return True
         except Exception as e:
             # Handle exceptions that may occur during API request
-            if not SILENT:
-                print("FATAL: Unable to carry out the request: \n" + str(e)+
-                      "Your model has not been assigned.\n")
+            logger.error("FATAL: Unable to carry out the request: \n" + str(e)+
+                         "Your model has not been assigned.\n", extra={'uuid': uuid})
             if DEBUG:
                 raise DeviceError("Unable to carry out the request: " + str(e))
             return False
 
         # user feedback:
         if resp.status_code == 200:
-            if not SILENT:
-                print("Your model was successfully assigned to the device " + uuid)
+            logger.info("Your model was successfully assigned to the device " + uuid, extra={'uuid': uuid})
             return True
 
 
+@_deadline.bounded
 def delete_device(uuid: str) -> bool:
     """Delete a device.
         Args:
@@ -255,8 +266,8 @@ def delete_device(uuid: str) -> bool:
             True if device deleted, false otherwise
         """
 
-    # Check if user is authenticated
-    auth = _check_jwt()
+    # Check if user is authenticated (while the API is unreachable, the mutation is queued in the outbox)
+    auth = _check_jwt() or _outbox.offline(DEVICE_API_URL)
     result = {}
     if auth:
         try:
@@ -269,35 +280,38 @@ def delete_device(uuid: str) -> bool:
                 'Authorization': f"Bearer {jwt_['JWT_ACCESS_TOKEN']}"
             }
             # Send API request
-            resp = req.delete(url=url, headers=headers)
+            resp = _outbox.request("DELETE", url, headers=headers)
+            if resp is None:
+                logger.info("The API is unreachable: the deletion of your device is queued in the outbox.",
+                            extra={'uuid': uuid})
+                return True
             # Raise an exception if request was unsuccessful
             resp.raise_for_status()
             if 'json' in resp.headers.get('Content-Type'):
                 try:
                     # See if able to decode the JSON
-                    result: dict = resp.json()
+                    result: dict = _codec.loads(resp.content)
                 except ValueError:
-                    if not SILENT:
-                        print("Unable to decode JSON error.")
+                    logger.error("Unable to decode JSON error.", extra={'uuid': uuid})
                     if DEBUG:
                         raise DeviceError(result.get("Unable to decode JSON error."))
                     return False
             else:
-                if not SILENT:
-                    print("Server at", DEVICE_API_URL, "did not return a valid JSON document.")
+                logger.error("Server at %s did not return a valid JSON document.", DEVICE_API_URL, extra={'uuid': uuid})
                 if DEBUG:
                     raise DeviceError("Server at", DEVICE_API_URL, "did not return a valid JSON document.")
                 return False
             if result.get("Message") == "Deleted":
-                print('Your device was successfully deleted')
+                logger.info('Your device was successfully deleted', extra={'uuid': uuid})
                 return True
 
         except req.exceptions.RequestException as e:
             # Handle exceptions that may occur during API request
-            print(f"Error occurred while deleting device: {e}")
+            logger.error(f"Error occurred while deleting device: {e}", extra={'uuid': uuid})
             return False
 
 
+@_deadline.bounded
 def devices_statistics() -> dict:
     """Return a dict with generic statistics for devices
         """
@@ -315,31 +329,33 @@ def devices_statistics() -> dict:
                 'Authorization': f"Bearer {jwt_['JWT_ACCESS_TOKEN']}"
             }
             # Send API request
-            resp = req.get(url=url, headers=headers)
+            resp = _http.request("GET", url, headers=headers)
             # Raise an exception if request was unsuccessful
             resp.raise_for_status()
             if 'json' in resp.headers.get('Content-Type'):
                 try:
                     # See if able to decode the JSON
-                    statistics = resp.json()
+                    statistics = _codec.loads(resp.content)
                 except ValueError:  # simplejson.decoder.JSONDecodeError
-                    if not SILENT:
-                        print("Unable to decode JSON error.")
+                    logger.error("Unable to decode JSON error.")
                     if DEBUG:
                         raise DeviceError(statistics.get("Unable to decode JSON error."))
             else:
-                if not SILENT:
-                    print("Server at", DEVICE_API_URL, "did not return a valid JSON document.")
+                logger.error("Server at %s did not return a valid JSON document.", DEVICE_API_URL)
                 if DEBUG:
                     raise DeviceError("Server at", DEVICE_API_URL, "did not return a valid JSON document.")
         except req.exceptions.RequestException as e:
             # Handle exceptions that may occur during API request
-            print(f"Error occurred while fetching organisation devices statistics: {e}")
+            logger.error(f"Error occurred while fetching organisation devices statistics: {e}")
         return statistics
 
 
-def get_groups() -> dict:
+@_deadline.bounded
+def get_groups(typed: bool = False, fields: list = None) -> dict:
     """Get all groups accessible for the users' organisation.
+        Args:
+            typed: If True, return a list of Group records instead of a list of dicts.
+            fields: Optional list of the fields to return per group; all when omitted.
         Returns:
             Dictionary contains all groups
         """
@@ -357,30 +373,29 @@ def get_groups() -> dict:
             headers = {
                 'Authorization': f"Bearer {jwt_['JWT_ACCESS_TOKEN']}"
             }
-            # Send API request
-            resp = req.get(url=url, headers=headers)
+            # Send API request (for the requested fields only)
+            resp = _http.request("GET", url, headers=headers, params=fields_param(fields))
             # Raise an exception if request was unsuccessful
             resp.raise_for_status()
             if 'json' in resp.headers.get('Content-Type'):
                 try:
                     # See if able to decode the JSON
-                    groups = resp.json()
+                    groups = project(_codec.loads(resp.content), fields)
                 except ValueError:  # simplejson.decoder.JSONDecodeError
-                    if not SILENT:
-                        print("Unable to decode JSON error.")
+                    logger.error("Unable to decode JSON error.")
                     if DEBUG:
                         raise GroupError(groups.get("Unable to decode JSON error."))
             else:
-                if not SILENT:
-                    print("Server at", DEVICE_API_URL, "did not return a valid JSON document.")
+                logger.error("Server at %s did not return a valid JSON document.", DEVICE_API_URL)
                 if DEBUG:
                     raise GroupError("Server at", DEVICE_API_URL, "did not return a valid JSON document.")
         except req.exceptions.RequestException as e:
             # Handle exceptions that may occur during API request
-            print(f"Error occurred while fetching organisation groups list: {e}")
-        return groups
+            logger.error(f"Error occurred while fetching organisation groups list: {e}")
+        return wrap(groups, Group, many=True) if typed else groups
 
 
+@_deadline.bounded
 def delete_group(uuid: str) -> bool:
     """Delete a group.
         Args:
@@ -389,8 +404,8 @@ def delete_group(uuid: str) -> bool:
             True if group deleted, false otherwise
         """
 
-    # Check if user is authenticated
-    auth = _check_jwt()
+    # Check if user is authenticated (while the API is unreachable, the mutation is queued in the outbox)
+    auth = _check_jwt() or _outbox.offline(DEVICE_API_URL)
     result = {}
     if auth:
         try:
@@ -403,22 +418,24 @@ def delete_group(uuid: str) -> bool:
                 'Authorization': f"Bearer {jwt_['JWT_ACCESS_TOKEN']}"
             }
             # Send API request
-            resp = req.delete(url=url, headers=headers)
+            resp = _outbox.request("DELETE", url, headers=headers)
+            if resp is None:
+                logger.info("The API is unreachable: the deletion of your group is queued in the outbox.",
+                            extra={'uuid': uuid})
+                return True
             # Raise an exception if request was unsuccessful
             resp.raise_for_status()
             if 'json' in resp.headers.get('Content-Type'):
                 try:
                     # See if able to decode the JSON
-                    result: dict = resp.json()
+                    result: dict = _codec.loads(resp.content)
                 except ValueError:
-                    if not SILENT:
-                        print("Unable to decode JSON error.")
+                    logger.error("Unable to decode JSON error.", extra={'uuid': uuid})
                     if DEBUG:
                         raise GroupError(result.get("Unable to decode JSON error."))
                     return False
             else:
-                if not SILENT:
-                    print("Server at", DEVICE_API_URL, "did not return a valid JSON document.")
+                logger.error("Server at %s did not return a valid JSON document.", DEVICE_API_URL, extra={'uuid': uuid})
                 if DEBUG:
                     raise GroupError("Server at", DEVICE_API_URL, "did not return a valid JSON document.")
                 return False
@@ -427,10 +444,11 @@ def delete_group(uuid: str) -> bool:
 
         except req.exceptions.RequestException as e:
             # Handle exceptions that may occur during API request
-            print(f"Error occurred while deleting group: {e}")
+            logger.error(f"Error occurred while deleting group: {e}", extra={'uuid': uuid})
             return False
 
 
+@_deadline.bounded
 def add_devices_to_group(uuid: str, devices: list) -> bool:
     """Add devices to a group.
         Args:
@@ -441,8 +459,8 @@ def add_devices_to_group(uuid: str, devices: list) -> bool:
             True if devices added to the group, False otherwise
     """
 
-    # Check if user is authenticated
-    auth = _check_jwt()
+    # Check if user is authenticated (while the API is unreachable, the mutation is queued in the outbox)
+    auth = _check_jwt() or _outbox.offline(DEVICE_API_URL)
     if auth:
         try:
             # Load JWT from file
@@ -457,23 +475,26 @@ def add_devices_to_group(uuid: str, devices: list) -> bool:
                 'Devices': devices
             }
             # Send API request
-            resp = req.post(url=url, headers=headers, json=data)
+            resp = _outbox.request("POST", url, headers=headers, json=data, batch='Devices')
+            if resp is None:
+                logger.info("The API is unreachable: the addition of your devices to the group is queued in the "
+                            "outbox.", extra={'uuid': uuid})
+                return True
         except Exception as e:
             # Handle exceptions that may occur during API request
-            if not SILENT:
-                print("FATAL: Unable to carry out the request: \n"
-                      "Your device has not been added to the group.\n")
+            logger.error("FATAL: Unable to carry out the request: \n"
+                         "Your device has not been added to the group.\n", extra={'uuid': uuid})
             if DEBUG:
                 raise DeviceError("Unable to carry out the request: " + str(e))
             return False
 
         # user feedback:
         if resp.status_code == 200:
-            if not SILENT:
-                print("Your device was successfully added to the group " + uuid)
+            logger.info("Your device was successfully added to the group " + uuid, extra={'uuid': uuid})
             return True
 
 
+@_deadline.bounded
 def delete_device_from_group(uuid_device: str, uuid_group: str) -> bool:
     """Delete a device from a group.
         Args:
@@ -483,8 +504,8 @@ def delete_device_from_group(uuid_device: str, uuid_group: str) -> bool:
             True if device deleted, false otherwise
         """
 
-    # Check if user is authenticated
-    auth = _check_jwt()
+    # Check if user is authenticated (while the API is unreachable, the mutation is queued in the outbox)
+    auth = _check_jwt() or _outbox.offline(DEVICE_API_URL)
     result = {}
     if auth:
         try:
@@ -497,29 +518,31 @@ def delete_device_from_group(uuid_device: str, uuid_group: str) -> bool:
                 'Authorization': f"Bearer {jwt_['JWT_ACCESS_TOKEN']}"
             }
             # Send API request
-            resp = req.delete(url=url, headers=headers)
+            resp = _outbox.request("DELETE", url, headers=headers)
+            if resp is None:
+                logger.info("The API is unreachable: the removal of your device from the group is queued in the "
+                            "outbox.", extra={'uuid': uuid_device})
+                return True
             # Raise an exception if request was unsuccessful
             resp.raise_for_status()
             if 'json' in resp.headers.get('Content-Type'):
                 try:
                     # See if able to decode the JSON
-                    result: dict = resp.json()
+                    result: dict = _codec.loads(resp.content)
                 except ValueError:
-                    if not SILENT:
-                        print("Unable to decode JSON error.")
+                    logger.error("Unable to decode JSON error.")
                     if DEBUG:
                         raise DeviceError(result.get("Unable to decode JSON error."))
                     return False
             else:
-                if not SILENT:
-                    print("Server at", DEVICE_API_URL, "did not return a valid JSON document.")
+                logger.error("Server at %s did not return a valid JSON document.", DEVICE_API_URL)
                 if DEBUG:
                     raise DeviceError("Server at", DEVICE_API_URL, "did not return a valid JSON document.")
                 return False
             if result.get("Message") == "Ok":
-                print('Your device was successfully deleted from the group.')
+                logger.info('Your device was successfully deleted from the group.')
                 return True
         except req.exceptions.RequestException as e:
             # Handle exceptions that may occur during API request
-            print(f"Error occurred while deleting device from group: {e}")
+            logger.error(f"Error occurred while deleting device from group: {e}")
             return False
@@ -1,4 +1,6 @@
 # Custom errors for the sclblpy package.
+from requests.exceptions import RequestException, Timeout
+
 
 class LoginError(Exception):
     """ Login error """
@@ -55,5 +57,35 @@ class GroupError(Exception):
     pass
 
 
+class ReconcileError(Exception):
+    """ Reconcile error """
+    pass
+
+
+class SyncError(Exception):
+    """ Sync error """
+    pass
+
+
+class MetadataError(Exception):
+    """ Metadata error """
+    pass
+
+
+class ExportError(Exception):
+    """ Export error """
+    pass
+
+
+class DeadlineExceeded(Timeout):
+    """ The deadline of a call passed (handled like a request timeout) """
+    pass
+
+
+class Cancelled(RequestException):
+    """ A call was cancelled through its CancellationToken (handled like a failed request) """
+    pass
+
+
 if __name__ == '__main__':
     print("No command line options available for errors.py")
@@ -0,0 +1,203 @@
+# File contains the streaming export of the organisation's inventories to NDJSON, CSV and Apache Arrow/Parquet files.
+import csv
+import json
+import os
+import requests as req
+from itertools import islice
+from sclblpy._globals import COMPUTE_API_URL, DEVICE_API_URL, DEBUG, JWT_JSON_FILE
+from sclblpy import _http, _codec, _deadline
+from sclblpy.errors import ExportError
+from sclblpy.auth import _check_jwt
+from sclblpy._log import get_logger
+
+logger = get_logger('export')
+
+_FORMATS = {'.ndjson': 'ndjson', '.jsonl': 'ndjson', '.csv': 'csv', '.arrow': 'arrow', '.feather': 'arrow',
+            '.parquet': 'parquet'}
+
+
+@_deadline.bounded(priority='bulk')
+def export_devices(path: str, format: str = None, batch_size: int = 10000) -> int:
+    """Export all devices accessible for the users' organisation to a file.
+        Args:
+            path: The file to write.
+            format: 'ndjson', 'csv', 'arrow' or 'parquet'; derived from the extension of path when omitted.
+            batch_size: Number of records buffered per CSV or Arrow record batch.
+        Returns:
+            The number of devices exported.
+    """
+    return _export(f"{DEVICE_API_URL}/devices", path, format, batch_size)
+
+
+@_deadline.bounded(priority='bulk')
+def export_models(path: str, format: str = None, batch_size: int = 10000) -> int:
+    """Export all models accessible to the users' organisation to a file.
+        Args:
+            path: The file to write.
+            format: 'ndjson', 'csv', 'arrow' or 'parquet'; derived from the extension of path when omitted.
+            batch_size: Number of records buffered per CSV or Arrow record batch.
+        Returns:
+            The number of models exported.
+    """
+    return _export(f"{COMPUTE_API_URL}/functions", path, format, batch_size)
+
+
+def _export(url: str, path: str, format: str, batch_size: int) -> int:
+    """Stream the listing at url into path; records are decoded and written batch by batch."""
+
+    format = format or _FORMATS.get(os.path.splitext(path)[1].lower())
+    if format not in ('ndjson', 'csv', 'arrow', 'parquet'):
+        logger.error("FATAL: Unknown export format for " + path + ".")
+        if DEBUG:
+            raise ExportError("Unknown export format for " + path + ".")
+        return 0
+
+    # Check if user is authenticated
+    auth = _check_jwt()
+    if not auth:
+        return 0
+    # The export is written next to path and only replaces it when complete.
+    tmp = path + "." + str(os.getpid()) + ".tmp"
+    try:
+        # Load JWT from file
+        with open(JWT_JSON_FILE) as f:
+            jwt_ = json.load(f)
+        headers = {
+            'Authorization': f"Bearer {jwt_['JWT_ACCESS_TOKEN']}"
+        }
+        # Send API request; the body is decoded while it is being received
+        with _http.request("GET", url, headers=headers, stream=True) as resp:
+            resp.raise_for_status()
+            records = _http.iter_json_list(resp)
+            if format == 'ndjson':
+                count = _write_ndjson(records, tmp)
+            elif format == 'csv':
+                count = _write_csv(records, tmp, batch_size)
+            else:
+                count = _write_arrow(records, tmp, batch_size, format)
+        os.replace(tmp, path)
+    except (req.exceptions.RequestException, ValueError, OSError, ImportError) as e:
+        logger.error(f"Error occurred while exporting to {path}: {e}")
+        if DEBUG:
+            raise ExportError("Unable to export to " + path + ": " + str(e))
+        return 0
+    finally:
+        _remove(tmp)
+    logger.info(f"Exported {count} records to {path}.")
+    return count
+
+
+def _write_ndjson(records, path: str) -> int:
+    count = 0
+    with open(path, 'wb') as f:
+        for record in records:
+            f.write(_codec.dumps(record) + b"\n")
+            count += 1
+    return count
+
+
+def _write_csv(records, path: str, batch_size: int) -> int:
+    """Write records as CSV; the columns are all fields found in any record, in order of appearance.
+    The rows are written to a spill file first, so the header can include fields that first appear late."""
+
+    count = 0
+    columns = {}
+    rows = path + ".rows"
+    try:
+        with open(rows, 'w', newline='') as f:
+            writer = csv.writer(f)
+            while True:
+                batch = [_flatten(record) for record in islice(records, batch_size)]
+                if not batch:
+                    break
+                for record in batch:
+                    columns.update(dict.fromkeys(record))
+                # Columns are only ever appended, so earlier rows are a prefix of the final layout.
+                writer.writerows([record.get(column) for column in columns] for record in batch)
+                count += len(batch)
+        with open(path, 'w', newline='') as out, open(rows, newline='') as f:
+            writer = csv.writer(out)
+            writer.writerow(columns)
+            writer.writerows(row + [""] * (len(columns) - len(row)) for row in csv.reader(f))
+    finally:
+        _remove(rows)
+    return count
+
+
+def _write_arrow(records, path: str, batch_size: int, format: str) -> int:
+    """Write records as an Arrow IPC file (memory-mappable) or Parquet file, one record batch at a time.
+    The records are spilled to a file while the column types of all batches are merged: all-null columns become
+    strings, mixed integers and floats become floats and other mixed types become strings. The batches are then
+    written with that schema."""
+
+    import pyarrow as pa  # optional dependency
+    count = 0
+    types = {}
+    rows = path + ".rows"
+    writer = None
+    try:
+        with open(rows, 'wb') as f:
+            while True:
+                batch = [_flatten(record) for record in islice(records, batch_size)]
+                if not batch:
+                    break
+                for name in dict.fromkeys(key for record in batch for key in record):
+                    try:
+                        type_ = pa.array([record.get(name) for record in batch]).type
+                    except (pa.ArrowInvalid, pa.ArrowTypeError):  # mixed types within the batch
+                        type_ = pa.string()
+                    types[name] = _merge_types(types.get(name, pa.null()), type_)
+                f.writelines(_codec.dumps(record) + b"\n" for record in batch)
+                count += len(batch)
+        schema = pa.schema([(name, pa.string() if pa.types.is_null(t) else t) for name, t in types.items()])
+        strings = [field.name for field in schema if pa.types.is_string(field.type)]
+        if format == 'parquet':
+            import pyarrow.parquet as pq
+            writer = pq.ParquetWriter(path, schema)
+        else:
+            writer = pa.ipc.new_file(path, schema)
+        with open(rows, 'rb') as f:
+            lines = iter(f)
+            while True:
+                batch = [_codec.loads(line) for line in islice(lines, batch_size)]
+                if not batch:
+                    break
+                for record in batch:
+                    for name in strings:
+                        value = record.get(name)
+                        if value is not None and not isinstance(value, str):
+                            record[name] = json.dumps(value)
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+    finally:
+        if writer is not None:
+            writer.close()
+        _remove(rows)
+    return count
+
+
+def _merge_types(a, b):
+    """The Arrow type holding the values of both types."""
+    import pyarrow as pa
+    if a == b or pa.types.is_null(b):
+        return a
+    if pa.types.is_null(a):
+        return b
+    if all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in (a, b)):
+        return pa.float64()
+    return pa.string()
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _flatten(record: dict) -> dict:
+    """Encode nested values (lists and dicts) as JSON strings so that every column has a scalar type."""
+    return {k: json.dumps(v) if isinstance(v, (dict, list)) else v for k, v in record.items()}
+
+
+if __name__ == '__main__':
+    print("No command line options available for export.py.")
@@ -0,0 +1,156 @@
+# File contains the optional SQLite materialisation of the organisation's metadata and a query API over it.
+import json
+import os
+import sqlite3
+import time
+from sclblpy._globals import DEBUG, CACHE_DB
+from sclblpy.errors import MetadataError
+from sclblpy.state import snapshot
+from sclblpy import _deadline
+from sclblpy._log import get_logger
+
+logger = get_logger('metadata')
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS models (uuid TEXT PRIMARY KEY, name TEXT, record TEXT NOT NULL);
+    CREATE TABLE IF NOT EXISTS devices (uuid TEXT PRIMARY KEY, name TEXT, record TEXT NOT NULL);
+    CREATE TABLE IF NOT EXISTS catalogues (uuid TEXT PRIMARY KEY, name TEXT, record TEXT NOT NULL);
+    CREATE TABLE IF NOT EXISTS groups (uuid TEXT PRIMARY KEY, name TEXT, record TEXT NOT NULL);
+    CREATE TABLE IF NOT EXISTS device_models (device_uuid TEXT NOT NULL, model_uuid TEXT NOT NULL,
+                                              PRIMARY KEY (device_uuid, model_uuid));
+    CREATE TABLE IF NOT EXISTS group_devices (group_uuid TEXT NOT NULL, device_uuid TEXT NOT NULL,
+                                              PRIMARY KEY (group_uuid, device_uuid));
+    CREATE TABLE IF NOT EXISTS catalogue_models (catalogue_uuid TEXT NOT NULL, model_uuid TEXT NOT NULL,
+                                                 PRIMARY KEY (catalogue_uuid, model_uuid));
+    CREATE TABLE IF NOT EXISTS metadata_state (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+    CREATE INDEX IF NOT EXISTS models_name ON models (name);
+    CREATE INDEX IF NOT EXISTS devices_name ON devices (name);
+    CREATE INDEX IF NOT EXISTS catalogues_name ON catalogues (name);
+    CREATE INDEX IF NOT EXISTS groups_name ON groups (name);
+    CREATE INDEX IF NOT EXISTS device_models_model ON device_models (model_uuid);
+    CREATE INDEX IF NOT EXISTS group_devices_device ON group_devices (device_uuid);
+    CREATE INDEX IF NOT EXISTS catalogue_models_model ON catalogue_models (model_uuid);
+    CREATE VIEW IF NOT EXISTS deployments AS
+        SELECT g.uuid AS group_uuid, g.name AS group_name, d.uuid AS device_uuid, d.name AS device_name,
+               m.uuid AS model_uuid, m.name AS model_name
+        FROM device_models dm
+        JOIN devices d ON d.uuid = dm.device_uuid
+        LEFT JOIN models m ON m.uuid = dm.model_uuid
+        LEFT JOIN group_devices gd ON gd.device_uuid = d.uuid
+        LEFT JOIN groups g ON g.uuid = gd.group_uuid;
+"""
+
+# (table, listing key, link table, field of the record listing the linked UUIDs)
+_TABLES = (
+    ('models', 'models', None, None),
+    ('devices', 'devices', 'device_models', 'Functions'),
+    ('catalogues', 'catalogues', 'catalogue_models', 'Functions'),
+    ('groups', 'groups', 'group_devices', 'Devices'),
+)
+
+
+def _connect() -> sqlite3.Connection:
+    """Open the local cache database and make sure the metadata tables exist."""
+    os.makedirs(os.path.dirname(CACHE_DB), exist_ok=True)
+    db = sqlite3.connect(CACHE_DB)
+    db.row_factory = sqlite3.Row
+    db.executescript(_SCHEMA)
+    return db
+
+
+@_deadline.bounded(priority='bulk')
+def materialise(max_workers: int = 4) -> bool:
+    """Fetch all models, devices, catalogues and groups and store them in the local SQLite cache.
+    The listings are fetched in parallel and replace the previously materialised data in a single
+    transaction. If any listing cannot be fetched, the cache is left as it is.
+        Args:
+            max_workers: Maximum number of concurrent requests.
+        Returns:
+            True if the metadata was materialised, False otherwise.
+    """
+
+    current = snapshot(max_workers)
+    if current['failed']:
+        logger.error("Unable to materialise the metadata: the " + ", ".join(current['failed']) +
+                     " could not be fetched.")
+        if DEBUG:
+            raise MetadataError("Unable to fetch the " + ", ".join(current['failed']) + ".")
+        return False
+    db = _connect()
+    try:
+        with db:
+            for table, key, link_table, link_field in _TABLES:
+                db.execute("DELETE FROM " + table)
+                if link_table:
+                    db.execute("DELETE FROM " + link_table)
+                for record in current[key]:
+                    if not isinstance(record, dict) or not record.get('UUID'):
+                        continue
+                    db.execute("INSERT OR REPLACE INTO " + table + " VALUES (?, ?, ?)",
+                               (record['UUID'], record.get('Name'), json.dumps(record)))
+                    if link_table:
+                        db.executemany("INSERT OR IGNORE INTO " + link_table + " VALUES (?, ?)",
+                                       [(record['UUID'], uuid) for uuid in _linked(record.get(link_field))])
+            db.execute("INSERT OR REPLACE INTO metadata_state VALUES ('materialised', ?)", (str(time.time()),))
+        return True
+    except sqlite3.Error as e:
+        logger.error("Unable to materialise the metadata: " + str(e))
+        if DEBUG:
+            raise MetadataError("Unable to materialise the metadata: " + str(e))
+        return False
+    finally:
+        db.close()
+
+
+@_deadline.bounded
+def query(sql: str, params=(), max_age: float = None) -> list:
+    """Run a read-only SQL query against the materialised metadata.
+    Available tables are models, devices, catalogues and groups (uuid, name, record as JSON), the link
+    tables device_models, group_devices and catalogue_models, and the view deployments (which models
+    are on which devices per group). Other fields can be reached with json_extract(record, '$.Field').
+        Args:
+            sql: The SQL query.
+            params: Parameters for the placeholders in the query.
+            max_age: If given, (re-)materialise first when the data is older than max_age seconds.
+        Returns:
+            List of dictionaries, one per row.
+    """
+
+    if max_age is not None and time.time() - materialised_at() > max_age:
+        materialise()
+    db = _connect()
+    try:
+        db.execute("PRAGMA query_only = ON")
+        return [dict(row) for row in db.execute(sql, params)]
+    except sqlite3.Error as e:
+        logger.error("Unable to query the metadata: " + str(e))
+        if DEBUG:
+            raise MetadataError("Unable to query the metadata: " + str(e))
+        return []
+    finally:
+        db.close()
+
+
+def materialised_at() -> float:
+    """Return the time (seconds since the epoch) of the last materialisation, 0 if never materialised."""
+    db = _connect()
+    try:
+        row = db.execute("SELECT value FROM metadata_state WHERE key = 'materialised'").fetchone()
+        return float(row[0]) if row else 0.0
+    finally:
+        db.close()
+
+
+def _linked(items) -> list:
+    """Extract the UUIDs from a list of UUID strings or records."""
+    uuids = []
+    for item in items or []:
+        if isinstance(item, dict):
+            item = item.get('UUID') or item.get('FunctionUUID') or item.get('DeviceUUID')
+        if isinstance(item, str) and item:
+            uuids.append(item)
+    return uuids
+
+
+if __name__ == '__main__':
+    print("No command line options available for metadata.py.")
@@ -0,0 +1,125 @@
+# File contains the typed, slotted record classes returned by the get functions when called with typed=True,
+# and the field projection of listings (fields=).
+import json
+
+# Key tuples shared by all records with the same fields, so a record stores only its values.
+_shared_keys = {}
+
+
+class Record:
+    """A single API record.
+    The UUID and Name are available as attributes; all other fields are resolved lazily on first
+    access, either by their API name (record['Runtime']) or in snake case (record.runtime).
+    The record does not keep a per-item dict: its field names are shared with all records of the
+    same shape. Use .raw for the original dictionary.
+    """
+
+    __slots__ = ('uuid', 'name', '_keys', '_values')
+
+    def __init__(self, raw: dict):
+        keys = tuple(raw)
+        self._keys = _shared_keys.setdefault(keys, keys)
+        self._values = tuple(raw.values())
+        self.uuid = raw.get('UUID')
+        self.name = raw.get('Name')
+
+    @property
+    def raw(self) -> dict:
+        """The record as the original dictionary."""
+        return dict(zip(self._keys, self._values))
+
+    def get(self, key: str, default=None):
+        try:
+            return self._values[self._keys.index(key)]
+        except ValueError:
+            return default
+
+    def __getitem__(self, key: str):
+        try:
+            return self._values[self._keys.index(key)]
+        except ValueError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    def __getattr__(self, attribute: str):
+        # Only called for attributes that are not slots (or slots not set yet, as during copying and
+        # unpickling): map snake_case to the API's CamelCase.
+        if attribute.startswith('_'):
+            raise AttributeError(attribute)
+        key = "".join('UUID' if part == 'uuid' else part.capitalize() for part in attribute.split('_'))
+        if key in self._keys:
+            return self._values[self._keys.index(key)]
+        raise AttributeError(f"{type(self).__name__} has no field {attribute!r}")
+
+    def __reduce__(self):
+        # Slotted records have no __dict__: copy and pickle them as the class and the original dictionary.
+        return type(self), (self.raw,)
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and self.raw == other.raw
+
+    def __hash__(self) -> int:
+        return hash((type(self).__name__, self.uuid))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(uuid={self.uuid!r}, name={self.name!r})"
+
+    def to_json(self) -> str:
+        return json.dumps(self.raw)
+
+
+class Model(Record):
+    """A model (function)."""
+    __slots__ = ()
+
+
+class Device(Record):
+    """A device."""
+    __slots__ = ()
+
+
+class Catalogue(Record):
+    """A catalogue of models."""
+    __slots__ = ()
+
+
+class Group(Record):
+    """A group of devices."""
+    __slots__ = ()
+
+
+def fields_param(fields: list) -> dict:
+    """The query parameters asking the server for only the given fields of each record (None for all)."""
+    return {'fields': ",".join(fields)} if fields else None
+
+
+def project(records, fields: list):
+    """Keep only the given fields of each record, for servers that ignored the fields parameter.
+    Records without other fields (as projected by the server) are returned as they are."""
+    if not fields or not isinstance(records, list):
+        return records
+    wanted = set(fields)
+    return [r if not isinstance(r, dict) or r.keys() <= wanted else {k: r[k] for k in fields if k in r}
+            for r in records]
+
+
+def wrap(data, cls, many: bool = False):
+    """Wrap a decoded response in record classes.
+        Args:
+            data: A record (dict) or list of records as returned by the API.
+            cls: The record class (Model, Device, Catalogue or Group).
+            many: Whether data is a listing.
+        Returns:
+            A list of records if many is True ([] if the listing failed); otherwise a record, or None
+            if the record could not be fetched.
+    """
+
+    if many:
+        return [cls(item) if isinstance(item, dict) else item for item in data] if isinstance(data, list) else []
+    return cls(data) if isinstance(data, dict) and data else None
+
+
+if __name__ == '__main__':
+    print("No command line options available for records.py.")
@@ -0,0 +1,242 @@
+# File contains the declarative (desired-state) reconciler for models, catalogues, devices, groups and assignments.
+import json
+from concurrent.futures import ThreadPoolExecutor
+from sclblpy._globals import DEBUG
+from sclblpy.errors import ReconcileError
+from sclblpy.compute import get_all_models, get_all_catalogues, upload_model, add_catalogue
+from sclblpy.device import get_all_devices, get_groups, add_device, add_devices_to_group, \
+    assign_model_to_device
+from sclblpy import _deadline
+from sclblpy._log import get_logger
+
+logger = get_logger('state')
+
+
+def load_state(path: str) -> dict:
+    """Load a desired-state document from a .json or .yaml/.yml file.
+        Args:
+            path: The path of the desired-state document.
+        Returns:
+            Dictionary with the desired state, empty if the document could not be read.
+    """
+
+    try:
+        with open(path) as f:
+            if path.endswith(('.yaml', '.yml')):
+                import yaml  # optional dependency, only needed for YAML documents
+                state = yaml.safe_load(f)
+            else:
+                state = json.load(f)
+    except (OSError, ValueError, ImportError) as e:
+        logger.error("FATAL: Unable to read the desired-state document " + path + ": " + str(e))
+        if DEBUG:
+            raise ReconcileError("Unable to read the desired-state document: " + str(e))
+        return {}
+    return state or {}
+
+
+@_deadline.bounded(priority='bulk')
+def snapshot(max_workers: int = 4) -> dict:
+    """Fetch the current state of the organisation.
+    All list endpoints are fetched in parallel.
+        Args:
+            max_workers: Maximum number of concurrent requests.
+        Returns:
+            Dictionary with the lists of 'models', 'catalogues', 'devices' and 'groups', and the list of
+            keys whose listing could not be fetched ('failed'; their lists are empty).
+    """
+
+    fetchers = {
+        'models': get_all_models,
+        'catalogues': get_all_catalogues,
+        'devices': get_all_devices,
+        'groups': get_groups
+    }
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {key: pool.submit(_deadline.bind(fetch)) for key, fetch in fetchers.items()}
+        results = {key: future.result() for key, future in futures.items()}
+    current = {key: _as_list(result) for key, result in results.items()}
+    current['failed'] = [key for key, result in results.items() if not isinstance(result, list)]
+    return current
+
+
+def plan(desired: dict, current: dict = None) -> list:
+    """Compute the steps needed to move the current state to the desired state.
+    Reconciliation is additive: resources that are not in the desired state are left untouched.
+    Each step is a dict with an 'id', an 'action', its 'args' and the ids of the steps it
+    depends on ('after'). References to devices and models are given by name or UUID and
+    are resolved when the step is executed.
+        Args:
+            desired: The desired state (see load_state).
+            current: The current state (see snapshot); fetched if not supplied.
+        Returns:
+            List of steps in dependency order. Invalid specifications are included as steps with 'ok' False
+            and a 'reason'; they are never executed.
+    """
+
+    if current is None:
+        current = snapshot()
+    models = _index(current.get('models'))
+    catalogues = _index(current.get('catalogues'))
+    devices = _index(current.get('devices'))
+    groups = _index(current.get('groups'))
+    steps = []
+
+    # Level 0: resources without dependencies.
+    for kind, action, existing in (('model', 'upload_model', models), ('catalogue', 'add_catalogue', catalogues),
+                                   ('device', 'add_device', devices)):
+        for i, spec in enumerate(desired.get(kind + 's') or []):
+            if not isinstance(spec, dict) or not spec.get('name'):
+                reason = "Invalid " + kind + " specification (a dict with a 'name' is required)."
+                logger.error(reason + " Entry " + str(i) + " of " + kind + "s: " + str(spec))
+                steps.append({'id': kind + ":#" + str(i), 'action': action, 'args': spec, 'after': [],
+                              'ok': False, 'reason': reason})
+            elif spec['name'] not in existing:
+                steps.append({'id': kind + ":" + spec['name'], 'action': action, 'args': spec, 'after': []})
+    created = {step['id'] for step in steps if 'reason' not in step}
+
+    # Level 1: group memberships and model assignments, depending on the resources above.
+    for group in desired.get('groups') or []:
+        key = group.get('uuid') or group.get('name')
+        existing = groups.get(key)
+        if existing is None:
+            logger.warning("WARNING: Group " + str(key) + " does not exist and cannot be created; skipping.")
+            continue
+        missing = [d for d in group.get('devices') or []
+                   if not _references(existing, 'Devices', devices.get(d, {}).get('UUID', d))]
+        if missing:
+            steps.append({'id': "group:" + str(key), 'action': 'add_devices_to_group',
+                          'args': {'group': existing['UUID'], 'devices': missing},
+                          'after': [s for s in ("device:" + d for d in missing) if s in created]})
+    for assignment in desired.get('assignments') or []:
+        device, model = assignment.get('device'), assignment.get('model')
+        model_uuid = models.get(model, {}).get('UUID')
+        if model_uuid and _references(devices.get(device), 'Functions', model_uuid):
+            continue
+        steps.append({'id': "assign:" + str(device) + ":" + str(model), 'action': 'assign_model_to_device',
+                      'args': {'device': device, 'model': model},
+                      'after': [s for s in ("device:" + str(device), "model:" + str(model)) if s in created]})
+    return steps
+
+
+@_deadline.bounded(priority='bulk')
+def reconcile(desired, dry_run: bool = False, max_workers: int = 8) -> list:
+    """Reconcile the organisation with a desired-state document.
+    A snapshot of the current state is taken, a plan is computed and executed level by level;
+    all steps within a level run in parallel. Steps depending on a step that failed are skipped.
+        Args:
+            desired: The desired state, either a dict or the path of a .json/.yaml document.
+            dry_run: If True, only compute and return the plan.
+            max_workers: Maximum number of concurrent requests.
+        Returns:
+            List of steps, each with an added 'ok' key when executed; skipped steps have 'ok' False and
+            a 'reason'.
+    """
+
+    if isinstance(desired, str):
+        desired = load_state(desired)
+    current = snapshot()
+    if current['failed']:
+        # An empty listing would make every resource look missing.
+        logger.error("Unable to reconcile: the " + ", ".join(current['failed']) + " could not be fetched.")
+        if DEBUG:
+            raise ReconcileError("Unable to fetch the current state: " + ", ".join(current['failed']) + ".")
+        return []
+    steps = plan(desired, current)
+    if dry_run or not steps:
+        return steps
+
+    index = {'models': _index(current['models']), 'devices': _index(current['devices'])}
+    done = set()
+    failed = {s['id'] for s in steps if 'reason' in s}
+    remaining = [s for s in steps if 'reason' not in s]
+    while remaining:
+        for step in [s for s in remaining if any(d in failed for d in s['after'])]:
+            step['ok'] = False
+            step['reason'] = "Skipped: depends on failed step(s) " + \
+                ", ".join(d for d in step['after'] if d in failed) + "."
+            failed.add(step['id'])
+            remaining.remove(step)
+        if not remaining:
+            break
+        ready = [s for s in remaining if all(d in done for d in s['after'])]
+        if not ready:
+            if DEBUG:
+                raise ReconcileError("Unable to order the reconciliation plan (cyclic dependencies).")
+            break
+        if any(s['after'] for s in ready):
+            # References point to resources created in an earlier level: refresh.
+            refreshed = snapshot()
+            if not refreshed['failed']:
+                index = {'models': _index(refreshed['models']), 'devices': _index(refreshed['devices'])}
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_deadline.bind(lambda s: _execute(s, index)), ready))
+        for step, ok in zip(ready, results):
+            step['ok'] = bool(ok)
+            (done if ok else failed).add(step['id'])
+            remaining.remove(step)
+
+    failed = [s['id'] for s in steps if not s.get('ok')]
+    logger.info("Reconciliation finished: " + str(len(steps) - len(failed)) + " of " + str(len(steps)) +
+                " steps succeeded." + (" Failed: " + ", ".join(failed) if failed else ""))
+    return steps
+
+
+def _execute(step: dict, index: dict) -> bool:
+    """Execute a single plan step, resolving names to UUIDs using index."""
+
+    args = step['args']
+    try:
+        if step['action'] == 'upload_model':
+            return upload_model(args['name'], args.get('documentation', ""), args.get('input_driver', ""),
+                                args.get('output_driver', ""), args.get('input_driver_details', {}),
+                                args.get('output_driver_details', {}), args.get('alias', ""),
+                                args.get('path', ""), args.get('source_name'), args.get('source_url'))
+        if step['action'] == 'add_catalogue':
+            return add_catalogue(args['name'])
+        if step['action'] == 'add_device':
+            return add_device(args['name'], args.get('registration_token'), args.get('runtime'),
+                              args.get('serial'), args.get('type'))
+        if step['action'] == 'add_devices_to_group':
+            devices = [index['devices'].get(d, {}).get('UUID', d) for d in args['devices']]
+            return add_devices_to_group(args['group'], devices)
+        if step['action'] == 'assign_model_to_device':
+            device = index['devices'].get(args['device'], {}).get('UUID', args['device'])
+            model = index['models'].get(args['model'], {}).get('UUID', args['model'])
+            return assign_model_to_device(device, model)
+    except Exception as e:
+        logger.error("Reconciliation step " + step['id'] + " failed: " + str(e))
+        if DEBUG:
+            raise ReconcileError("Reconciliation step " + step['id'] + " failed: " + str(e))
+    return False
+
+
+def _as_list(records) -> list:
+    """Normalise a listing response (list, or empty dict on failure) to a list."""
+    return records if isinstance(records, list) else []
+
+
+def _index(records) -> dict:
+    """Index records by both their 'Name' and 'UUID'."""
+    index = {}
+    for record in _as_list(records):
+        if not isinstance(record, dict):
+            continue
+        for key in ('Name', 'UUID'):
+            if record.get(key):
+                index[record[key]] = record
+    return index
+
+
+def _references(record, key: str, uuid: str) -> bool:
+    """Check whether the list record[key] references uuid (either as a string or as a record with a UUID)."""
+    if not record:
+        return False
+    for item in record.get(key) or []:
+        if item == uuid or (isinstance(item, dict) and uuid in (item.get('UUID'), item.get('FunctionUUID'))):
+            return True
+    return False
+
+
+if __name__ == '__main__':
+    print("No command line options available for state.py.")
@@ -0,0 +1,137 @@
+# File contains the incremental synchronisation (change feed) of device state against a local SQLite snapshot.
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from sclblpy._globals import DEBUG, CACHE_DB
+from sclblpy.errors import SyncError
+from sclblpy.device import get_all_devices, devices_statistics
+from sclblpy import _deadline
+from sclblpy._log import get_logger
+
+logger = get_logger('sync')
+
+# Record fields that, when present, mark the last modification of a device.
+_TIMESTAMP_FIELDS = ('UpdatedAt', 'Updated', 'LastModified', 'ModifiedAt')
+
+
+def _connect() -> sqlite3.Connection:
+    """Open the local cache database and make sure the snapshot tables exist."""
+    os.makedirs(os.path.dirname(CACHE_DB), exist_ok=True)
+    db = sqlite3.connect(CACHE_DB)
+    db.executescript("""
+        CREATE TABLE IF NOT EXISTS device_snapshot (
+            uuid TEXT PRIMARY KEY,
+            updated TEXT,
+            fingerprint TEXT NOT NULL,
+            record TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS sync_state (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """)
+    return db
+
+
+@_deadline.bounded
+def iter_device_changes(max_age: float = 0):
+    """Yield the changes in device state since the previous synchronisation.
+    Devices are compared against a local snapshot; a device is only re-hashed when it carries no
+    update timestamp or its timestamp changed. The snapshot is updated once all events have been
+    consumed, so an interrupted iteration yields the same events again on the next call.
+        Args:
+            max_age: Seconds a snapshot is trusted without fetching the device listing, as long as
+                the device statistics are unchanged. 0 (default) always fetches the listing.
+        Yields:
+            Dictionaries with an 'event' ('added', 'removed' or 'modified'), the device 'uuid' and
+            the 'device' record (the previous record for 'removed' events).
+    """
+
+    db = _connect()
+    try:
+        state = dict(db.execute("SELECT key, value FROM sync_state").fetchall())
+        statistics = None
+        if max_age:  # without max_age the listing is always fetched: no need to probe the statistics
+            statistics = json.dumps(devices_statistics(), sort_keys=True)
+            if state.get('statistics') == statistics and time.time() - float(state.get('synced', 0)) < max_age:
+                return
+
+        devices = get_all_devices()
+        if not isinstance(devices, list):
+            logger.error("Unable to synchronise devices: the device listing could not be fetched.")
+            if DEBUG:
+                raise SyncError("The device listing could not be fetched.")
+            return
+
+        known = {row[0]: row[1:] for row in db.execute("SELECT uuid, updated, fingerprint, record FROM device_snapshot")}
+        rows = []
+        for device in devices:
+            uuid = device.get('UUID')
+            if uuid is None:
+                continue
+            updated = next((str(device[f]) for f in _TIMESTAMP_FIELDS if device.get(f) is not None), None)
+            previous = known.pop(uuid, None)
+            if previous is not None and updated is not None and previous[0] == updated:
+                continue
+            fingerprint = _fingerprint(device)
+            if previous is None:
+                yield {'event': 'added', 'uuid': uuid, 'device': device}
+            elif previous[1] != fingerprint:
+                yield {'event': 'modified', 'uuid': uuid, 'device': device}
+            rows.append((uuid, updated, fingerprint, json.dumps(device)))
+        for uuid, (_, _, record) in known.items():
+            yield {'event': 'removed', 'uuid': uuid, 'device': json.loads(record)}
+
+        with db:
+            db.executemany("DELETE FROM device_snapshot WHERE uuid = ?", [(uuid,) for uuid in known])
+            db.executemany("INSERT OR REPLACE INTO device_snapshot VALUES (?, ?, ?, ?)", rows)
+            if statistics is None:
+                db.execute("DELETE FROM sync_state WHERE key = 'statistics'")
+            else:
+                db.execute("INSERT OR REPLACE INTO sync_state VALUES ('statistics', ?)", (statistics,))
+            db.execute("INSERT OR REPLACE INTO sync_state VALUES ('synced', ?)", (str(time.time()),))
+    finally:
+        db.close()
+
+
+@_deadline.bounded
+def device_changes(max_age: float = 0) -> list:
+    """Return the list of changes in device state since the previous synchronisation.
+        Args:
+            max_age: See iter_device_changes.
+        Returns:
+            List of change events (see iter_device_changes).
+    """
+    return list(iter_device_changes(max_age))
+
+
+def reset_device_snapshot() -> bool:
+    """Remove the local device snapshot; the next synchronisation reports all devices as added.
+        Returns:
+            True if the snapshot was removed.
+    """
+
+    db = _connect()
+    try:
+        with db:
+            db.execute("DELETE FROM device_snapshot")
+            db.execute("DELETE FROM sync_state")
+        return True
+    except sqlite3.Error as e:
+        logger.error("Unable to reset the device snapshot: " + str(e))
+        if DEBUG:
+            raise SyncError("Unable to reset the device snapshot: " + str(e))
+        return False
+    finally:
+        db.close()
+
+
+def _fingerprint(record: dict) -> str:
+    """Stable hash of a record, independent of key order."""
+    return hashlib.sha1(json.dumps(record, sort_keys=True).encode()).hexdigest()
+
+
+if __name__ == '__main__':
+    print("No command line options available for sync.py.")
@@ -27,5 +27,8 @@ setuptools.setup(
         'requests',
         'pyjwt',
       ],
+    entry_points={
+        'console_scripts': ['sclblpy=sclblpy.cli:main'],
+    },
     python_requires='>=3.7',
 )
\ No newline at end of file